@@ -1,8 +1,8 @@
-import httpx
 import logging
 import GPUtil
 from .interfaces import LLMDriver
 from .config import Settings
+from .services.http_clients import HttpClientRegistry
 from .telemetry import telemetry
 from .exceptions import OverloadError
 
@@ -44,43 +44,42 @@ class LocalLlamaDriver(LLMDriver):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(url, json=payload)
-                if response.status_code != 200:
-                    return f"[L1 Error: {response.status_code}]"
+            client = HttpClientRegistry.get("ollama")
+            response = await client.post(url, json=payload, timeout=self.timeout)
+            if response.status_code != 200:
+                return f"[L1 Error: {response.status_code}]"
 
-                data = response.json()
-                raw_response = data.get("response", "").strip()
-                
-                # --- STATS CAPTURE ---
-                from .database import db
-                prompt_tokens = data.get("prompt_eval_count", 0)
-                completion_tokens = data.get("eval_count", 0)
-                # Ollama duration is in nanoseconds
-                duration_ms = data.get("total_duration", 0) // 1_000_000 
-                
-                await db.log_usage(
-                    model=self.model_name,
-                    layer="L1",
-                    prompt_tokens=prompt_tokens,
-                    completion_tokens=completion_tokens,
-                    duration_ms=duration_ms
-                )
-                
-                # Cleanup: Sometimes 7b models add extra spaces or quotes
-                if '<reflex action="git_sync"' in raw_response:
-                    return '<reflex action="git_sync" />'
-                
-                return raw_response
+            data = response.json()
+            raw_response = data.get("response", "").strip()
+
+            # --- STATS CAPTURE ---
+            from .database import db
+            prompt_tokens = data.get("prompt_eval_count", 0)
+            completion_tokens = data.get("eval_count", 0)
+            # Ollama duration is in nanoseconds
+            duration_ms = data.get("total_duration", 0) // 1_000_000 
+
+            await db.log_usage(
+                model=self.model_name,
+                layer="L1",
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                duration_ms=duration_ms
+            )
+
+            # Cleanup: Sometimes 7b models add extra spaces or quotes
+            if '<reflex action="git_sync"' in raw_response:
+                return '<reflex action="git_sync" />'
+
+            return raw_response
 
         except Exception as e:
             return f"[L1 Error: {str(e)}]"
 
     async def check_health(self) -> bool:
         try:
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                resp = await client.get(self.base_url)
-                return resp.status_code == 200
+            resp = await HttpClientRegistry.get("ollama").get(self.base_url, timeout=2.0)
+            return resp.status_code == 200
         except:
             return False
 
@@ -90,21 +89,21 @@ class LocalLlamaDriver(LLMDriver):
         pull_url = f"{self.base_url}/api/pull"
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # 1. Check if exists
-                resp = await client.get(check_url)
-                if resp.status_code == 200:
-                    models_data = resp.json().get('models')
-                    if models_data:
-                        models = [m['name'] for m in models_data]
-                        if self.model_name in models or f"{self.model_name}:latest" in models:
-                            logger.info(f"✅ Model {self.model_name} already present.")
-                            return True
-                
-                # 2. Pull if missing
-                logger.info(f"📥 Pulling model {self.model_name} (this may take a while)...")
-                await client.post(pull_url, json={"name": self.model_name, "stream": False}, timeout=300.0)
-                return True
+            client = HttpClientRegistry.get("ollama")
+            # 1. Check if exists
+            resp = await client.get(check_url, timeout=10.0)
+            if resp.status_code == 200:
+                models_data = resp.json().get('models')
+                if models_data:
+                    models = [m['name'] for m in models_data]
+                    if self.model_name in models or f"{self.model_name}:latest" in models:
+                        logger.info(f"✅ Model {self.model_name} already present.")
+                        return True
+
+            # 2. Pull if missing
+            logger.info(f"📥 Pulling model {self.model_name} (this may take a while)...")
+            await client.post(pull_url, json={"name": self.model_name, "stream": False}, timeout=300.0)
+            return True
         except Exception as e:
             logger.error(f"❌ Failed to ensure model: {e}")
             return False
@@ -1,6 +1,7 @@
 import httpx
 import logging
 from .interfaces import LLMDriver
+from .services.http_clients import HttpClientRegistry
 
 logger = logging.getLogger("Gravitas_L2")
 
@@ -43,36 +44,37 @@ class DeepInfraDriver(LLMDriver):
         # RETRY CONFIG
         max_retries = 3
         base_delay = 1.0
+        # Pooled: retries reuse the kept-alive (TLS) connection instead of dialing again
+        client = HttpClientRegistry.get("deepinfra")
 
         for attempt in range(max_retries):
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(self.base_url, headers=headers, json=payload)
-                    
-                    # 1. Success
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        # --- STATS CAPTURE ---
-                        from .database import db
-                        usage = data.get("usage", {})
-                        await db.log_usage(
-                            model=self.model_name,
-                            layer="L2",
-                            prompt_tokens=usage.get("prompt_tokens", 0),
-                            completion_tokens=usage.get("completion_tokens", 0),
-                            duration_ms=0 
-                        )
-                        return data['choices'][0]['message']['content']
+                response = await client.post(self.base_url, headers=headers, json=payload, timeout=30.0)
 
-                    # 2. Fatal Errors (Auth / Bad Request) - Do not retry
-                    if 400 <= response.status_code < 500:
-                        error_msg = f"L2 CLIENT ERROR {response.status_code}: {response.text}"
-                        logger.error(error_msg)
-                        return f"⚠️ {error_msg}"
-                    
-                    # 3. Server Errors (5xx) - Retry
-                    logger.warning(f"⚠️ L2 RETRY {attempt+1}/{max_retries}: Server Error {response.status_code}")
+                # 1. Success
+                if response.status_code == 200:
+                    data = response.json()
+
+                    # --- STATS CAPTURE ---
+                    from .database import db
+                    usage = data.get("usage", {})
+                    await db.log_usage(
+                        model=self.model_name,
+                        layer="L2",
+                        prompt_tokens=usage.get("prompt_tokens", 0),
+                        completion_tokens=usage.get("completion_tokens", 0),
+                        duration_ms=0 
+                    )
+                    return data['choices'][0]['message']['content']
+
+                # 2. Fatal Errors (Auth / Bad Request) - Do not retry
+                if 400 <= response.status_code < 500:
+                    error_msg = f"L2 CLIENT ERROR {response.status_code}: {response.text}"
+                    logger.error(error_msg)
+                    return f"⚠️ {error_msg}"
+
+                # 3. Server Errors (5xx) - Retry
+                logger.warning(f"⚠️ L2 RETRY {attempt+1}/{max_retries}: Server Error {response.status_code}")
 
             except httpx.RequestError as e:
                 # 4. Connection Failures - Retry
@@ -1,20 +1,40 @@
 import os
+import asyncio
 import logging
 import shutil
-import uuid
-import asyncio
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
 from qdrant_client.http import models
 from datetime import datetime
 
+from ..manifest import ManifestEntry, hash_content, make_point_id, make_blob_key
+from ..pipeline import SourceFile, Stage, StagedPipeline, discover_files
+
 logger = logging.getLogger("Gravitas_LIBRARIAN")
 
+@dataclass
+class LibrarianWork:
+    """One changed file moving through the Librarian pipeline."""
+    source: SourceFile
+    raw_content: str
+    content_hash: str
+    mtime: float
+    point_id: str
+    previous: Optional[ManifestEntry] = None
+    summary: str = ""
+
+    @property
+    def blob_key(self) -> str:
+        return make_blob_key(self.point_id, prefix="librarian")
+
 class LibrarianAgent:
     """
     The Librarian: An autonomous agent for processing documentation and code.
     Scans docs/ and app/ directories, generates AI summaries, and indexes them.
     Follows the Night Shift architecture.
     """
+    MANIFEST_NAMESPACE = "librarian"
+
     def __init__(self, container):
         self.container = container
         from ..config import config
@@ -38,84 +58,151 @@ class LibrarianAgent:
 
     async def process_docs(self) -> Dict[str, Any]:
         """
-        Scan docs/ and app/ directories.
-        1. Upload Raw Content to MinIO (Blob).
-        2. Generate AI Summary using L1.
-        3. Ingest Summary to Qdrant (Index).
+        Scan docs/ and app/ directories through a staged pipeline:
+        1. Read + hash files (thread pool).
+        2. Upload Raw Content to MinIO (Blob), bounded concurrency.
+        3. Generate AI Summary using L1.
+        4. Ingest Summaries to Qdrant (Index), embedded in batches across files.
+        Files whose content hash matches the manifest are skipped, so a nightly
+        run over an unchanged tree makes no L1, MinIO or Qdrant calls.
         """
+        from ..config import config
         paths = self.scan_dirs if isinstance(self.scan_dirs, list) else [self.scan_dirs]
-        processed_count = 0
-        chunks_ingested = 0
-        
+        manifest = self.container.manifest
+        memory = self.container.memory
+        known = manifest.load(self.MANIFEST_NAMESPACE) if manifest else {}
+        seen = set()
+        counts = {"processed": 0, "skipped": 0, "ingested": 0}
+
+        roots = []
         for path in paths:
             if not os.path.exists(path):
                 logger.warning(f"⚠️ LIBRARIAN: Directory {path} not found.")
                 continue
-
             logger.info(f"🚀 LIBRARIAN: Scanning {path}...")
-            
-            for root, _, files in os.walk(path):
-                # Skip __pycache__ and other noise
-                if "__pycache__" in root or ".git" in root:
-                    continue
-
-                for file in files:
-                    # Support .md, .txt, and .py
-                    if file.endswith((".md", ".txt", ".py")):
-                        full_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(full_path, path)
-                        
-                        try:
-                            with open(full_path, 'r', encoding='utf-8') as f:
-                                raw_content = f.read()
-                                
-                            if not raw_content.strip():
-                                continue
-
-                            # 1. Upload Raw Content to MinIO (Blob)
-                            blob_key = f"librarian_{uuid.uuid4().hex}"
-                            success = await self.container.storage.upload(blob_key, raw_content)
-                            if not success:
-                                logger.error(f"❌ Failed to upload {rel_path} to storage.")
-                                continue
-
-                            # 2. Generate AI Summary
-                            summary = await self.summarize(raw_content)
-
-                            # 3. Ingest Summary to Qdrant (Index)
-                            if self.container.memory and self.container.memory.client:
-                                vector = await asyncio.to_thread(self.container.memory.embedder.encode, summary)
-                                
-                                payload = {
-                                    "source": rel_path,
-                                    "blob_key": blob_key,
-                                    "type": "librarian_ai_summary",
-                                    "summary_preview": summary[:500],
-                                    "timestamp": datetime.now().isoformat()
-                                }
-                                
-                                self.container.memory.client.upsert(
-                                    collection_name=self.container.memory.collection_name,
-                                    points=[
-                                        models.PointStruct(
-                                            id=str(uuid.uuid4()),
-                                            vector=vector.tolist(),
-                                            payload=payload
-                                        )
-                                    ]
-                                )
-                                chunks_ingested += 1
-                            else:
-                                logger.warning("⚠️ Memory not available, skipping vector indexing.")
-
-                            processed_count += 1
-                            logger.info(f"✅ Librarian processed: {rel_path} -> {blob_key}")
-
-                        except Exception as e:
-                            logger.error(f"❌ Librarian failed on {rel_path}: {e}")
+            roots.append((path, os.path.basename(os.path.normpath(path))))
+        scanned_roots = [root_name for _, root_name in roots]
+
+        async def discover():
+            async for source in discover_files(roots):
+                seen.add(source.key)
+                yield source
+
+        def read_file(full_path: str):
+            with open(full_path, 'r', encoding='utf-8') as f:
+                raw_content = f.read()
+            return raw_content, hash_content(raw_content)
+
+        async def read(source: SourceFile) -> Optional[LibrarianWork]:
+            entry = known.get(source.key)
+            mtime = await asyncio.to_thread(os.path.getmtime, source.full_path)
+            if entry and entry.mtime == mtime:
+                counts["skipped"] += 1
+                return None
+
+            raw_content, content_hash = await asyncio.to_thread(read_file, source.full_path)
+            if entry and entry.content_hash == content_hash:
+                manifest.upsert(self.MANIFEST_NAMESPACE, [
+                    ManifestEntry(source.key, content_hash, mtime, entry.point_ids)
+                ])
+                counts["skipped"] += 1
+                return None
+
+            if not raw_content.strip():
+                # Emptied file: drop the previous summary point and its blob
+                if entry and memory:
+                    await memory.delete(entry.point_ids)
+                    manifest.remove(self.MANIFEST_NAMESPACE, [source.key])
+                return None
+
+            point_id = make_point_id(source.key, 0, content_hash, kind="librarian_ai_summary")
+            return LibrarianWork(source, raw_content, content_hash, mtime, point_id, entry)
+
+        async def upload(work: LibrarianWork) -> Optional[LibrarianWork]:
+            if not await self.container.storage.upload(work.blob_key, work.raw_content):
+                logger.error(f"❌ Failed to upload {work.source.rel_path} to storage.")
+                return None
+            return work
+
+        async def summarize(work: LibrarianWork) -> LibrarianWork:
+            work.summary = await self.summarize(work.raw_content)
+            return work
+
+        batch: List[LibrarianWork] = []
+
+        async def index(work: LibrarianWork):
+            batch.append(work)
+            if len(batch) >= config.INGEST_BATCH_SIZE:
+                await flush()
+
+        async def flush():
+            if not batch:
+                return
+            if memory and memory.client:
+                try:
+                    vectors = await memory.embed_many([w.summary for w in batch])
+                    timestamp = datetime.now().isoformat()
+                    points = [
+                        models.PointStruct(
+                            id=work.point_id,
+                            # Sparse side indexes the raw content so exact identifiers still match
+                            vector=await memory.build_vector(vector, work.raw_content),
+                            payload={
+                                "source": work.source.rel_path,
+                                "blob_key": work.blob_key,
+                                "type": "librarian_ai_summary",
+                                "summary_preview": work.summary[:500],
+                                "timestamp": timestamp
+                            }
+                        )
+                        for work, vector in zip(batch, vectors)
+                    ]
+                    await memory.upsert_points(points=points)
+                    counts["ingested"] += len(points)
+
+                    # Changed files: retire the previous summary point and its blob
+                    for work in batch:
+                        if work.previous:
+                            await memory.delete(work.previous.point_ids)
+                    if manifest:
+                        manifest.upsert(self.MANIFEST_NAMESPACE, [
+                            ManifestEntry(w.source.key, w.content_hash, w.mtime, [w.point_id]) for w in batch
+                        ])
+                except Exception as e:
+                    logger.error(f"❌ Librarian failed to index {len(batch)} summaries: {e}")
+            else:
+                logger.warning("⚠️ Memory not available, skipping vector indexing.")
+
+            for work in batch:
+                counts["processed"] += 1
+                logger.info(f"✅ Librarian processed: {work.source.rel_path} -> {work.blob_key}")
+            batch.clear()
+
+        pipeline = StagedPipeline("librarian", [
+            Stage("read", read, workers=config.INGEST_READ_WORKERS, queue_size=config.INGEST_QUEUE_SIZE),
+            Stage("upload", upload, workers=config.INGEST_UPLOAD_CONCURRENCY, queue_size=config.INGEST_QUEUE_SIZE),
+            Stage("summarize", summarize, workers=config.LIBRARIAN_SUMMARY_CONCURRENCY, queue_size=config.INGEST_QUEUE_SIZE),
+            Stage("index", index, workers=1, queue_size=config.INGEST_QUEUE_SIZE, on_close=flush),
+        ])
+        stages = await pipeline.run(discover())
+
+        # Removed files: only judge entries under roots that were actually scanned
+        removed_count = 0
+        if manifest and memory:
+            removed = [
+                entry for key, entry in known.items()
+                if key not in seen and key.split("/", 1)[0] in scanned_roots
+            ]
+            for entry in removed:
+                await memory.delete(entry.point_ids)
+            manifest.remove(self.MANIFEST_NAMESPACE, [entry.path for entry in removed])
+            removed_count = len(removed)
 
         return {
-            "files_processed": processed_count, 
-            "chunks_ingested": chunks_ingested,
+            "files_processed": counts["processed"], 
+            "files_skipped": counts["skipped"],
+            "files_removed": removed_count,
+            "chunks_ingested": counts["ingested"],
+            "stages": stages,
             "status": "success"
         }
@@ -1,5 +1,8 @@
 import logging
+from typing import List
 from ..interfaces import LLMDriver, VectorMemory
+from ..config import config
+from ..chunker import estimate_tokens
 
 logger = logging.getLogger("Gravitas_SCOUT")
 
@@ -8,9 +11,34 @@ class ScoutAgent:
     The Scout: Deep Research Agent.
     Orchestrates memory retrieval and L3 synthesis for high-fidelity reporting.
     """
-    def __init__(self, l3_driver: LLMDriver, memory: VectorMemory):
+    TOP_K = 10  # Chunks that reach the L3 prompt
+
+    def __init__(self, l3_driver: LLMDriver, memory: VectorMemory, reranker=None):
         self.l3 = l3_driver
         self.memory = memory
+        self.reranker = reranker
+        self.rerank_candidates = config.RERANK_CANDIDATES
+
+    async def retrieve(self, query: str) -> List[str]:
+        """
+        Dense retrieval, optionally re-ranked.
+        With a reranker, over-fetches rerank_candidates hits and keeps the TOP_K the
+        cross-encoder scores highest, so the paid L3 prompt carries fewer irrelevant chunks.
+        """
+        if not self.reranker:
+            return await self.memory.search(query, top_k=self.TOP_K)
+
+        candidates = await self.memory.search_with_scores(query, top_k=max(self.rerank_candidates, self.TOP_K))
+        kept = await self.reranker.rerank(query, candidates, top_k=self.TOP_K)
+
+        if candidates:
+            all_tokens = sum(estimate_tokens(r.content) for r in candidates)
+            kept_tokens = sum(estimate_tokens(r.content) for r in kept)
+            logger.info(
+                f"✂️ RERANK: kept {len(kept)}/{len(candidates)} chunks, "
+                f"~{kept_tokens} context tokens to L3 (~{all_tokens - kept_tokens} saved vs all {len(candidates)})."
+            )
+        return [r.content for r in kept]
 
     async def research(self, query: str) -> str:
         """
@@ -22,8 +50,8 @@ class ScoutAgent:
         logger.info(f"🔭 DEPLOYING SCOUT for research: '{query}'")
 
         # 1. Retrieve Knowledge
-        # Scout uses a larger context window (top_k=10) for deep reasoning.
-        context_chunks = await self.memory.search(query, top_k=10)
+        # Scout uses a larger context window (TOP_K=10) for deep reasoning.
+        context_chunks = await self.retrieve(query)
         
         if not context_chunks:
             context_text = "No specific local context found in Gravitas memory. Use general knowledge."
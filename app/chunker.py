@@ -0,0 +1,274 @@
+import re
+import ast
+import logging
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger("Gravitas_CHUNKER")
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (chars / 4), same heuristic the LLM wrappers use."""
+    return len(text) // 4
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yields lines (with their newline) without materializing a list of them."""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+@dataclass
+class Chunk:
+    text: str
+    start_line: int
+    end_line: int
+    section: Optional[str] = None
+
+
+@dataclass
+class _Piece:
+    """A contiguous span of the source; pieces are packed into chunks."""
+    text: str
+    start_line: int
+    section: Optional[str]
+    tokens: int
+    kind: str = "prose"  # "code" splits on lines, "prose" on paragraphs then sentences
+
+    @property
+    def end_line(self) -> int:
+        return self.start_line + self.text.rstrip("\n").count("\n")
+
+
+class Chunker:
+    """
+    Structure-aware chunking with token targets.
+    - .py: one unit per top-level function/class (oversized classes per method), via ast.
+    - .md: one unit per heading section (heading path kept as the chunk section).
+    - other: paragraphs, then sentences.
+    Small adjacent units are packed up to target_tokens; a unit over max_tokens is split
+    and its consecutive chunks share overlap_tokens of trailing context.
+    Markdown and text are consumed line by line, so only the current section is buffered.
+    """
+
+    def __init__(
+        self,
+        target_tokens: int = None,
+        max_tokens: int = None,
+        overlap_tokens: int = None,
+        count_tokens: Callable[[str], int] = estimate_tokens
+    ):
+        from .config import config
+        self.target_tokens = target_tokens or config.CHUNK_TARGET_TOKENS
+        self.max_tokens = max(max_tokens or config.CHUNK_MAX_TOKENS, self.target_tokens)
+        self.overlap_tokens = overlap_tokens if overlap_tokens is not None else config.CHUNK_OVERLAP_TOKENS
+        self.count_tokens = count_tokens
+
+    # --- Entry points ---
+
+    def chunk_text(self, text: str, file_type: str = "txt") -> Iterator[Chunk]:
+        """Chunks an in-memory document. file_type is the extension without the dot."""
+        if file_type == "py":
+            pieces = self._python_pieces(text)
+        else:
+            pieces = self._prose_pieces(iter_lines(text), headings=file_type == "md")
+        yield from self._pack(pieces)
+
+    def chunk_file(self, path: str) -> Iterator[Chunk]:
+        """Chunks a file, streaming it from disk (Python source is parsed whole)."""
+        file_type = path.rsplit(".", 1)[-1] if "." in path else "txt"
+        with open(path, "r", encoding="utf-8") as f:
+            if file_type == "py":
+                yield from self.chunk_text(f.read(), "py")
+            else:
+                yield from self._pack(self._prose_pieces(f, headings=file_type == "md"))
+
+    # --- Units ---
+
+    def _piece(self, text: str, start_line: int, section: Optional[str], kind: str) -> _Piece:
+        return _Piece(text=text, start_line=start_line, section=section, tokens=self.count_tokens(text), kind=kind)
+
+    def _python_pieces(self, source: str) -> Iterator[_Piece]:
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            logger.debug(f"⚠️ CHUNKER: Not valid Python ({e}), chunking as text.")
+            yield from self._prose_pieces(iter_lines(source), headings=False)
+            return
+
+        # offsets[i] = character offset of line i + 1
+        offsets = [0]
+        for line in iter_lines(source):
+            offsets.append(offsets[-1] + len(line))
+        yield from self._code_pieces(source, offsets, tree.body, 1, len(offsets) - 1, None)
+
+    def _code_pieces(self, source, offsets, body, first: int, last: int, prefix: Optional[str]) -> Iterator[_Piece]:
+        """Pieces covering lines first..last: each def/class in body, plus the code between them."""
+        def span(a: int, b: int) -> str:
+            return source[offsets[a - 1]:offsets[b]]
+
+        cursor = first
+        for node in body:
+            if not isinstance(node, _DEFS):
+                continue
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            # Comments directly above a definition belong to it
+            while start - 1 >= cursor and span(start - 1, start - 1).lstrip().startswith("#"):
+                start -= 1
+            if start > cursor and span(cursor, start - 1).strip():
+                yield self._piece(span(cursor, start - 1), cursor, prefix, "code")
+
+            name = f"{prefix}.{node.name}" if prefix else node.name
+            text = span(start, node.end_lineno)
+            if isinstance(node, ast.ClassDef) and self.count_tokens(text) > self.max_tokens:
+                yield from self._code_pieces(source, offsets, node.body, start, node.end_lineno, name)
+            else:
+                yield self._piece(text, start, name, "code")
+            cursor = node.end_lineno + 1
+
+        if cursor <= last and span(cursor, last).strip():
+            yield self._piece(span(cursor, last), cursor, prefix, "code")
+
+    def _prose_pieces(self, lines: Iterable[str], headings: bool) -> Iterator[_Piece]:
+        """
+        Sections (split at headings when `headings`) from a line stream. A section that
+        outgrows max_tokens is released at the next blank line, so memory stays bounded.
+        """
+        titles = []  # (level, title) stack
+        buf: List[str] = []
+        buf_tokens = 0
+        start = 1
+        in_fence = False
+
+        def section() -> Optional[str]:
+            return " > ".join(title for _, title in titles) or None
+
+        lineno = 0
+        for lineno, line in enumerate(lines, start=1):
+            if headings and line.lstrip().startswith(("```", "~~~")):
+                in_fence = not in_fence
+            heading = _HEADING.match(line) if headings and not in_fence else None
+
+            if heading or (buf_tokens > self.max_tokens and not line.strip() and not in_fence):
+                text = "".join(buf)
+                if text.strip():
+                    yield self._piece(text, start, section(), "prose")
+                buf, buf_tokens, start = [], 0, lineno
+
+            if heading:
+                level = len(heading.group(1))
+                while titles and titles[-1][0] >= level:
+                    titles.pop()
+                titles.append((level, heading.group(2)))
+
+            buf.append(line)
+            buf_tokens += self.count_tokens(line)
+
+        text = "".join(buf)
+        if text.strip():
+            yield self._piece(text, start, section(), "prose")
+
+    # --- Splitting and packing ---
+
+    def _segments(self, piece: _Piece, texts: List[str]) -> List[_Piece]:
+        """Sub-pieces for consecutive texts that concatenate to piece.text."""
+        out = []
+        line = piece.start_line
+        for text in texts:
+            if text:
+                out.append(self._piece(text, line, piece.section, piece.kind))
+                line += text.count("\n")
+        return out
+
+    def _split(self, piece: _Piece) -> List[_Piece]:
+        """Breaks an oversized piece into pieces no larger than max_tokens (where possible)."""
+        if piece.kind == "code":
+            texts = list(iter_lines(piece.text))
+        else:
+            texts = self._paragraphs(piece.text)
+            if len(texts) <= 1:
+                cuts = [0] + [m.end() for m in _SENTENCE_END.finditer(piece.text)] + [len(piece.text)]
+                texts = [piece.text[a:b] for a, b in zip(cuts, cuts[1:])]
+
+        if len(texts) <= 1:
+            # One unbreakable line/sentence: hard cut by characters
+            size = max(1, len(piece.text) * self.max_tokens // max(piece.tokens, 1))
+            return self._segments(piece, [piece.text[i:i + size] for i in range(0, len(piece.text), size)])
+
+        out = []
+        for sub in self._segments(piece, texts):
+            out.extend(self._split(sub) if sub.tokens > self.max_tokens else [sub])
+        return out
+
+    @staticmethod
+    def _paragraphs(text: str) -> List[str]:
+        paragraphs, current = [], ""
+        for line in iter_lines(text):
+            current += line
+            if not line.strip() and current.strip():
+                paragraphs.append(current)
+                current = ""
+        if current:
+            paragraphs.append(current)
+        return paragraphs
+
+    def _emit(self, buf: List[_Piece]) -> Optional[Chunk]:
+        text = "".join(p.text for p in buf).strip("\n").rstrip()
+        if not text.strip():
+            return None
+        sections = list(dict.fromkeys(p.section for p in buf if p.section))
+        return Chunk(
+            text=text,
+            start_line=buf[0].start_line,
+            end_line=buf[-1].end_line,
+            section=", ".join(sections) or None
+        )
+
+    def _overlap(self, buf: List[_Piece]) -> List[_Piece]:
+        """Trailing pieces (never the whole chunk) that fit in overlap_tokens."""
+        tail, tokens = [], 0
+        for piece in reversed(buf[1:]):
+            if tokens + piece.tokens > self.overlap_tokens:
+                break
+            tail.insert(0, piece)
+            tokens += piece.tokens
+        return tail
+
+    def _pack(self, pieces: Iterable[_Piece]) -> Iterator[Chunk]:
+        buf: List[_Piece] = []
+        buf_tokens = 0
+        fresh = 0  # Pieces in buf that are not overlap from the previous chunk
+
+        for unit in pieces:
+            oversized = unit.tokens > self.max_tokens
+            for piece in (self._split(unit) if oversized else [unit]):
+                # A split unit starts its own chunk instead of trailing the previous one
+                if fresh and (oversized or buf_tokens + piece.tokens > self.target_tokens):
+                    chunk = self._emit(buf)
+                    if chunk:
+                        yield chunk
+                    # Overlap only continues the same section
+                    buf = self._overlap(buf) if piece.section == buf[-1].section else []
+                    buf_tokens = sum(p.tokens for p in buf)
+                    fresh = 0
+                elif buf and not fresh and piece.section != buf[-1].section:
+                    buf, buf_tokens = [], 0
+                buf.append(piece)
+                buf_tokens += piece.tokens
+                fresh += 1
+                oversized = False
+
+        if fresh:
+            chunk = self._emit(buf)
+            if chunk:
+                yield chunk
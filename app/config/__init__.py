@@ -34,12 +34,37 @@ class Settings(BaseSettings):
     # === MEMORY & STORAGE (Gravitas Grounded Research) ===
     QDRANT_HOST: str = "Gravitas_qdrant"
     QDRANT_PORT: int = 6333
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = False  # gRPC transport for lower per-call overhead
+    QDRANT_TIMEOUT_SECONDS: int = 10
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 10000  # float16 query/summary vectors (~7.5 MiB at 384 dims)
+    SEARCH_BLOB_CONCURRENCY: int = 8  # Parallel blob GETs per search
+    SEARCH_BLOB_DEADLINE_SECONDS: float = 2.0  # Slow blobs are dropped, not waited on
+    RERANK_ENABLED: bool = True  # Cross-encoder second stage for Scout retrieval
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 30  # Dense hits scored by the cross-encoder
+    RERANK_BATCH_SIZE: int = 16
+    RERANK_BUDGET_SECONDS: float = 1.5  # Exceeded -> keep dense order
+    CHUNK_TARGET_TOKENS: int = 192  # Packing target (all-MiniLM-L6-v2 truncates at 256 word pieces)
+    CHUNK_MAX_TOKENS: int = 256  # Larger functions/sections are split
+    CHUNK_OVERLAP_TOKENS: int = 32  # Carried between chunks of the same section
+    INGEST_BATCH_SIZE: int = 64  # Chunks per encode() call / Qdrant upsert
+    INGEST_READ_WORKERS: int = max(2, os.cpu_count() or 2)  # Parallel read/hash/chunk of files
+    INGEST_READ_PROCESSES: int = 0  # >0 chunks in a process pool (multi-core); 0 uses threads
+    INGEST_UPLOAD_CONCURRENCY: int = 8  # In-flight MinIO uploads during ingest
+    INGEST_QUEUE_SIZE: int = 32  # Files buffered between pipeline stages (back-pressure)
+    LIBRARIAN_SUMMARY_CONCURRENCY: int = 1  # Parallel L1 summaries (one GPU)
+    INGEST_MANIFEST_PATH: str = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "ingest_manifest.db"
+    )
     
     MINIO_ENDPOINT: str = "Gravitas_minio:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "gravitas-blobs"
     MINIO_SECURE: bool = False
+    BLOB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Read-through cache in front of MinIO (0 disables)
+    BLOB_CACHE_TTL_SECONDS: float = 0.0  # 0 = no expiry (blob keys are immutable)
 
     # Deprecated (Chroma)
     CHROMA_URL: str = "http://chroma_db:8000" 
@@ -49,6 +74,10 @@ class Settings(BaseSettings):
         os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
     ]
 
+    # === HEALTH STREAM ===
+    HEALTH_SAMPLE_INTERVAL: float = 5.0  # One shared probe per interval, fanned out to all SSE clients
+    HEALTH_STREAM_KEEPALIVE: float = 15.0  # SSE comment sent when nothing changed for this long
+
     # === DATABASE (Postgres) ===
     DB_HOST: str = "Gravitas_postgres"
     DB_PORT: int = 5432
@@ -56,6 +85,68 @@ class Settings(BaseSettings):
     DB_PASS: str = "Gravitas_pass"
     DB_NAME: str = "chat_history"
 
+    # === TELEMETRY SERVICE (writer side) ===
+    TELEMETRY_QUEUE_SIZE: int = 10000  # Events buffered in the service before /log returns 503
+    TELEMETRY_WRITERS: int = 4  # Concurrent COPY writer tasks sharing the DB pool
+    TELEMETRY_WRITE_BATCH_MIN: int = 50  # Batch written as soon as this many events are queued
+    TELEMETRY_WRITE_BATCH_MAX: int = 2000  # Upper bound per COPY when the queue is deep
+    TELEMETRY_WRITE_TIMEOUT: float = 2.0  # Max wait to fill a min-size batch when traffic is light
+    TELEMETRY_DB_POOL_SIZE: int = 10
+    TELEMETRY_MAINTENANCE_INTERVAL: float = 60.0  # Seconds between rollup/partition/retention passes
+    TELEMETRY_PARTITION_DAYS_AHEAD: int = 3  # Daily raw partitions created ahead of time
+    TELEMETRY_RAW_RETENTION_DAYS: int = 14  # Raw partitions older than this are dropped
+    TELEMETRY_MINUTE_ROLLUP_RETENTION_DAYS: int = 30
+    TELEMETRY_HOUR_ROLLUP_RETENTION_DAYS: int = 400
+    TELEMETRY_HISTOGRAM_ACCURACY: float = 0.01  # Relative error of latency percentiles
+
+    # === TRACING (W3C traceparent across supervisor/gatekeeper/guardian/wrappers) ===
+    TRACING_ENABLED: bool = True
+    TRACE_BUFFER_SPANS: int = 10000  # Finished spans kept in memory per service for /traces
+    TRACE_EXPORT_PATH: str = ""  # JSONL span file; on a shared volume any service's /traces shows every hop
+    TRACE_EXPORT_MAX_MB: int = 50  # Span file rotated to <path>.1 beyond this size
+    TRACE_OTLP_ENDPOINT: str = ""  # OTLP/HTTP collector base URL, e.g. http://otel-collector:4318
+    TRACE_EXPORT_INTERVAL: float = 2.0  # Seconds between background export batches
+
+    # === LIVE SHELL STATS (ShellRegistry.get_live_stats) ===
+    SHELL_STATS_REFRESH_INTERVAL: float = 60.0  # Seconds between pulls from the telemetry service
+    SHELL_STATS_WINDOW_MINUTES: float = 15.0  # Percentile window fetched on each pull
+    SHELL_STATS_EWMA_ALPHA: float = 0.3  # Weight of the newest window mean
+    SHELL_STATS_MAX_AGE: float = 600.0  # Telemetry stats older than this fall back to local/YAML figures
+
+    # === LOAD-AWARE ROUTING (SupervisorEngine.determine_routing) ===
+    LOAD_SAMPLE_TTL: float = 2.0  # Seconds a GPU probe is reused across routing decisions
+    ROUTING_DEFAULT_DEADLINE_MS: float = 0.0  # Latency SLO for requests without deadline_ms (0 = none); 429 if unmeetable
+    ROUTING_MAX_SYSTEM_LOAD: float = 90.0  # Host load percentage above which L1 work spills to L2
+    MODEL_LOAD_ESTIMATE_MS: float = 15000.0  # Model swap cost until LOAD_LATENCY has been measured
+
+    # === SUPERVISOR WORKER POOL ===
+    SUPERVISOR_WORKERS_L1: int = 1  # Local GPU serves one model at a time; more only helps with OLLAMA_NUM_PARALLEL
+    SUPERVISOR_WORKERS_L2: int = 4  # Concurrent DeepInfra calls (provider rate limit)
+    SUPERVISOR_WORKERS_L3: int = 4  # Concurrent Gemini/Claude calls (provider rate limit)
+    SUPERVISOR_QUEUE_MAX: int = 100  # Waiting requests per tier before new ones get 503 + Retry-After
+    DISCONNECT_POLL_INTERVAL: float = 0.5  # Seconds between client-disconnect checks while a request runs
+
+    # === L1 MODEL AFFINITY (AffinityQueue) ===
+    L1_AFFINITY_MAX_BATCH: int = 8  # Hot-model requests served in a row while other shells wait
+    L1_STARVATION_SECONDS: dict[int, float] = {  # Priority (and below in urgency) -> max wait before forced service
+        -1: 0.0,  # push_to_front: always next, even if it costs a model switch
+        0: 30.0,
+        10: 120.0,
+    }
+
+    # === HTTP CLIENT POOLS (HttpClientRegistry) ===
+    HTTP_POOL_MAX_CONNECTIONS: int = 20  # Per upstream, unless overridden below
+    HTTP_POOL_LIMITS: dict[str, int] = {  # Upstream -> max connections
+        "ollama": 8,  # Beyond OLLAMA_NUM_PARALLEL requests only queue inside Ollama
+        "deepinfra": 32,
+        "gatekeeper": 50,  # One validation per chat request
+    }
+    HTTP_POOL_MAX_KEEPALIVE: int = 10  # Idle connections kept open per upstream
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = 60.0  # Seconds before an idle connection is closed
+    HTTP_POOL_TIMEOUT: float = 30.0  # Default request timeout (callers usually pass their own)
+    HTTP_POOL_CONNECT_TIMEOUT: float = 5.0
+    HTTP2_ENABLED: bool = True  # HTTPS upstreams negotiate HTTP/2 when h2 is installed
+
     # === GOVERNANCE (The Accountant) ===
     REF_COST_INPUT_1K: float = 0.0025
     REF_COST_OUTPUT_1K: float = 0.0100
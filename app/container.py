@@ -4,8 +4,9 @@ from .L1_local import LocalLlamaDriver
 from .L2_network import DeepInfraDriver
 from .L3_google import GoogleGeminiDriver
 from .memory import QdrantVectorStore, save_interaction, retrieve_short_term_memory
-from .storage import MinioConnector
+from .storage import MinioConnector, CachedObjectStore
 from .ingestor import DocumentIngestor
+from .manifest import IngestManifest
 from .telemetry import telemetry
 
 logger = logging.getLogger("Gravitas_CONTAINER")
@@ -58,18 +59,34 @@ class Container:
                 bucket_name=config.MINIO_BUCKET,
                 secure=config.MINIO_SECURE
             )
+            if config.BLOB_CACHE_MAX_BYTES > 0:
+                self.storage = CachedObjectStore(
+                    backend=self.storage,
+                    max_bytes=config.BLOB_CACHE_MAX_BYTES,
+                    ttl_seconds=config.BLOB_CACHE_TTL_SECONDS
+                )
             logger.info("✅ STORAGE (MinIO) READY.")
         except Exception as e:
             logger.error(f"❌ STORAGE INIT FAILURE: {e}")
             self.storage = None
 
-        # 5. MEMORY: VECTOR STORE (Qdrant)
+        # 5. MEMORY: INGEST MANIFEST (SQLite) + VECTOR STORE (Qdrant)
+        try:
+            self.manifest = IngestManifest(config.INGEST_MANIFEST_PATH)
+        except Exception as e:
+            logger.error(f"⚠️ RUNNING WITHOUT INGEST MANIFEST (full re-ingest on every run): {e}")
+            self.manifest = None
+
         try:
             if self.storage:
                 self.memory = QdrantVectorStore(
                     storage=self.storage,
                     host=config.QDRANT_HOST,
-                    port=config.QDRANT_PORT
+                    port=config.QDRANT_PORT,
+                    manifest=self.manifest,
+                    grpc_port=config.QDRANT_GRPC_PORT,
+                    prefer_grpc=config.QDRANT_PREFER_GRPC,
+                    timeout=config.QDRANT_TIMEOUT_SECONDS
                 )
                 logger.info("✅ MEMORY (Qdrant) READY.")
             else:
@@ -84,7 +101,8 @@ class Container:
             if self.memory and self.storage:
                 self.ingestor = DocumentIngestor(
                     vector_store=self.memory, 
-                    storage=self.storage
+                    storage=self.storage,
+                    manifest=self.manifest
                 )
                 logger.info("✅ INGESTOR READY.")
             else:
@@ -114,10 +132,20 @@ class Container:
             logger.error(f"❌ LIBRARIAN AGENT INIT FAILURE: {e}")
             self.librarian = None
 
-        # 10. AGENTS: THE SCOUT
+        # 10. AGENTS: THE SCOUT (optional cross-encoder re-rank stage)
+        self.reranker = None
+        if config.RERANK_ENABLED:
+            try:
+                from .reranker import CrossEncoderReranker
+                self.reranker = CrossEncoderReranker()
+                logger.info("✅ RERANKER READY.")
+            except Exception as e:
+                logger.error(f"❌ RERANKER INIT FAILURE: {e}. Scout will use dense order.")
+
+
         try:
             from .agents.scout import ScoutAgent
-            self.scout = ScoutAgent(l3_driver=self.l3_driver, memory=self.memory)
+            self.scout = ScoutAgent(l3_driver=self.l3_driver, memory=self.memory, reranker=self.reranker)
             logger.info("✅ SCOUT AGENT READY.")
         except Exception as e:
             logger.error(f"❌ SCOUT AGENT INIT FAILURE: {e}")
@@ -0,0 +1,96 @@
+import re
+import asyncio
+import hashlib
+import logging
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("Gravitas_EMBED_CACHE")
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str, casefold: bool = True) -> str:
+    """
+    Canonical form used as the cache key: NFKC, collapsed whitespace, trimmed.
+    Casefolding is safe for uncased models such as all-MiniLM-L6-v2.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.casefold() if casefold else text
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of text embeddings keyed on (model name, normalized text).
+    Vectors are stored as float16 (384 dims -> 768 bytes) and keys as SHA-1 digests,
+    so long texts such as Librarian summaries cost nothing beyond the vector.
+    """
+
+    def __init__(self, max_entries: int = 10000, dtype=np.float16, casefold: bool = True):
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self.casefold = casefold
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, model_name: str, text: str) -> bytes:
+        normalized = normalize_text(text, casefold=self.casefold)
+        return hashlib.sha1(f"{model_name}\x00{normalized}".encode("utf-8")).digest()
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        """Returns a float32 copy of the cached vector, or None."""
+        key = self._key(model_name, text)
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector.astype(np.float32)
+
+    def put(self, model_name: str, text: str, vector: np.ndarray):
+        key = self._key(model_name, text)
+        self._entries[key] = np.asarray(vector, dtype=self.dtype)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def encode(self, embedder, model_name: str, text: str) -> np.ndarray:
+        """Read-through encode: cached vector if present, else embedder.encode in a thread."""
+        cached = self.get(model_name, text)
+        if cached is not None:
+            return cached
+        vector = await asyncio.to_thread(embedder.encode, text)
+        self.put(model_name, text, vector)
+        return vector
+
+    async def encode_many(self, embedder, model_name: str, texts: List[str]) -> List[np.ndarray]:
+        """Read-through encode of several texts: one embedder.encode call for all the misses."""
+        vectors = [self.get(model_name, text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = await asyncio.to_thread(
+                embedder.encode, [texts[i] for i in missing], batch_size=len(missing)
+            )
+            for i, vector in zip(missing, encoded):
+                self.put(model_name, texts[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": sum(v.nbytes for v in self._entries.values()),
+            "max_entries": self.max_entries
+        }
@@ -0,0 +1,142 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("Gravitas_HEALTH_MONITOR")
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """
+    RFC 7386 JSON merge patch turning `old` into `new`: changed keys carry their new
+    value, removed keys are None, nested dicts are diffed recursively.
+    Returns {} when nothing changed.
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = merge_patch(old[key], value) if isinstance(value, dict) and isinstance(old[key], dict) else value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+@dataclass
+class Subscriber:
+    queue: asyncio.Queue
+    synced: bool = False  # Has received a full snapshot to apply deltas to
+
+
+class HealthBroadcaster:
+    """
+    One background sampler for the health snapshot, fanned out to every SSE client.
+    The probe runs once per interval no matter how many dashboards are connected;
+    clients get a full snapshot on connect and merge-patch deltas afterwards.
+    The sampler only runs while someone is subscribed.
+    """
+
+    def __init__(self, sample: Callable[[], Awaitable[Dict[str, Any]]], interval: float = 5.0, queue_size: int = 8):
+        self.sample = sample
+        self.interval = interval
+        self.queue_size = queue_size
+        self.latest: Optional[Dict[str, Any]] = None
+        self.version = 0
+        self.sampled_at = 0.0
+        self.samples = 0
+        self.subscribers: List[Subscriber] = []
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+
+    # --- Sampling ---
+
+    async def get(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Cached snapshot if younger than max_age (default: interval), else a fresh sample."""
+        max_age = self.interval if max_age is None else max_age
+        if self.latest is not None and time.monotonic() - self.sampled_at < max_age:
+            return self.latest
+        return await self.refresh()
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Samples now; concurrent callers share the same probe."""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._sample_and_publish())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, _future):
+        self._inflight = None
+
+    async def _sample_and_publish(self) -> Dict[str, Any]:
+        snapshot = await self.sample()
+        previous = self.latest
+        self.latest = snapshot
+        self.sampled_at = time.monotonic()
+        self.samples += 1
+        delta = merge_patch(previous, snapshot) if previous is not None else snapshot
+        if delta:
+            self.version += 1
+        for subscriber in list(self.subscribers):
+            if not subscriber.synced:
+                self._send(subscriber, "snapshot", snapshot)
+            elif delta:
+                self._send(subscriber, "delta", delta)
+        return snapshot
+
+    async def _run(self):
+        logger.info(f"📡 Health sampler started (every {self.interval}s)")
+        while self.subscribers:
+            started = time.monotonic()
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Health sample failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        logger.info("📡 Health sampler idle (no subscribers)")
+
+    # --- Fan-out ---
+
+    def _send(self, subscriber: Subscriber, kind: str, payload: Dict[str, Any]):
+        message: Tuple[str, int, Dict[str, Any]] = (kind, self.version, payload)
+        try:
+            subscriber.queue.put_nowait(message)
+            subscriber.synced = True
+        except asyncio.QueueFull:
+            # Slow client: drop its backlog and resync from the latest snapshot
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(("snapshot", self.version, self.latest))
+            subscriber.synced = True
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(asyncio.Queue(maxsize=self.queue_size))
+        if self.latest is not None:
+            self._send(subscriber, "snapshot", self.latest)
+        self.subscribers.append(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "samples": self.samples,
+            "version": self.version,
+            "interval": self.interval,
+        }
+
+    async def stop(self):
+        self.subscribers.clear()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -1,29 +1,85 @@
 import os
-import logging
-import uuid
 import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 from .interfaces import VectorMemory, ObjectStore
+from .manifest import IngestManifest, ManifestEntry, hash_content, hash_file, make_point_id, make_blob_key
+from .chunker import Chunker
+from .pipeline import SourceFile, Stage, StagedPipeline, discover_files
 
 logger = logging.getLogger("Gravitas_Ingestor")
 
+@dataclass
+class IngestWork:
+    """One changed file moving through the ingest pipeline."""
+    source: SourceFile
+    content_hash: str
+    mtime: float
+    documents: List[Tuple[str, Dict[str, Any]]]
+    ids: List[str]
+    previous: Optional[ManifestEntry] = None
+
+    @property
+    def blob_keys(self) -> List[str]:
+        return [make_blob_key(point_id) for point_id in self.ids]
+
+def read_and_chunk(chunker: Chunker, source: SourceFile) -> Tuple[str, list]:
+    """
+    Read stage job: content hash plus chunks with metadata. Module-level so it
+    can run in a worker process as well as a thread.
+    """
+    content_hash = hash_file(source.full_path)
+    documents = [
+        (chunk.text, {
+            "source": source.rel_path,
+            "chunk_index": i,
+            "file_type": source.file_type,
+            "section": chunk.section,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line
+        })
+        for i, chunk in enumerate(chunker.chunk_file(source.full_path))
+    ]
+    return content_hash, documents
+
 class DocumentIngestor:
     """
     Scans the local docs/ directory and populates the Gravitas Grounded Research Memory.
-    Updated for Phase 4.1: Uses async ingest() and separated storage.
+    Updated for Phase 4.1: Uses async ingest_many() and separated storage.
+    With a manifest, re-runs are incremental: unchanged files are skipped and
+    chunks of changed or removed files are deleted from the index.
     """
-    def __init__(self, vector_store: VectorMemory, storage: ObjectStore):
+    MANIFEST_NAMESPACE = "ingestor"
+    LEARNED_NAMESPACE = "learned"
+
+    def __init__(self, vector_store: VectorMemory, storage: ObjectStore, manifest: Optional[IngestManifest] = None):
         self.vector_store = vector_store
         self.storage = storage 
+        self.manifest = manifest
         from .config import config
         # Default docs path outside of container context might be different
         self.docs_path = config.DOCS_PATH
+        self.batch_size = config.INGEST_BATCH_SIZE
+        self.read_workers = config.INGEST_READ_WORKERS
+        self.read_processes = config.INGEST_READ_PROCESSES
+        self.upload_concurrency = config.INGEST_UPLOAD_CONCURRENCY
+        self.queue_size = config.INGEST_QUEUE_SIZE
+        self.chunker = Chunker()
 
-    def chunk_text(self, text: str, size: int = 1000) -> list[str]:
-        """Simple break by size (1000 chars as per Phase 4.3 requirements)."""
-        return [text[i:i+size] for i in range(0, len(text), size)]
+    def chunk_text(self, text: str, file_type: str = "txt") -> list[str]:
+        """Structure-aware chunks of an in-memory document (see Chunker)."""
+        return [chunk.text for chunk in self.chunker.chunk_text(text, file_type)]
 
     async def ingest_all(self) -> dict:
-        """Walks the docs/ folder and ingest everything. Returns a summary."""
+        """
+        Walks the docs/ folder and ingests everything through a staged pipeline:
+        discover -> read (thread pool: hash + chunk) -> upload (bounded MinIO
+        concurrency) -> embed (batches across files, one upsert per batch).
+        Bounded queues between stages keep memory flat. Returns a summary.
+        """
         if not self.vector_store:
             logger.error("❌ INGESTOR: No Vector Store connection.")
             return {"status": "error", "message": "No Vector Store connection."}
@@ -31,56 +87,183 @@ class DocumentIngestor:
         summary = {
             "status": "success",
             "files_processed": 0,
+            "files_skipped": 0,
+            "files_removed": 0,
             "chunks_ingested": 0,
+            "chunks_failed": 0,
+            "chunks_per_sec": 0.0,
             "errors": []
         }
+        start_time = time.perf_counter()
+
+        known = self.manifest.load(self.MANIFEST_NAMESPACE) if self.manifest else {}
+        seen = set()
+        touched = []  # Unchanged content with a new mtime
 
         # Handle both single path (string) and multiple paths (list)
         paths = self.docs_path if isinstance(self.docs_path, list) else [self.docs_path]
-        
+        roots = []
         for path in paths:
             if not os.path.exists(path):
                 msg = f"⚠️ INGESTOR: Directory {path} not found."
                 logger.warning(msg)
                 summary["errors"].append(msg)
                 continue
-
             logger.info(f"🚀 INGESTOR: Scanning {path}...")
-            
-            for root, _, files in os.walk(path):
-                # Skip __pycache__ and other noise
-                if "__pycache__" in root or ".git" in root:
-                    continue
-
-                for file in files:
-                    # Support .md, .txt, and .py
-                    if file.endswith((".md", ".txt", ".py")):
-                        full_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(full_path, path)
-                        
-                        try:
-                            with open(full_path, "r", encoding="utf-8") as f:
-                                content = f.read()
-                                
-                            if not content.strip():
-                                continue
-
-                            chunks = self.chunk_text(content)
-                            for i, chunk in enumerate(chunks):
-                                metadata = {
-                                    "source": rel_path,
-                                    "chunk_index": i,
-                                    "file_type": file.split(".")[-1]
-                                }
-                                await self.vector_store.ingest(chunk, metadata)
-                                summary["chunks_ingested"] += 1
-                                
-                            summary["files_processed"] += 1
-                            logger.info(f"✅ Ingested {file}: {len(chunks)} chunks")
-                        except Exception as e:
-                            error_msg = f"❌ Failed to ingest {file}: {str(e)}"
-                            logger.error(error_msg)
-                            summary["errors"].append(error_msg)
-
-        logger.info(f"✅ INGESTOR COMPLETE: {summary['files_processed']} files, {summary['chunks_ingested']} chunks.")
+            roots.append((path, os.path.basename(os.path.normpath(path))))
+        scanned_roots = [root_name for _, root_name in roots]
+
+        async def discover():
+            async for source in discover_files(roots):
+                seen.add(source.key)
+                yield source
+
+        async def read(source: SourceFile) -> Optional[IngestWork]:
+            entry = known.get(source.key)
+            try:
+                mtime = await asyncio.to_thread(os.path.getmtime, source.full_path)
+                if entry and entry.mtime == mtime:
+                    summary["files_skipped"] += 1
+                    return None
+
+                content_hash, documents = await asyncio.get_running_loop().run_in_executor(
+                    executor, read_and_chunk, self.chunker, source
+                )
+                if entry and entry.content_hash == content_hash:
+                    touched.append(ManifestEntry(source.key, content_hash, mtime, entry.point_ids))
+                    summary["files_skipped"] += 1
+                    return None
+
+                if not documents:
+                    # Emptied file: nothing to index, drop the previous version
+                    if entry:
+                        await self.vector_store.delete(entry.point_ids)
+                        self.manifest.remove(self.MANIFEST_NAMESPACE, [source.key])
+                    return None
+
+                ids = [make_point_id(source.key, i, content_hash) for i in range(len(documents))]
+                return IngestWork(source, content_hash, mtime, documents, ids, entry)
+            except Exception as e:
+                error_msg = f"❌ Failed to ingest {source.rel_path}: {str(e)}"
+                logger.error(error_msg)
+                summary["errors"].append(error_msg)
+                return None
+
+        upload_slots = asyncio.Semaphore(self.upload_concurrency)
+
+        async def upload_one(key: str, text: str) -> bool:
+            async with upload_slots:
+                return await self.storage.upload(key, text)
+
+        async def upload(work: IngestWork) -> Optional[IngestWork]:
+            uploaded = await asyncio.gather(
+                *(upload_one(key, text) for key, (text, _) in zip(work.blob_keys, work.documents))
+            )
+            if not all(uploaded):
+                error_msg = f"❌ Failed to upload blobs for {work.source.rel_path}"
+                logger.error(error_msg)
+                summary["errors"].append(error_msg)
+                summary["chunks_failed"] += len(work.documents)
+                return None
+            return work
+
+        # Embedding batches span files; whole files are flushed so each manifest
+        # entry is written only once all of its chunks are indexed.
+        batch: List[IngestWork] = []
+
+        async def embed(work: IngestWork):
+            batch.append(work)
+            summary["files_processed"] += 1
+            logger.info(f"✅ Queued {work.source.rel_path}: {len(work.documents)} chunks")
+            if sum(len(w.documents) for w in batch) >= self.batch_size:
+                await flush()
+
+        async def flush():
+            if not batch:
+                return
+            result = await self.vector_store.index_many(
+                [doc for w in batch for doc in w.documents],
+                ids=[pid for w in batch for pid in w.ids],
+                blob_keys=[key for w in batch for key in w.blob_keys],
+                batch_size=self.batch_size
+            )
+            summary["chunks_ingested"] += result.get("chunks_ingested", 0)
+            summary["chunks_failed"] += result.get("chunks_failed", 0)
+            if result.get("chunks_failed", 0) == 0:
+                for work in batch:
+                    # New version is live; retire the previous one
+                    if work.previous:
+                        await self.vector_store.delete(work.previous.point_ids)
+                if self.manifest:
+                    self.manifest.upsert(self.MANIFEST_NAMESPACE, [
+                        ManifestEntry(w.source.key, w.content_hash, w.mtime, w.ids) for w in batch
+                    ])
+            else:
+                # Leave these files out of the manifest; deterministic IDs make the retry idempotent.
+                logger.warning(f"⚠️ INGESTOR: Batch had failures, {len(batch)} files will be retried next run.")
+            batch.clear()
+
+        # Chunking is pure Python: threads overlap file I/O, worker processes also spread it across cores
+        executor = ProcessPoolExecutor(max_workers=self.read_processes) if self.read_processes > 0 else None
+        pipeline = StagedPipeline("ingestor", [
+            Stage("read", read, workers=self.read_workers, queue_size=self.queue_size),
+            Stage("upload", upload, workers=self.upload_concurrency, queue_size=self.queue_size),
+            Stage("embed", embed, workers=1, queue_size=self.queue_size, on_close=flush),
+        ])
+        try:
+            summary["stages"] = await pipeline.run(discover())
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.manifest:
+            self.manifest.upsert(self.MANIFEST_NAMESPACE, touched)
+
+            # Removed files: only judge entries under roots that were actually scanned
+            removed = [
+                entry for key, entry in known.items()
+                if key not in seen and key.split("/", 1)[0] in scanned_roots
+            ]
+            for entry in removed:
+                await self.vector_store.delete(entry.point_ids)
+            self.manifest.remove(self.MANIFEST_NAMESPACE, [entry.path for entry in removed])
+            summary["files_removed"] = len(removed)
+
+        elapsed = time.perf_counter() - start_time
+        summary["elapsed_seconds"] = round(elapsed, 3)
+        summary["chunks_per_sec"] = round(summary["chunks_ingested"] / elapsed, 2) if elapsed > 0 else 0.0
+
+        logger.info(
+            f"✅ INGESTOR COMPLETE: {summary['files_processed']} files, {summary['chunks_ingested']} chunks "
+            f"({summary['chunks_per_sec']} chunks/sec), {summary['files_skipped']} unchanged, "
+            f"{summary['files_removed']} removed."
+        )
         return summary
+
+    async def ingest_text(self, text: str, metadata: Dict[str, Any]) -> dict:
+        """
+        Indexes one in-memory document (e.g. a file pushed by the MCP learn tool).
+        Re-learning the same source replaces its previous chunks; identical content is a no-op.
+        """
+        source = metadata.get("source", "unknown")
+        content_hash = hash_content(text)
+        entry = self.manifest.get(self.LEARNED_NAMESPACE, source) if self.manifest else None
+        if entry and entry.content_hash == content_hash:
+            return {"status": "unchanged", "chunks_ingested": 0, "chunks_failed": 0}
+
+        file_type = source.rsplit(".", 1)[-1] if "." in source else "txt"
+        chunks = list(self.chunker.chunk_text(text, file_type))
+        documents = [
+            (chunk.text, {**metadata, "chunk_index": i, "section": chunk.section,
+                          "start_line": chunk.start_line, "end_line": chunk.end_line})
+            for i, chunk in enumerate(chunks)
+        ]
+        point_ids = [make_point_id(source, i, content_hash, kind="learned") for i in range(len(chunks))]
+        result = await self.vector_store.ingest_many(documents, batch_size=self.batch_size, ids=point_ids)
+
+        if result.get("chunks_failed", 0) == 0 and self.manifest:
+            if entry:
+                await self.vector_store.delete(entry.point_ids)
+            self.manifest.upsert(self.LEARNED_NAMESPACE, [ManifestEntry(source, content_hash, time.time(), point_ids)])
+
+        return {"status": "success" if result.get("chunks_failed", 0) == 0 else "partial", **result}
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Any, Tuple
 
 class LLMDriver(ABC):
     """Contract for AI Models (L1/L2/L3)."""
@@ -22,6 +23,19 @@ class ObjectStore(ABC):
         """Retrieves raw text content."""
         pass
 
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Removes a blob. Missing keys are not an error."""
+        pass
+
+@dataclass
+class SearchResult:
+    """A retrieved chunk with its relevance score and index payload."""
+    content: str
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+    point_id: Optional[str] = None
+
 class VectorMemory(ABC):
     """Contract for Vector Database (Qdrant)."""
     @abstractmethod
@@ -29,6 +43,16 @@ class VectorMemory(ABC):
         """Returns relevant text chunks."""
         pass
 
+    @abstractmethod
+    async def search_with_scores(self, query: str, top_k: int = 5) -> List[SearchResult]:
+        """Returns relevant chunks with scores and payloads, best first."""
+        pass
+
+    @abstractmethod
+    async def search_hybrid(self, query: str, top_k: int = 5) -> List[SearchResult]:
+        """Dense + sparse (lexical) retrieval fused by rank, best first."""
+        pass
+
     @abstractmethod
     async def ingest(self, text: str, metadata: Dict[str, Any]) -> bool:
         """
@@ -38,3 +62,36 @@ class VectorMemory(ABC):
         3. Upload embedding + metadata to VectorDB.
         """
         pass
+
+    @abstractmethod
+    async def ingest_many(
+        self,
+        documents: List[Tuple[str, Dict[str, Any]]],
+        batch_size: int = 64,
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Bulk variant of ingest() for (text, metadata) pairs.
+        Embeds and indexes in batches. Returns a summary dict with throughput.
+        Optional ids make re-ingestion idempotent (same id -> same point and blob).
+        """
+        pass
+
+    @abstractmethod
+    async def index_many(
+        self,
+        documents: List[Tuple[str, Dict[str, Any]]],
+        ids: List[str],
+        blob_keys: List[str],
+        batch_size: int = 64
+    ) -> Dict[str, Any]:
+        """
+        ingest_many() for documents whose blobs are already in the ObjectStore:
+        embeds and indexes only. Returns the same summary dict.
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, point_ids: List[str]) -> bool:
+        """Removes points and the blobs they reference."""
+        pass
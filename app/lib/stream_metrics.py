@@ -0,0 +1,124 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class StreamMetrics:
+    """
+    Timing of one streamed generation, filled in by the agent wrappers as the
+    response arrives. All timestamps are time.perf_counter() values.
+
+    Phases:
+        queue wait      task submitted -> generation started (supervisor side)
+        connect         generation started -> provider accepted the stream
+        first token     generation started -> first chunk carrying output
+        decode          first token -> last token
+    """
+    model: Optional[str] = None
+    tier: Optional[str] = None
+    queued_at: Optional[float] = None
+    started_at: Optional[float] = None
+    connected_at: Optional[float] = None
+    first_token_at: Optional[float] = None
+    last_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    chunks: int = 0
+    max_gap_s: float = 0.0  # Longest pause between two chunks (stall detection)
+    tokens: int = 0
+    prompt_tokens: int = 0
+    provider_decode_s: Optional[float] = None  # Provider-reported decode time (Ollama eval_duration)
+    load_s: Optional[float] = None  # Provider-reported model load time (Ollama load_duration)
+
+    def start(self, queued_at: Optional[float] = None):
+        self.started_at = time.perf_counter()
+        self.queued_at = queued_at
+
+    def mark_connected(self):
+        if self.connected_at is None:
+            self.connected_at = time.perf_counter()
+
+    def mark_token(self) -> bool:
+        """Records a chunk carrying output; returns True for the first one."""
+        now = time.perf_counter()
+        first = self.first_token_at is None
+        if first:
+            self.first_token_at = now
+            if self.connected_at is None:
+                self.connected_at = now
+        else:
+            self.max_gap_s = max(self.max_gap_s, now - self.last_token_at)
+        self.last_token_at = now
+        self.chunks += 1
+        return first
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    # --- Derived figures (None when the stream did not get that far) ---
+
+    @staticmethod
+    def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+        if start is None or end is None:
+            return None
+        return round((end - start) * 1000, 3)
+
+    @property
+    def queue_wait_ms(self) -> Optional[float]:
+        return self._ms(self.queued_at, self.started_at)
+
+    @property
+    def connect_ms(self) -> Optional[float]:
+        return self._ms(self.started_at, self.connected_at)
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        return self._ms(self.started_at, self.first_token_at)
+
+    @property
+    def total_ms(self) -> Optional[float]:
+        return self._ms(self.started_at, self.finished_at)
+
+    @property
+    def decode_s(self) -> Optional[float]:
+        if self.provider_decode_s:
+            return self.provider_decode_s
+        if self.first_token_at is None or self.last_token_at is None:
+            return None
+        return self.last_token_at - self.first_token_at
+
+    @property
+    def _decode_tokens(self) -> int:
+        # Provider decode time covers every generated token; our own clock starts at the first one
+        return self.tokens if self.provider_decode_s else self.tokens - 1
+
+    @property
+    def inter_token_ms(self) -> Optional[float]:
+        """Mean time per generated token after the first."""
+        decode = self.decode_s
+        if not decode or self.tokens < 2:
+            return None
+        return round(decode * 1000 / self._decode_tokens, 3)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Decode throughput (prefill/TTFT excluded)."""
+        decode = self.decode_s
+        if not decode or self.tokens < 2:
+            return None
+        return round(self._decode_tokens / decode, 3)
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "queue_wait_ms": self.queue_wait_ms,
+            "connect_ms": self.connect_ms,
+            "ttft_ms": self.ttft_ms,
+            "inter_token_ms": self.inter_token_ms,
+            "max_gap_ms": round(self.max_gap_s * 1000, 3) if self.chunks > 1 else None,
+            "tokens_per_second": self.tokens_per_second,
+            "total_ms": self.total_ms,
+            "load_ms": round(self.load_s * 1000, 3) if self.load_s is not None else None,
+            "tokens": self.tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "chunks": self.chunks,
+        }
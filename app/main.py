@@ -1,9 +1,12 @@
 from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .router import router as chat_router
+from .router import router as chat_router, health_monitor
 from .config import config
 from .container import container
+from .services.registry.shell_registry import ShellRegistry
+from .services.http_clients import HttpClientRegistry
+from dataclasses import asdict
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -20,8 +23,17 @@ async def lifespan(app: FastAPI):
         await container.l1_driver.ensure_model()
     else:
         print("⚠️ WARNING: L1 Backend (Ollama) not responding. L1 calls will fail or escalate.")
+    ShellRegistry.start_live_refresh()
     yield
     # SHUTDOWN
+    await ShellRegistry.stop_live_refresh()
+    await health_monitor.stop()
+    if container.memory:
+        await container.memory.close()
+    # Ship buffered telemetry before exiting
+    if container.telemetry:
+        await container.telemetry.close()
+    await HttpClientRegistry.aclose()
     await db.disconnect()
     print("🛑 Gravitas Shutting down...")
 
@@ -78,7 +90,8 @@ async def get_models(tier: str = None, provider: str = None):
         if provider and spec.provider != provider:
             continue
         
-        # Convert to dict for JSON response
+        # Convert to dict for JSON response (live = measured latency/throughput, YAML fallback)
+        live = ShellRegistry.get_live_stats(name)
         filtered_models[name] = {
             "name": spec.name,
             "tier": spec.tier.value,
@@ -86,6 +99,7 @@ async def get_models(tier: str = None, provider: str = None):
             "cost_per_1k_tokens": spec.cost_per_1k_tokens,
             "context_window": spec.context_window,
             "avg_latency_ms": spec.avg_latency_ms,
+            "live": asdict(live) if live else None,
             "capabilities": [cap.value for cap in spec.capabilities],
             "specialty": spec.specialty,
             "vram_required_gb": spec.vram_required_gb
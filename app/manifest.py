@@ -0,0 +1,143 @@
+import os
+import json
+import uuid
+import sqlite3
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("Gravitas_MANIFEST")
+
+# Fixed namespace so point IDs are stable across processes and restarts.
+POINT_ID_NAMESPACE = uuid.UUID("5f1c2d9e-6a4b-4c1e-9b0a-3e7d8f2a1c44")
+
+def hash_content(content: str) -> str:
+    """SHA-256 of the UTF-8 file content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of the file bytes, read in blocks. Equals hash_content() of the decoded
+    text for UTF-8 files with LF line endings.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_point_id(source: str, chunk_index: int, content_hash: str, kind: str = "chunk") -> str:
+    """
+    Deterministic Qdrant point ID derived from (kind, source, chunk_index, hash).
+    Re-ingesting identical content overwrites the same point instead of adding a duplicate.
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{kind}|{source}|{chunk_index}|{content_hash}"))
+
+def make_blob_key(point_id: str, prefix: str = "blob") -> str:
+    """Blob key paired with a point ID. Content-addressed, so it never changes meaning."""
+    return f"{prefix}_{uuid.UUID(point_id).hex}"
+
+@dataclass
+class ManifestEntry:
+    path: str
+    content_hash: str
+    mtime: float
+    point_ids: List[str] = field(default_factory=list)
+
+class IngestManifest:
+    """
+    SQLite-backed record of indexed files: path -> content hash, mtime and point IDs.
+    Lets the Ingestor and Librarian skip unchanged files and clean up stale points.
+    Entries are partitioned by namespace ("ingestor", "librarian", "learned") since they index overlapping files.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._init_table()
+
+    def _init_table(self):
+        """Ensures the ingest_manifest table exists."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_manifest (
+                    namespace TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    mtime REAL NOT NULL,
+                    point_ids TEXT NOT NULL,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (namespace, path)
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def load(self, namespace: str) -> Dict[str, ManifestEntry]:
+        """Returns all entries for a namespace keyed by path."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT path, content_hash, mtime, point_ids FROM ingest_manifest WHERE namespace = ?",
+                (namespace,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {
+            path: ManifestEntry(path=path, content_hash=content_hash, mtime=mtime, point_ids=json.loads(point_ids))
+            for path, content_hash, mtime, point_ids in rows
+        }
+
+    def get(self, namespace: str, path: str) -> Optional[ManifestEntry]:
+        """Returns a single entry, or None if the path was never indexed."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT path, content_hash, mtime, point_ids FROM ingest_manifest WHERE namespace = ? AND path = ?",
+                (namespace, path)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return ManifestEntry(path=row[0], content_hash=row[1], mtime=row[2], point_ids=json.loads(row[3]))
+
+    def upsert(self, namespace: str, entries: List[ManifestEntry]):
+        """Records (or replaces) entries in a single transaction."""
+        if not entries:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany("""
+                INSERT OR REPLACE INTO ingest_manifest (namespace, path, content_hash, mtime, point_ids, updated_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, [(namespace, e.path, e.content_hash, e.mtime, json.dumps(e.point_ids)) for e in entries])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def remove(self, namespace: str, paths: List[str]):
+        """Drops entries for files that were deleted or are being re-indexed."""
+        if not paths:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany(
+                "DELETE FROM ingest_manifest WHERE namespace = ? AND path = ?",
+                [(namespace, path) for path in paths]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def clear(self):
+        """Forgets everything (used after a full memory purge)."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("DELETE FROM ingest_manifest")
+            conn.commit()
+        finally:
+            conn.close()
+        logger.info("🧹 INGEST MANIFEST CLEARED.")
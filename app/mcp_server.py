@@ -41,24 +41,21 @@ async def gravitas_learn_file(file_path: str, content: str) -> str:
     """
     try:
         from app.container import container
-        
-        # Ensure resources are ready
-        if not container.memory:
-            await container.init_resources()
             
         logger.info(f"🧠 Learning file: {file_path}")
         
-        # Ingest text into Qdrant
-        # We assume your memory class has an 'ingest_text' or similar method.
+        # Chunk, embed (dense + sparse) and store. Re-learning unchanged content is a no-op
+        # and replaces the previous version of the file otherwise.
         # Metadata helps filter for code vs chat history later.
-        await container.memory.ingest_text(
+        summary = await container.ingestor.ingest_text(
             text=content,
             metadata={
                 "source": file_path, 
-                "type": "code_repository",
-                "timestamp": "now" # In real app use datetime.now()
+                "type": "code_repository"
             }
         )
+        if summary["chunks_failed"]:
+            return f"⚠️ PARTIAL: memorized {summary['chunks_ingested']} chunks of '{file_path}', {summary['chunks_failed']} failed."
 
         return f"✅ SUCCESS: I have memorized '{file_path}' into Qdrant."
 
@@ -73,10 +70,6 @@ async def gravitas_hybrid_search(query: str, top_k: int = 5) -> str:
     """
     try:
         from app.container import container
-        
-        if not container.memory:
-            logger.info("Initializing Gravitas Memory...")
-            await container.init_resources()
 
         results = await container.memory.search_hybrid(query=query, top_k=top_k)
         
@@ -1,13 +1,17 @@
 import logging
 import uuid
+import time
 import asyncio
-from typing import List, Dict, Optional, Any
-from qdrant_client import QdrantClient
+from typing import List, Dict, Optional, Any, Tuple
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
 from sentence_transformers import SentenceTransformer
 from datetime import datetime
 
-from .interfaces import VectorMemory, ObjectStore
+from .interfaces import VectorMemory, ObjectStore, SearchResult
+from .manifest import IngestManifest, make_blob_key
+from .embedding_cache import EmbeddingCache
+from .sparse import BM25SparseEncoder
 from .config import config
 from .database import db
 
@@ -55,42 +59,122 @@ async def retrieve_short_term_memory() -> str:
 class QdrantVectorStore(VectorMemory):
     """Implementation of VectorMemory using Qdrant (Indices) and ObjectStore (Blobs)."""
 
-    def __init__(self, storage: ObjectStore, host: str = "localhost", port: int = 6333):
+    def __init__(
+        self,
+        storage: ObjectStore,
+        host: str = "localhost",
+        port: int = 6333,
+        manifest: Optional[IngestManifest] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        grpc_port: int = 6334,
+        prefer_grpc: bool = False,
+        timeout: int = 10
+    ):
         self.storage = storage
+        self.manifest = manifest
         self.collection_name = "gravitas_knowledge"
         self.embedding_model_name = 'all-MiniLM-L6-v2'
         self.vector_size = 384 # For all-MiniLM-L6-v2
+        self.blob_concurrency = config.SEARCH_BLOB_CONCURRENCY
+        self.blob_deadline = config.SEARCH_BLOB_DEADLINE_SECONDS
         
-        logger.info(f"🔌 CONNECTING TO QDRANT at {host}:{port}...")
-        self.client = QdrantClient(host=host, port=port)
+        # One long-lived async client: its HTTP/gRPC connection pool is reused across
+        # requests and network round trips never block the event loop.
+        transport = f"gRPC :{grpc_port}" if prefer_grpc else f"REST :{port}"
+        logger.info(f"🔌 CONNECTING TO QDRANT at {host} ({transport}, timeout={timeout}s)...")
+        self.client = AsyncQdrantClient(
+            host=host,
+            port=port,
+            grpc_port=grpc_port,
+            prefer_grpc=prefer_grpc,
+            timeout=timeout
+        )
         
         logger.info(f"🧠 LOADING EMBEDDING MODEL ({self.embedding_model_name})...")
         self.embedder = SentenceTransformer(self.embedding_model_name)
+        self.embedding_cache = embedding_cache or EmbeddingCache(max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES)
+
+        # Lexical side of hybrid search: BM25 term weights in a named sparse vector
+        self.sparse_encoder = BM25SparseEncoder()
+        self.sparse_vector_name = "sparse"
+        self.hybrid_enabled = True
         
-        self._ensure_collection()
+        # Collection is created lazily on first use (async client cannot be awaited here)
+        self._collection_ready = False
+        self._collection_lock = asyncio.Lock()
 
-    def _ensure_collection(self):
+    async def _ensure_collection(self):
         """Creates the Qdrant collection if it doesn't exist."""
-        try:
-            if not self.client.collection_exists(self.collection_name):
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(
-                        size=self.vector_size, 
-                        distance=models.Distance.COSINE
-                    ),
-                )
-                logger.info(f"✅ Created Qdrant collection: {self.collection_name}")
-        except Exception as e:
-            logger.error(f"❌ QDRANT COLLECTION ERROR: {e}")
+        if self._collection_ready:
+            return
+        async with self._collection_lock:
+            if self._collection_ready:
+                return
+            try:
+                if not await self.client.collection_exists(self.collection_name):
+                    await self.client.create_collection(
+                        collection_name=self.collection_name,
+                        vectors_config=models.VectorParams(
+                            size=self.vector_size, 
+                            distance=models.Distance.COSINE
+                        ),
+                        sparse_vectors_config={
+                            # IDF is computed server-side from the indexed corpus
+                            self.sparse_vector_name: models.SparseVectorParams(modifier=models.Modifier.IDF)
+                        },
+                    )
+                    logger.info(f"✅ Created Qdrant collection: {self.collection_name}")
+                    self.hybrid_enabled = True
+                else:
+                    info = await self.client.get_collection(self.collection_name)
+                    sparse = info.config.params.sparse_vectors or {}
+                    self.hybrid_enabled = self.sparse_vector_name in sparse
+                    if not self.hybrid_enabled:
+                        logger.warning(
+                            f"⚠️ Collection {self.collection_name} predates hybrid search (no sparse vector). "
+                            "Falling back to dense-only; purge and re-ingest to enable hybrid."
+                        )
+                self._collection_ready = True
+            except Exception as e:
+                logger.error(f"❌ QDRANT COLLECTION ERROR: {e}")
 
     async def check_health(self) -> bool:
         """Verifies connectivity to Qdrant."""
         try:
-            return await asyncio.to_thread(self.client.collection_exists, self.collection_name)
+            return await self.client.collection_exists(self.collection_name)
         except Exception:
             return False
 
+    async def close(self):
+        """Closes the Qdrant connection pool."""
+        try:
+            await self.client.close()
+        except Exception as e:
+            logger.warning(f"⚠️ QDRANT CLOSE ERROR: {e}")
+
+    async def build_vector(self, dense, text: str):
+        """
+        Vector field for a point: the dense embedding plus, when the collection
+        supports it, BM25 sparse weights of `text`.
+        """
+        await self._ensure_collection()
+        dense = dense.tolist() if hasattr(dense, "tolist") else list(dense)
+        if not self.hybrid_enabled:
+            return dense
+        indices, values = self.sparse_encoder.encode_document(text)
+        return {
+            "": dense,  # Default (unnamed) dense vector
+            self.sparse_vector_name: models.SparseVector(indices=indices, values=values)
+        }
+
+    async def embed(self, text: str):
+        """Embeds a single text through the embedding cache (queries, Librarian summaries)."""
+        return await self.embedding_cache.encode(self.embedder, self.embedding_model_name, text)
+
+    async def embed_many(self, texts: List[str]):
+        """Embeds several texts through the embedding cache in one encode() call."""
+        return await self.embedding_cache.encode_many(self.embedder, self.embedding_model_name, texts)
+
     async def search(self, query: str, top_k: int = 5) -> List[str]:
         """
         Gravitas Grounded Research Search:
@@ -98,31 +182,113 @@ class QdrantVectorStore(VectorMemory):
         2. Search Qdrant for indices.
         3. Fetch blobs from Storage using blob_key.
         """
+        results = await self.search_with_scores(query, top_k=top_k)
+        return [r.content for r in results]
+
+    async def search_with_scores(self, query: str, top_k: int = 5, deadline: Optional[float] = None) -> List[SearchResult]:
+        """
+        Same pipeline as search(), keeping the Qdrant score and payload of each hit.
+        Blobs are fetched concurrently; hits whose blob is missing or misses the
+        deadline are dropped so one slow GET cannot stall the whole query.
+        """
         try:
-            # 1. Embed Query (using to_thread for sync embedder)
-            query_vector = await asyncio.to_thread(self.embedder.encode, query)
+            # 1. Embed Query (cached; misses run the sync embedder in a thread)
+            query_vector = await self.embed(query)
             
             # 2. Search Qdrant
-            response = self.client.query_points(
+            await self._ensure_collection()
+            response = await self.client.query_points(
                 collection_name=self.collection_name,
                 query=query_vector.tolist(),
                 limit=top_k
             )
             
             # 3. Fetch Blobs
-            results = []
-            for point in response.points:
-                blob_key = point.payload.get("blob_key")
-                if blob_key:
-                    content = await self.storage.get(blob_key)
-                    if content:
-                        results.append(content)
-            
-            return results
+            return await self._hydrate(response.points, deadline)
         except Exception as e:
             logger.error(f"❌ SEARCH ERROR: {e}")
             return []
 
+    async def search_hybrid(self, query: str, top_k: int = 5, deadline: Optional[float] = None) -> List[SearchResult]:
+        """
+        Gravitas Hybrid Search (Dense + Sparse):
+        1. Embed query (dense) and extract BM25 query terms (sparse).
+        2. Prefetch candidates from both indexes and fuse them with
+           Reciprocal Rank Fusion inside Qdrant (one round trip).
+        3. Fetch blobs for the fused top_k.
+        Exact identifiers (function/class names) surface through the sparse side
+        even when their dense similarity is mediocre.
+        """
+        try:
+            await self._ensure_collection()
+            indices, values = self.sparse_encoder.encode_query(query)
+            if not self.hybrid_enabled or not indices:
+                return await self.search_with_scores(query, top_k=top_k, deadline=deadline)
+
+            query_vector = await self.embed(query)
+            candidates = max(top_k * 4, 20)
+            response = await self.client.query_points(
+                collection_name=self.collection_name,
+                prefetch=[
+                    models.Prefetch(query=query_vector.tolist(), limit=candidates),
+                    models.Prefetch(
+                        query=models.SparseVector(indices=indices, values=values),
+                        using=self.sparse_vector_name,
+                        limit=candidates
+                    ),
+                ],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                limit=top_k
+            )
+            return await self._hydrate(response.points, deadline)
+        except Exception as e:
+            logger.error(f"❌ HYBRID SEARCH ERROR: {e}")
+            return []
+
+    async def _hydrate(self, points, deadline: Optional[float] = None) -> List[SearchResult]:
+        """Turns Qdrant hits into SearchResults, fetching their blobs concurrently."""
+        hits = [p for p in points if p.payload and p.payload.get("blob_key")]
+        contents = await self._fetch_blobs(
+            [p.payload["blob_key"] for p in hits],
+            deadline if deadline is not None else self.blob_deadline
+        )
+        return [
+            SearchResult(content=content, score=point.score, payload=dict(point.payload), point_id=str(point.id))
+            for point, content in zip(hits, contents)
+            if content
+        ]
+
+    async def _fetch_blobs(self, blob_keys: List[str], deadline: float) -> List[Optional[str]]:
+        """
+        Fetches blobs in parallel (bounded by a semaphore) within a deadline.
+        Returns one entry per key, None for blobs that failed or timed out.
+        """
+        if not blob_keys:
+            return []
+
+        semaphore = asyncio.Semaphore(self.blob_concurrency)
+
+        async def fetch(key: str) -> Optional[str]:
+            async with semaphore:
+                return await self.storage.get(key)
+
+        tasks = [asyncio.create_task(fetch(key)) for key in blob_keys]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"⚠️ SEARCH: {len(pending)}/{len(tasks)} blobs missed the {deadline}s deadline; returning partial results.")
+
+        contents = []
+        for task in tasks:
+            if task in done and not task.cancelled() and task.exception() is None:
+                contents.append(task.result())
+            else:
+                if task in done and not task.cancelled():
+                    logger.error(f"❌ BLOB FETCH ERROR: {task.exception()}")
+                contents.append(None)
+        return contents
+
     async def ingest(self, text: str, metadata: Dict[str, Any]) -> bool:
         """
         Gravitas Grounded Research Ingestion:
@@ -146,12 +312,12 @@ class QdrantVectorStore(VectorMemory):
             payload["timestamp"] = datetime.now().isoformat()
             
             # 4. Upsert to Qdrant
-            self.client.upsert(
+            await self.client.upsert(
                 collection_name=self.collection_name,
                 points=[
                     models.PointStruct(
                         id=str(uuid.uuid4()),
-                        vector=vector.tolist(),
+                        vector=await self.build_vector(vector, text),
                         payload=payload
                     )
                 ]
@@ -163,18 +329,190 @@ class QdrantVectorStore(VectorMemory):
             logger.error(f"❌ INGESTION ERROR: {e}")
             return False
 
+    async def ingest_many(
+        self,
+        documents: List[Tuple[str, Dict[str, Any]]],
+        batch_size: int = 64,
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Gravitas Grounded Research Bulk Ingestion:
+        1. Upload each batch of texts to MinIO concurrently (Blobs).
+        2. Embed the whole batch in a single encode() call.
+        3. Upsert the batch to Qdrant in one request (Index).
+        When ids are given, point IDs and blob keys are deterministic, so re-ingesting overwrites.
+        """
+        summary = {
+            "chunks_ingested": 0,
+            "chunks_failed": 0,
+            "elapsed_seconds": 0.0,
+            "chunks_per_sec": 0.0
+        }
+        start_time = time.perf_counter()
+
+        for offset in range(0, len(documents), batch_size):
+            batch = documents[offset:offset + batch_size]
+            stored = []
+            try:
+                # 1. Upload Blobs (sync MinIO client runs in threads, so gather overlaps them)
+                if ids:
+                    point_ids = ids[offset:offset + batch_size]
+                else:
+                    point_ids = [str(uuid.uuid4()) for _ in batch]
+                blob_keys = [make_blob_key(point_id) for point_id in point_ids]
+                uploaded = await asyncio.gather(
+                    *(self.storage.upload(key, text) for key, (text, _) in zip(blob_keys, batch))
+                )
+                stored = [
+                    (point_id, key, text, metadata)
+                    for point_id, key, (text, metadata), ok in zip(point_ids, blob_keys, batch, uploaded)
+                    if ok
+                ]
+                summary["chunks_failed"] += len(batch) - len(stored)
+                if not stored:
+                    logger.error("❌ BATCH INGESTION FAILED: No blobs could be uploaded to storage.")
+                    continue
+
+                # 2-3. Embed + Upsert
+                summary["chunks_ingested"] += await self._index_batch(stored, batch_size)
+            except Exception as e:
+                logger.error(f"❌ BATCH INGESTION ERROR: {e}")
+                # Chunks that failed to upload were already counted
+                summary["chunks_failed"] += len(stored) if stored else len(batch)
+
+        return self._finish_summary(summary, start_time)
+
+    async def index_many(
+        self,
+        documents: List[Tuple[str, Dict[str, Any]]],
+        ids: List[str],
+        blob_keys: List[str],
+        batch_size: int = 64
+    ) -> Dict[str, Any]:
+        """
+        Embed + upsert for documents whose blobs the caller already stored under blob_keys
+        (the staged ingest pipeline uploads in its own stage). Same summary as ingest_many.
+        """
+        summary = {
+            "chunks_ingested": 0,
+            "chunks_failed": 0,
+            "elapsed_seconds": 0.0,
+            "chunks_per_sec": 0.0
+        }
+        start_time = time.perf_counter()
+        stored = [
+            (point_id, blob_key, text, metadata)
+            for point_id, blob_key, (text, metadata) in zip(ids, blob_keys, documents)
+        ]
+
+        for offset in range(0, len(stored), batch_size):
+            batch = stored[offset:offset + batch_size]
+            try:
+                summary["chunks_ingested"] += await self._index_batch(batch, batch_size)
+            except Exception as e:
+                logger.error(f"❌ BATCH INDEXING ERROR: {e}")
+                summary["chunks_failed"] += len(batch)
+
+        return self._finish_summary(summary, start_time)
+
+    async def _index_batch(self, stored: List[Tuple[str, str, str, Dict[str, Any]]], batch_size: int) -> int:
+        """Embeds (point_id, blob_key, text, metadata) rows in one encode() call and upserts them in one request."""
+        vectors = await asyncio.to_thread(
+            self.embedder.encode,
+            [text for _, _, text, _ in stored],
+            batch_size=batch_size
+        )
+
+        # Payload carries blob_key only, never raw text
+        timestamp = datetime.now().isoformat()
+        points = []
+        for (point_id, blob_key, text, metadata), vector in zip(stored, vectors):
+            payload = metadata.copy()
+            payload["blob_key"] = blob_key
+            payload["timestamp"] = timestamp
+            points.append(
+                models.PointStruct(
+                    id=point_id,
+                    vector=await self.build_vector(vector, text),
+                    payload=payload
+                )
+            )
+
+        await self.client.upsert(
+            collection_name=self.collection_name,
+            points=points
+        )
+        return len(points)
+
+    def _finish_summary(self, summary: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - start_time
+        summary["elapsed_seconds"] = round(elapsed, 3)
+        summary["chunks_per_sec"] = round(summary["chunks_ingested"] / elapsed, 2) if elapsed > 0 else 0.0
+
+        logger.info(
+            f"💾 BULK INGESTED: {summary['chunks_ingested']} chunks "
+            f"({summary['chunks_failed']} failed) at {summary['chunks_per_sec']} chunks/sec"
+        )
+        return summary
+
+    async def upsert_points(self, points: List[models.PointStruct]):
+        """Upserts pre-built points (e.g. Librarian summaries) into the knowledge collection."""
+        await self._ensure_collection()
+        await self.client.upsert(
+            collection_name=self.collection_name,
+            points=points
+        )
+
+    async def delete(self, point_ids: List[str]) -> bool:
+        """
+        Removes points from Qdrant and the blobs they reference from Storage.
+        Used by incremental ingestion to drop chunks of changed or removed files.
+        """
+        if not point_ids:
+            return True
+        try:
+            # 1. Resolve blob keys from payloads before the points disappear
+            records = await self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=True,
+                with_vectors=False
+            )
+            blob_keys = [r.payload.get("blob_key") for r in records if r.payload and r.payload.get("blob_key")]
+
+            # 2. Drop Index entries
+            await self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=point_ids)
+            )
+
+            # 3. Drop Blobs
+            if blob_keys:
+                await asyncio.gather(*(self.storage.delete(key) for key in blob_keys))
+
+            logger.info(f"🗑️ DELETED: {len(point_ids)} points, {len(blob_keys)} blobs")
+            return True
+        except Exception as e:
+            logger.error(f"❌ DELETE ERROR: {e}")
+            return False
+
     async def purge(self) -> bool:
         """
         Wipes the entire collection in Qdrant and all blobs in Storage.
         """
         try:
             # 1. Clear Vector Index
-            self.client.delete_collection(self.collection_name)
-            self._ensure_collection()
+            await self.client.delete_collection(self.collection_name)
+            self._collection_ready = False
+            await self._ensure_collection()
             
             # 2. Clear Blob Storage
             if self.storage:
                 await self.storage.purge()
+
+            # 3. Forget what was indexed so the next ingest rebuilds everything
+            if self.manifest:
+                self.manifest.clear()
                 
             logger.info("🧹 FULL MEMORY PURGE: Qdrant and MinIO cleared.")
             return True
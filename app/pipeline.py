@@ -0,0 +1,157 @@
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("Gravitas_PIPELINE")
+
+_DONE = object()  # End-of-stream marker, one per worker
+
+
+@dataclass
+class SourceFile:
+    """A file found by discovery. key is root-qualified so docs/README.md and app/README.md differ."""
+    full_path: str
+    rel_path: str
+    root_name: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.root_name}/{self.rel_path}"
+
+    @property
+    def file_type(self) -> str:
+        return self.rel_path.rsplit(".", 1)[-1]
+
+
+async def discover_files(
+    roots: List[Tuple[str, str]],
+    extensions: Tuple[str, ...] = (".md", ".txt", ".py")
+) -> AsyncIterator[SourceFile]:
+    """
+    Walks (path, root_name) roots and yields matching files. Each directory
+    listing runs in a thread, so a large tree never blocks the event loop.
+    """
+    for path, root_name in roots:
+        walker = os.walk(path)
+        while True:
+            step = await asyncio.to_thread(next, walker, None)
+            if step is None:
+                break
+            root, _, files = step
+            # Skip __pycache__ and other noise
+            if "__pycache__" in root or ".git" in root:
+                continue
+            for name in files:
+                if name.endswith(extensions):
+                    full_path = os.path.join(root, name)
+                    yield SourceFile(full_path, os.path.relpath(full_path, path), root_name)
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step. handler returns the item for the next stage, or None to drop it.
+    on_close runs once after the stage's last item (e.g. to flush a batch).
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+    queue_size: int = 32
+    on_close: Optional[Callable[[], Awaitable[None]]] = None
+
+
+class StagedPipeline:
+    """
+    Producer/consumer pipeline: each stage has its own bounded input queue and
+    worker pool. A full queue blocks the stage feeding it, so a slow stage
+    (embedding, uploads) throttles discovery instead of letting work pile up in memory.
+    """
+
+    def __init__(self, name: str, stages: List[Stage]):
+        self.name = name
+        self.stages = stages
+        self.queues: List[asyncio.Queue] = []
+        self.stats: Dict[str, Dict[str, Any]] = {
+            stage.name: {"processed": 0, "dropped": 0, "errors": 0, "max_queue_depth": 0, "busy_seconds": 0.0}
+            for stage in stages
+        }
+
+    def depths(self) -> Dict[str, int]:
+        """Current queue depth per stage."""
+        return {stage.name: queue.qsize() for stage, queue in zip(self.stages, self.queues)}
+
+    async def run(self, source) -> Dict[str, Dict[str, Any]]:
+        """Feeds items from an (async) iterable through all stages; returns per-stage stats."""
+        self.queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        workers = [
+            asyncio.create_task(self._worker(index, remaining))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+        try:
+            if hasattr(source, "__aiter__"):
+                async for item in source:
+                    await self._put(0, item)
+            else:
+                for item in source:
+                    await self._put(0, item)
+            for _ in range(self.stages[0].workers):
+                await self.queues[0].put(_DONE)
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+
+        for stats in self.stats.values():
+            stats["busy_seconds"] = round(stats["busy_seconds"], 3)
+        return self.stats
+
+    async def _put(self, index: int, item: Any):
+        queue = self.queues[index]
+        await queue.put(item)
+        stats = self.stats[self.stages[index].name]
+        stats["max_queue_depth"] = max(stats["max_queue_depth"], queue.qsize())
+
+    async def _worker(self, index: int, remaining: List[int]):
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        is_last = index + 1 == len(self.stages)
+
+        while True:
+            item = await self.queues[index].get()
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                logger.error(f"❌ PIPELINE {self.name}/{stage.name} ERROR: {e}")
+                stats["errors"] += 1
+                result = None
+            stats["busy_seconds"] += time.perf_counter() - start
+            stats["processed"] += 1
+            if is_last:
+                continue
+            if result is None:
+                stats["dropped"] += 1
+            else:
+                await self._put(index + 1, result)
+
+        # Last worker out closes the stage and hands end-of-stream downstream
+        remaining[index] -= 1
+        if remaining[index] == 0:
+            if stage.on_close:
+                try:
+                    await stage.on_close()
+                except Exception as e:
+                    logger.error(f"❌ PIPELINE {self.name}/{stage.name} CLOSE ERROR: {e}")
+                    stats["errors"] += 1
+            if not is_last:
+                for _ in range(self.stages[index + 1].workers):
+                    await self.queues[index + 1].put(_DONE)
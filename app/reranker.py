@@ -0,0 +1,99 @@
+import time
+import asyncio
+import logging
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from .interfaces import SearchResult
+from .config import config
+
+logger = logging.getLogger("Gravitas_RERANK")
+
+
+class CrossEncoderReranker:
+    """
+    Second-stage relevance scoring for dense retrieval hits.
+    A small cross-encoder reads (query, chunk) pairs jointly, which ranks far better
+    than cosine similarity but costs one forward pass per candidate. Scoring runs on
+    CPU in batches inside a time budget; when the budget is exceeded the caller gets
+    the dense order back instead of waiting.
+    """
+
+    def __init__(
+        self,
+        model_name: str = None,
+        batch_size: int = None,
+        budget_seconds: float = None,
+        device: str = "cpu",
+        max_length: int = 512
+    ):
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name or config.RERANK_MODEL
+        self.batch_size = batch_size or config.RERANK_BATCH_SIZE
+        self.budget_seconds = budget_seconds if budget_seconds is not None else config.RERANK_BUDGET_SECONDS
+
+        logger.info(f"🧠 LOADING RERANK MODEL ({self.model_name}) on {device}...")
+        self.model = CrossEncoder(self.model_name, device=device, max_length=max_length)
+
+        self.calls = 0
+        self.fallbacks = 0
+        self.total_seconds = 0.0
+
+    def _score(self, query: str, texts: List[str]) -> List[float]:
+        scores = self.model.predict(
+            [(query, text) for text in texts],
+            batch_size=self.batch_size,
+            show_progress_bar=False
+        )
+        return [float(s) for s in scores]
+
+    async def rerank(
+        self,
+        query: str,
+        results: List[SearchResult],
+        top_k: int,
+        budget_seconds: Optional[float] = None
+    ) -> List[SearchResult]:
+        """
+        Returns the top_k results by cross-encoder score, with the dense score kept
+        in payload["dense_score"]. Falls back to the first top_k in dense order on
+        timeout or error.
+        """
+        if len(results) <= 1:
+            return results[:top_k]
+
+        budget = budget_seconds if budget_seconds is not None else self.budget_seconds
+        self.calls += 1
+        start = time.perf_counter()
+        try:
+            # The worker thread cannot be interrupted; on timeout it finishes in the background
+            scores = await asyncio.wait_for(
+                asyncio.to_thread(self._score, query, [r.content for r in results]),
+                timeout=budget
+            )
+        except asyncio.TimeoutError:
+            self.fallbacks += 1
+            logger.warning(f"⏱️ RERANK BUDGET EXCEEDED ({budget:.2f}s for {len(results)} candidates). Using dense order.")
+            return results[:top_k]
+        except Exception as e:
+            self.fallbacks += 1
+            logger.error(f"❌ RERANK ERROR: {e}. Using dense order.")
+            return results[:top_k]
+        finally:
+            self.total_seconds += time.perf_counter() - start
+
+        ranked = sorted(zip(results, scores), key=lambda pair: pair[1], reverse=True)
+        return [
+            replace(result, score=score, payload={**result.payload, "dense_score": result.score})
+            for result, score in ranked[:top_k]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+            "budget_seconds": self.budget_seconds
+        }
@@ -12,6 +12,7 @@ import os
 from .container import container
 from .config import config
 from .database import db
+from .health_monitor import HealthBroadcaster
 
 logger = logging.getLogger("Gravitas_LEGACY_ROUTER")
 
@@ -28,11 +29,10 @@ async def chat_endpoint():
         detail="The /chat endpoint is DEPRECATED. Please use the Supervisor at http://localhost:8000/v1/chat/completions"
     )
 
-@router.get("/health/detailed")
-async def get_detailed_health():
+async def _sample_health():
     """
     Checks connectivity for all microservices and GPU stats.
-    Legacy fallback for dashboard.
+    Runs at most once per HEALTH_SAMPLE_INTERVAL via health_monitor.
     """
     health = {
         "api": "online",
@@ -65,9 +65,26 @@ async def get_detailed_health():
     if container.storage and await container.storage.check_health():
         health["minio"] = "online"
 
-    # Check GPU (NVIDIA)
+    # Blob cache counters (present when the read-through cache is enabled)
+    if container.storage and hasattr(container.storage, "stats"):
+        health["blob_cache"] = container.storage.stats()
+
+    if container.memory:
+        health["embedding_cache"] = container.memory.embedding_cache.stats()
+
+    if container.telemetry:
+        health["telemetry_client"] = container.telemetry.stats()
+
+    if getattr(container, "reranker", None):
+        health["reranker"] = container.reranker.stats()
+
+    # Check GPU (NVIDIA) off the event loop
     try:
-        res = subprocess.check_output(["nvidia-smi", "--query-gpu=memory.used,memory.total", "--format=csv,noheader,nounits"], encoding="utf-8")
+        res = await asyncio.to_thread(
+            subprocess.check_output,
+            ["nvidia-smi", "--query-gpu=memory.used,memory.total", "--format=csv,noheader,nounits"],
+            encoding="utf-8"
+        )
         lines = res.strip().split("\n")
         if lines:
             used, total = map(int, lines[0].split(","))
@@ -81,18 +98,41 @@ async def get_detailed_health():
         
     return {"status": "success", "health": health, "current_mode": container.current_mode}
 
+# One shared sampler for every dashboard instead of one probe loop per SSE client
+health_monitor = HealthBroadcaster(_sample_health, interval=config.HEALTH_SAMPLE_INTERVAL)
+
+@router.get("/health/detailed")
+async def get_detailed_health():
+    """
+    Checks connectivity for all microservices and GPU stats.
+    Legacy fallback for dashboard. Served from the shared sampler's cache when fresh.
+    """
+    return await health_monitor.get()
+
 @router.get("/health/stream")
 async def health_stream(request: Request):
     """
-    SSE stream fallback for dashboard.
+    SSE stream for the dashboard: a `snapshot` event on connect, then `delta`
+    events (JSON merge patches) only when something changed.
     """
     async def event_generator():
-        while True:
-            if await request.is_disconnected():
-                break
-            health_data = await get_detailed_health()
-            yield f"event: update\ndata: {json.dumps(health_data)}\n\n"
-            await asyncio.sleep(5) # Reduced frequency for legacy endpoint
+        subscriber = health_monitor.subscribe()
+        try:
+            while True:
+                try:
+                    kind, version, payload = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=config.HEALTH_STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {kind}\nid: {version}\ndata: {json.dumps(payload)}\n\n"
+                if await request.is_disconnected():
+                    break
+        finally:
+            health_monitor.unsubscribe(subscriber)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -22,6 +22,11 @@ class TelemetrySnapshot:
     system_load_percent: float
     avg_latency_ms: float
     timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    # Load signals behind the decision (supervisor load-aware routing)
+    queue_depth: int = 0
+    in_flight: Dict[str, int] = field(default_factory=dict)
+    hot_model: Optional[str] = None
+    deadline_ms: Optional[float] = None
 
 @dataclass
 class RoutingDecision:
@@ -81,15 +86,17 @@ class ShadowAuditLoop:
     4. Failure pattern detection
     """
     
-    def __init__(self, postgres_client=None):
+    def __init__(self, postgres_client=None, max_entries: int = 10000):
         """
         Initialize the audit loop.
         
         Args:
             postgres_client: Optional PostgreSQL client for persistence.
                            If None, logs are kept in-memory only.
+            max_entries: In-memory entries kept; the oldest are dropped beyond this.
         """
         self.postgres_client = postgres_client
+        self.max_entries = max_entries
         self._in_memory_log: Dict[str, AuditEntry] = {}
         self._lock = asyncio.Lock()
     
@@ -117,6 +124,8 @@ class ShadowAuditLoop:
         
         async with self._lock:
             self._in_memory_log[request_id] = entry
+            while len(self._in_memory_log) > self.max_entries:
+                del self._in_memory_log[next(iter(self._in_memory_log))]
         
         logger.info(f"[AUDIT] Request {request_id[:8]} routed to {routing.tier}/{routing.model}")
         
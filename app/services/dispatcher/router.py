@@ -12,11 +12,14 @@ class TelemetryState:
     vram_usage_percent: float
     system_load_percent: float
     avg_latency: float
+    queue_depth: int = 0  # L1 requests queued or running ahead of this one
+    estimated_wait_ms: float = 0.0  # Expected time until a new L1 request would finish
 
 @dataclass
 class UserQuery:
     text: str
     code_complexity: int = 5  # Estimated or analyzed complexity
+    deadline_ms: Optional[float] = None  # Latency budget for the answer
 
 class DispatcherRouter:
     """
@@ -30,6 +33,10 @@ class DispatcherRouter:
         # Rule B: If system_load > 90% -> L2 (Offload to cloud to save local resources)
         if telemetry.system_load_percent > 90:
             return TargetModel.L2
+
+        # Rule B2: If the local wait would miss the deadline -> L2 (spill instead of queueing)
+        if query.deadline_ms and telemetry.estimated_wait_ms > query.deadline_ms:
+            return TargetModel.L2
             
         # Rule C: Default -> L1 (Local processing)
         return TargetModel.L1
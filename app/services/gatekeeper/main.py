@@ -9,6 +9,9 @@ from app.services.gatekeeper.auth import decode_access_token
 from app.services.gatekeeper.policy import policy_engine
 from app.services.gatekeeper.audit import audit_logger, AuditEvent
 from app.services.gatekeeper.database import db
+from app.services.metrics import instrument_app
+from app.services.tracing import instrument_tracing, span, tracer
+from app.services.http_clients import HttpClientRegistry
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +36,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     await audit_logger.stop()
+    await tracer.shutdown()
+    await HttpClientRegistry.aclose()
     await db.disconnect()
     logger.info("🛑 Gatekeeper Service shutting down.")
 
@@ -42,6 +47,8 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan
 )
+instrument_app(app, "gatekeeper", queues={"audit_events": lambda: audit_logger.queue.qsize()}, pool=lambda: db.pool)
+instrument_tracing(app, "gatekeeper")
 
 class ValidateRequest(BaseModel):
     # Metadata about the request for policy checking
@@ -77,30 +84,33 @@ async def validate_request(
     """
     
     # 1. Authentication
-    if os.getenv("AUTH_DISABLED", "false").lower() == "true":
-        claims = {"sub": "Supervisor_Managed_Agent", "groups": ["admin"]}
-    else:
-        if not authorization:
-            # Audit the failure?
-            raise HTTPException(status_code=401, detail="Missing Authorization header")
-        
-        token = authorization.replace("Bearer ", "")
-        claims = decode_access_token(token)
-        
-        if not claims:
-            # Audit failure?
-            logger.warning("Invalid token presented")
-            raise HTTPException(status_code=401, detail="Invalid or expired token")
+    with span("auth"):
+        if os.getenv("AUTH_DISABLED", "false").lower() == "true":
+            claims = {"sub": "Supervisor_Managed_Agent", "groups": ["admin"]}
+        else:
+            if not authorization:
+                # Audit the failure?
+                raise HTTPException(status_code=401, detail="Missing Authorization header")
+            
+            token = authorization.replace("Bearer ", "")
+            claims = decode_access_token(token)
+            
+            if not claims:
+                # Audit failure?
+                logger.warning("Invalid token presented")
+                raise HTTPException(status_code=401, detail="Invalid or expired token")
 
     ghost_id = claims.get("sub")
     groups = claims.get("groups", [])
     
     # 2. Authorization
-    allowed = policy_engine.check_permission(
-        ghost_id=ghost_id,
-        action=request.action,
-        resource=request.resource
-    )
+    with span("policy", resource=request.resource) as policy_span:
+        allowed = policy_engine.check_permission(
+            ghost_id=ghost_id,
+            action=request.action,
+            resource=request.resource
+        )
+        policy_span.set_attribute("allowed", allowed)
     
     # 3. Audit Logging
     audit_result = "ALLOWED" if allowed else "DENIED"
@@ -119,7 +129,8 @@ async def validate_request(
     # Fire and forget audit log (async)
     # Note: treating this as "best effort". 
     # Ideally use background task to not block response if DB is slow
-    await audit_logger.log_event(event)
+    with span("audit.enqueue"):
+        await audit_logger.log_event(event)
 
     if not allowed:
         raise HTTPException(status_code=403, detail="Access denied by policy")
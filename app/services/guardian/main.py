@@ -19,6 +19,9 @@ from app.services.guardian.core import (
 
 from contextlib import asynccontextmanager
 from app.services.guardian.database import db
+from app.services.metrics import instrument_app
+from app.services.tracing import instrument_tracing, span, tracer
+from app.services.http_clients import HttpClientRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Gravitas_GUARDIAN_SERVICE")
@@ -37,9 +40,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     await db.disconnect()
+    await tracer.shutdown()
+    await HttpClientRegistry.aclose()
     logger.info("🛑 Guardian Service shutting down.")
 
 app = FastAPI(title="Gravitas Guardian Service", version="1.0.0", lifespan=lifespan)
+instrument_app(app, "guardian", pool=lambda: db.pool)
+instrument_tracing(app, "guardian")
 
 # Initialize Guardian with certificates directory
 certificates_dir = os.getenv("CERTIFICATES_DIR", "app/.certificates")
@@ -117,11 +124,13 @@ async def session_start(req: SessionStartRequest):
     Validates certificate and tracks active session.
     """
     try:
-        permission = await guardian.notify_session_start(
-            agent=req.agent,
-            session_id=req.session_id,
-            metadata=req.metadata
-        )
+        with span("certification", agent=req.agent) as cert_span:
+            permission = await guardian.notify_session_start(
+                agent=req.agent,
+                session_id=req.session_id,
+                metadata=req.metadata
+            )
+            cert_span.set_attribute("allowed", permission.allowed)
         
         logger.info(f"📝 Session started: {req.session_id} for agent {req.agent}")
         return {
@@ -0,0 +1,77 @@
+"""
+Gravitas Shared HTTP Clients
+One long-lived, pooled httpx.AsyncClient per upstream for the whole process.
+
+Drivers and wrappers used to open a client per call, paying TCP (and TLS, for
+DeepInfra) setup on every request. Clients from this registry keep connections
+alive between requests and negotiate HTTP/2 with HTTPS upstreams when the `h2`
+package is installed. Pool limits come from the HTTP_POOL_* settings.
+Timeouts are still chosen per call:
+
+    from app.services.http_clients import HttpClientRegistry
+    client = HttpClientRegistry.get("ollama")
+    response = await client.post(url, json=payload, timeout=120.0)
+
+Each service's FastAPI lifespan closes the clients on shutdown via aclose().
+"""
+import asyncio
+import logging
+import importlib.util
+from typing import Dict, Optional
+
+import httpx
+
+from app.config import config
+
+logger = logging.getLogger("Gravitas_HTTP_CLIENTS")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HttpClientRegistry:
+    """
+    Process-wide pooled clients, keyed by upstream name ("ollama", "deepinfra",
+    "gatekeeper", ...). The name selects the pool and its limits. httpx keeps
+    separate connections per origin, so one name can serve several hosts.
+    Clients are bound to the event loop that created them. If a later call comes
+    from another loop (tests, reloads), new clients are built for that loop.
+    """
+    _clients: Dict[str, httpx.AsyncClient] = {}
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def get(cls, upstream: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if cls._loop is not loop:
+            # Pooled connections cannot cross event loops; the old loop's sockets go with it
+            cls._clients = {}
+            cls._loop = loop
+        client = cls._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = cls._clients[upstream] = cls._create(upstream)
+        return client
+
+    @classmethod
+    def _create(cls, upstream: str) -> httpx.AsyncClient:
+        max_connections = config.HTTP_POOL_LIMITS.get(upstream, config.HTTP_POOL_MAX_CONNECTIONS)
+        http2 = config.HTTP2_ENABLED and HTTP2_AVAILABLE  # Without h2, HTTP/1.1 keep-alive only
+        logger.info(f"🔌 HTTP pool for {upstream}: {max_connections} connections, http2={http2}")
+        return httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(config.HTTP_POOL_TIMEOUT, connect=config.HTTP_POOL_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=min(config.HTTP_POOL_MAX_KEEPALIVE, max_connections),
+                keepalive_expiry=config.HTTP_POOL_KEEPALIVE_EXPIRY
+            )
+        )
+
+    @classmethod
+    async def aclose(cls):
+        """Closes every pooled client (FastAPI lifespan shutdown)."""
+        clients, cls._clients = cls._clients, {}
+        for upstream, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP pool for {upstream}: {e}")
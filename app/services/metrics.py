@@ -0,0 +1,253 @@
+"""
+Gravitas Shared Instrumentation
+Prometheus text-format metrics for every FastAPI service.
+
+Metrics are plain Python counters updated from the event loop thread, so
+recording is a dict lookup plus an add (no locks, no I/O). Queue depths and
+DB pool usage are read through callbacks only when /metrics is scraped.
+
+    from app.services.metrics import instrument_app
+    instrument_app(app, "telemetry", queues={"telemetry_events": event_queue.qsize}, pool=lambda: db.pool)
+"""
+import time
+import bisect
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger("Gravitas_METRICS")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. HTTP handlers are mostly fast; LLM calls range from ~100ms (L1 warm) to minutes (L3 thinking)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in list(self.values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    """Fixed-bucket histogram; per-bucket counts are made cumulative at scrape time."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self.series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total) in list(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class Gauge:
+    """Gauge read from callbacks at scrape time; each callback yields one labelled sample."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callbacks: Dict[LabelValues, Callable[[], Optional[float]]] = {}
+
+    def set_function(self, fn: Callable[[], Optional[float]], **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self.callbacks[key] = fn
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for key, fn in list(self.callbacks.items()):
+            try:
+                value = fn()
+            except Exception as e:
+                logger.debug(f"⚠️ Gauge {self.name}{key} callback failed: {e}")
+                continue
+            if value is not None:
+                yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def _get(self, cls, name: str, *args, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, buckets)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry: each service runs in its own process
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "gravitas_http_requests_total", "HTTP requests handled, by route template and status.",
+    ("service", "method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "gravitas_http_request_duration_seconds", "HTTP request latency by route template.",
+    ("service", "method", "route")
+)
+QUEUE_DEPTH = REGISTRY.gauge("gravitas_queue_depth", "Items waiting in an in-process queue.", ("service", "queue"))
+DB_POOL = REGISTRY.gauge(
+    "gravitas_db_pool_connections", "asyncpg pool connections by state (in_use, idle, max).", ("service", "state")
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "gravitas_llm_request_duration_seconds", "Upstream LLM call latency by tier and outcome.",
+    ("tier", "model", "outcome"), buckets=LLM_BUCKETS
+)
+QUEUE_WAIT = REGISTRY.histogram(
+    "gravitas_queue_wait_seconds", "Time a request waited in the supervisor queue before a worker took it.",
+    ("tier",), buckets=LLM_BUCKETS
+)
+
+
+def observe_llm(tier: Optional[str], model: Optional[str], seconds: float, outcome: str = "ok"):
+    """Records one upstream LLM call (used by the agent wrappers)."""
+    LLM_LATENCY.observe(seconds, tier=tier or "unknown", model=model or "unknown", outcome=outcome)
+
+
+def observe_queue_wait(tier: str, seconds: float):
+    """Records how long one request waited for a supervisor worker."""
+    QUEUE_WAIT.observe(seconds, tier=tier)
+
+
+def _route_template(scope) -> str:
+    # FastAPI puts the matched route in the scope; its template keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: counts and times every HTTP request by route template."""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_template(scope)
+            method = scope.get("method", "")
+            HTTP_LATENCY.observe(time.perf_counter() - start, service=self.service, method=method, route=route)
+            HTTP_REQUESTS.inc(service=self.service, method=method, route=route, status=status["code"])
+
+
+def _pool_stat(pool_getter: Callable[[], object], stat: str) -> Optional[float]:
+    pool = pool_getter()
+    if pool is None:
+        return None
+    if stat == "max":
+        return pool.get_max_size()
+    idle = pool.get_idle_size()
+    return idle if stat == "idle" else pool.get_size() - idle
+
+
+def instrument_app(
+    app,
+    service: str,
+    queues: Optional[Dict[str, Callable[[], int]]] = None,
+    pool: Optional[Callable[[], object]] = None
+):
+    """
+    Adds request metrics and a /metrics endpoint to a FastAPI app.
+    queues maps a queue name to its qsize callable; pool returns the service's
+    asyncpg pool (or None while disconnected).
+    """
+    app.add_middleware(MetricsMiddleware, service=service)
+
+    for name, qsize in (queues or {}).items():
+        QUEUE_DEPTH.set_function(qsize, service=service, queue=name)
+    if pool is not None:
+        for state in ("in_use", "idle", "max"):
+            DB_POOL.set_function(lambda state=state: _pool_stat(pool, state), service=service, state=state)
+
+    async def metrics_endpoint(request: Request) -> Response:
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+    logger.info(f"📈 Metrics enabled for {service} at /metrics")
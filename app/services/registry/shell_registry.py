@@ -14,13 +14,17 @@ For agent identities, see ghost_registry.py.
 """
 
 import os
+import time
+import asyncio
 import yaml
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 import logging
 
+from app.config import config as settings
 from app.services.registry.model_schema import ModelsConfig, ModelDefinition
+from app.telemetry import telemetry
 
 logger = logging.getLogger("Gravitas_SHELL_REGISTRY")
 
@@ -62,6 +66,68 @@ class ModelSpec:
     provider: Optional[str] = None
 
 
+@dataclass
+class ShellStats:
+    """
+    Measured performance of one Shell, rolled up from the wrappers' streamed
+    generations as an exponentially weighted moving average (recent runs dominate).
+    """
+    samples: int = 0
+    queue_wait_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    ttft_ms: Optional[float] = None
+    inter_token_ms: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    latency_ms: Optional[float] = None  # Whole generation (StreamMetrics total_ms)
+    load_ms: Optional[float] = None  # Cold model loads into VRAM (see ShellRegistry.record_load)
+    updated_at: float = 0.0
+
+    # StreamMetrics.to_dict() key -> field
+    FIELDS = {
+        "queue_wait_ms": "queue_wait_ms",
+        "connect_ms": "connect_ms",
+        "ttft_ms": "ttft_ms",
+        "inter_token_ms": "inter_token_ms",
+        "tokens_per_second": "tokens_per_second",
+        "total_ms": "latency_ms",
+    }
+
+    def observe(self, metrics: Dict[str, Any], alpha: float):
+        for key, name in self.FIELDS.items():
+            value = metrics.get(key)
+            if value is None:
+                continue
+            current = getattr(self, name)
+            setattr(self, name, value if current is None else current + alpha * (value - current))
+        self.samples += 1
+        self.updated_at = time.time()
+
+
+@dataclass
+class LiveStats:
+    """
+    What a Shell is delivering right now, for routing and latency estimates.
+    
+    source is "telemetry" (service-wide histograms, refreshed on a schedule),
+    "local" (this process's own generations) or "yaml" (models.yaml defaults,
+    nothing measured yet). Averages are EWMAs; tails come from the latest window.
+    """
+    model: str
+    source: str
+    latency_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
+    ttft_ms: Optional[float] = None
+    ttft_p95_ms: Optional[float] = None
+    inter_token_ms: Optional[float] = None
+    inter_token_p95_ms: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    tokens_per_second_p5: Optional[float] = None  # Slow tail of throughput
+    load_ms: Optional[float] = None  # Time to load the model into VRAM (L1 only)
+    load_p95_ms: Optional[float] = None
+    samples: int = 0
+    updated_at: float = 0.0
+
+
 class ShellRegistry:
     """
     Central registry of all available LLM model Shells across L1, L2, and L3 tiers.
@@ -78,6 +144,24 @@ class ShellRegistry:
     L3_MODELS: Dict[str, ModelSpec] = {}
     _loaded: bool = False
     
+    # Measured stats per shell (kept across reload_config)
+    _measured: Dict[str, ShellStats] = {}
+    MEASURED_ALPHA: float = 0.2  # EWMA weight of the newest generation
+    
+    # Service-wide stats pulled from telemetry (see refresh_live_stats)
+    _live: Dict[str, LiveStats] = {}
+    _refresh_task: Optional[asyncio.Task] = None
+    # telemetry event type -> (EWMA field, tail field, tail percentile)
+    LIVE_EVENTS = {
+        "LLM_LATENCY": ("latency_ms", "latency_p95_ms", "p95"),
+        "LLM_TTFT": ("ttft_ms", "ttft_p95_ms", "p95"),
+        "LLM_INTER_TOKEN": ("inter_token_ms", "inter_token_p95_ms", "p95"),
+        "LLM_DECODE_TPS": ("tokens_per_second", "tokens_per_second_p5", "p5"),
+        "LOAD_LATENCY": ("load_ms", "load_p95_ms", "p95"),
+    }
+    LIVE_SCALE = {"LOAD_LATENCY": 1000.0}  # Events recorded in seconds
+    COLD_LOAD_SECONDS: float = 0.5  # Shorter provider-reported loads mean the model was already hot
+    
     @classmethod
     def _load_models_from_yaml(cls):
         """Load models from YAML configuration file."""
@@ -208,6 +292,149 @@ class ShellRegistry:
             return True  # Assume cloud models don't need local VRAM
         return spec.vram_required_gb <= available_vram_gb
     
+    @classmethod
+    def record_generation(cls, model_name: str, metrics: Dict[str, Any]):
+        """Folds one measured generation (StreamMetrics.to_dict()) into the shell's rolling stats."""
+        if not model_name:
+            return
+        stats = cls._measured.get(model_name)
+        if stats is None:
+            stats = cls._measured[model_name] = ShellStats()
+        stats.observe(metrics, cls.MEASURED_ALPHA)
+    
+    @classmethod
+    def record_load(cls, model_name: str, seconds: float):
+        """Folds one measured cold load of a local shell into its rolling stats."""
+        if not model_name:
+            return
+        stats = cls._measured.get(model_name)
+        if stats is None:
+            stats = cls._measured[model_name] = ShellStats()
+        ms = seconds * 1000
+        stats.load_ms = ms if stats.load_ms is None else stats.load_ms + cls.MEASURED_ALPHA * (ms - stats.load_ms)
+        stats.updated_at = time.time()
+    
+    @classmethod
+    def get_measured_stats(cls, model_name: str) -> Optional[ShellStats]:
+        """Rolling measured stats for a shell, or None if it has not served anything yet."""
+        return cls._measured.get(model_name)
+    
+    @classmethod
+    async def refresh_live_stats(cls) -> int:
+        """
+        Pulls the last window of per-shell percentiles from the telemetry service and
+        folds the window means into each shell's EWMA. Returns the shells updated.
+        """
+        window_hours = settings.SHELL_STATS_WINDOW_MINUTES / 60
+        alpha = settings.SHELL_STATS_EWMA_ALPHA
+        updated = set()
+        for event_type, (field, tail_field, tail) in cls.LIVE_EVENTS.items():
+            response = await telemetry.get_percentiles(event_type, hours=window_hours, quantiles="0.05,0.95")
+            scale = cls.LIVE_SCALE.get(event_type, 1.0)
+            for series in response.get("components", []):
+                model, mean = series.get("component"), series.get("mean")
+                if not model or not series.get("count") or mean is None:
+                    continue
+                mean *= scale
+                tail_value = series.get("percentiles", {}).get(tail)
+                live = cls._live.get(model)
+                if live is None:
+                    live = cls._live[model] = LiveStats(model=model, source="telemetry")
+                current = getattr(live, field)
+                setattr(live, field, mean if current is None else current + alpha * (mean - current))
+                setattr(live, tail_field, tail_value * scale if tail_value is not None else None)
+                if event_type == "LLM_LATENCY":
+                    live.samples = series["count"]
+                live.updated_at = time.time()
+                updated.add(model)
+        return len(updated)
+    
+    @classmethod
+    async def _refresh_loop(cls, interval: float):
+        while True:
+            try:
+                count = await cls.refresh_live_stats()
+                logger.debug(f"📈 Live shell stats refreshed for {count} shells")
+            except Exception as e:
+                logger.warning(f"⚠️ Live shell stats refresh failed: {e}")
+            await asyncio.sleep(interval)
+    
+    @classmethod
+    def start_live_refresh(cls, interval: Optional[float] = None):
+        """Starts the periodic telemetry pull on the running loop (no-op if already running)."""
+        if cls._refresh_task is not None and not cls._refresh_task.done():
+            return
+        interval = interval or settings.SHELL_STATS_REFRESH_INTERVAL
+        cls._refresh_task = asyncio.get_running_loop().create_task(cls._refresh_loop(interval))
+        logger.info(f"📈 Live shell stats refresh every {interval}s")
+    
+    @classmethod
+    async def stop_live_refresh(cls):
+        if cls._refresh_task is not None:
+            cls._refresh_task.cancel()
+            await asyncio.gather(cls._refresh_task, return_exceptions=True)
+            cls._refresh_task = None
+    
+    @classmethod
+    def get_live_stats(cls, model_name: str) -> Optional[LiveStats]:
+        """
+        Best current estimate for a shell: fresh telemetry stats, else this process's
+        own measurements, else the models.yaml defaults (None for unknown shells).
+        """
+        live = cls._live.get(model_name)
+        fresh = live is not None and time.time() - live.updated_at < settings.SHELL_STATS_MAX_AGE
+        if fresh and live.latency_ms is not None:  # Not just load times
+            return replace(live)
+        measured = cls._measured.get(model_name)
+        if measured is not None and measured.latency_ms is not None:
+            return LiveStats(
+                model=model_name,
+                source="local",
+                latency_ms=measured.latency_ms,
+                ttft_ms=measured.ttft_ms,
+                inter_token_ms=measured.inter_token_ms,
+                tokens_per_second=measured.tokens_per_second,
+                load_ms=measured.load_ms,
+                samples=measured.samples,
+                updated_at=measured.updated_at
+            )
+        spec = cls.get_model(model_name)
+        if spec is None:
+            return None
+        return LiveStats(model=model_name, source="yaml", latency_ms=float(spec.avg_latency_ms))
+    
+    @classmethod
+    def estimate_latency_ms(cls, model_name: str, output_tokens: Optional[int] = None, tail: bool = False) -> Optional[float]:
+        """
+        Expected response time for a shell. With output_tokens and measured TTFT and
+        throughput: TTFT + tokens / tokens-per-second; otherwise the whole-request
+        latency. tail=True uses the p95 (slow p5 throughput) figures when known.
+        """
+        stats = cls.get_live_stats(model_name)
+        if stats is None:
+            return None
+        ttft = (stats.ttft_p95_ms if tail else None) or stats.ttft_ms
+        tps = (stats.tokens_per_second_p5 if tail else None) or stats.tokens_per_second
+        if output_tokens is not None and ttft is not None and tps:
+            return ttft + output_tokens / tps * 1000
+        return (stats.latency_p95_ms if tail else None) or stats.latency_ms
+    
+    @classmethod
+    def estimate_load_ms(cls, model_name: str, tail: bool = False) -> float:
+        """
+        Expected time to swap a local shell into VRAM: telemetry LOAD_LATENCY,
+        else this process's measured loads, else MODEL_LOAD_ESTIMATE_MS.
+        """
+        live = cls._live.get(model_name)
+        if live is not None and time.time() - live.updated_at < settings.SHELL_STATS_MAX_AGE:
+            value = (live.load_p95_ms if tail else None) or live.load_ms
+            if value is not None:
+                return value
+        measured = cls._measured.get(model_name)
+        if measured is not None and measured.load_ms is not None:
+            return measured.load_ms
+        return settings.MODEL_LOAD_ESTIMATE_MS
+    
     @classmethod
     def reload_config(cls):
         """Force reload of model configuration from YAML."""
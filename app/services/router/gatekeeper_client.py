@@ -2,6 +2,8 @@ import httpx
 import os
 import logging
 from typing import Optional, Dict
+from app.services.tracing import inject, span
+from app.services.http_clients import HttpClientRegistry
 
 logger = logging.getLogger("Gravitas_ROUTER_GATEKEEPER_CLIENT")
 
@@ -20,24 +22,27 @@ class GatekeeperClient:
         Validates a request via Gatekeeper.
         """
         try:
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                payload = {
-                    "action": action,
-                    "resource": resource,
-                    "metadata": metadata
-                }
-                headers = {"Authorization": f"Bearer {token}"}
-                
-                response = await client.post(f"{self.url}/validate", json=payload, headers=headers)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code in [401, 403]:
-                    return {"allowed": False, "error_code": response.status_code, "detail": response.json().get("detail")}
-                else:
-                    logger.warning(f"Gatekeeper returned unexpected status {response.status_code}")
-                    return {"allowed": False, "error_code": 503, "detail": "Gatekeeper error"}
-                    
+            payload = {
+                "action": action,
+                "resource": resource,
+                "metadata": metadata
+            }
+            headers = inject({"Authorization": f"Bearer {token}"})
+
+            with span("gatekeeper.validate", kind="client", resource=resource) as call:
+                response = await HttpClientRegistry.get("gatekeeper").post(
+                    f"{self.url}/validate", json=payload, headers=headers, timeout=2.0
+                )
+                call.set_attribute("http.status_code", response.status_code)
+
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code in [401, 403]:
+                return {"allowed": False, "error_code": response.status_code, "detail": response.json().get("detail")}
+            else:
+                logger.warning(f"Gatekeeper returned unexpected status {response.status_code}")
+                return {"allowed": False, "error_code": 503, "detail": "Gatekeeper error"}
+
         except httpx.RequestError as e:
             logger.error(f"Gatekeeper unreachable: {e}")
             return {"allowed": False, "error_code": 503, "detail": "Gatekeeper unavailable"}
@@ -5,6 +5,8 @@ from typing import Optional
 from pathlib import Path
 from dataclasses import dataclass
 
+from app.services.tracing import TRACE_HOOKS, span
+
 logger = logging.getLogger("Gravitas_ROUTER_GUARDIAN_CLIENT")
 
 @dataclass
@@ -24,21 +26,22 @@ class GuardianClient:
     def __init__(self, guardian_url: Optional[str] = None, fallback_to_local: bool = False, timeout: float = 5.0):
         self.guardian_url = guardian_url or os.getenv("GUARDIAN_URL", "http://gravitas_guardian:8003")
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        self.client = httpx.AsyncClient(timeout=self.timeout, event_hooks=TRACE_HOOKS)
         if fallback_to_local:
             logger.warning("Local fallback not supported in Router service. Ignoring.")
     
     async def notify_session_start(self, agent: str, session_id: str, metadata: dict) -> SessionPermission:
         try:
-            resp = await self.client.post(
-                f"{self.guardian_url}/session/start",
-                json={
-                    "agent": agent,
-                    "session_id": session_id,
-                    "metadata": metadata
-                }
-            )
-            resp.raise_for_status()
+            with span("guardian.session_start", kind="client", agent=agent):
+                resp = await self.client.post(
+                    f"{self.guardian_url}/session/start",
+                    json={
+                        "agent": agent,
+                        "session_id": session_id,
+                        "metadata": metadata
+                    }
+                )
+                resp.raise_for_status()
             data = resp.json()
             return SessionPermission(allowed=data["allowed"], reason=data.get("reason"))
         except Exception as e:
@@ -51,10 +54,11 @@ class GuardianClient:
 
     async def notify_session_end(self, session_id: str, output_file: Path):
         try:
-            await self.client.post(
-                f"{self.guardian_url}/session/end",
-                json={"session_id": session_id, "output_file": str(output_file)}
-            )
+            with span("guardian.session_end", kind="client"):
+                await self.client.post(
+                    f"{self.guardian_url}/session/end",
+                    json={"session_id": session_id, "output_file": str(output_file)}
+                )
         except Exception as e:
             logger.warning(f"Failed to notify session end: {e}")
 
@@ -4,6 +4,9 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.services.router.api import router
 from app.services.router.database import db
+from app.services.metrics import instrument_app
+from app.services.tracing import instrument_tracing, tracer
+from app.services.http_clients import HttpClientRegistry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,9 +21,13 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     await db.disconnect()
+    await tracer.shutdown()
+    await HttpClientRegistry.aclose()  # After the tracer's final OTLP flush
     logger.info("Gravitas Router Service Stopping...")
 
 app = FastAPI(title="Gravitas Router", lifespan=lifespan)
+instrument_app(app, "router", pool=lambda: db.pool)
+instrument_tracing(app, "router")
 
 # Include routes
 app.include_router(router)
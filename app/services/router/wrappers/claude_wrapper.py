@@ -39,6 +39,7 @@ class ClaudeThinkingWrapper(GravitasAgentWrapper):
             max_tokens=4096,
             stream=True
         )
+        self.mark_connected()
 
         full_output = []
         
@@ -46,16 +47,20 @@ class ClaudeThinkingWrapper(GravitasAgentWrapper):
             # 1. Parse and log thoughts (Chain of Thought)
             thought = self._parse_thought(chunk)
             if thought:
+                self.mark_token()
                 self.pipe.log_thought(thought)
             
             # 2. Extract regular text content
             if hasattr(chunk, 'type') and chunk.type == "content_block_delta":
                 if hasattr(chunk.delta, 'text') and chunk.delta.text:
+                    self.mark_token()
                     full_output.append(chunk.delta.text)
+                    self.emit(chunk.delta.text)
 
         result_text = "".join(full_output)
         
         # Log final result and metrics
+        self.set_token_counts(len(result_text) // 4)
         self.pipe.log_result(
             result=f"Generated {len(result_text)} characters.",
             metrics={
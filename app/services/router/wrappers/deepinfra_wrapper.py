@@ -49,6 +49,7 @@ class DeepInfraWrapper(GravitasAgentWrapper):
             stream=True,
             max_tokens=4096
         )
+        self.mark_connected()
 
         full_output = []
         chunk_count = 0
@@ -61,18 +62,22 @@ class DeepInfraWrapper(GravitasAgentWrapper):
             content = delta.content
             
             if content:
+                self.mark_token()
                 # 1. Log first 3 chunks as potential reasoning placeholders
                 # Note: For non-thinking models, we just provide a trace of the start
                 if chunk_count < 3:
                     self.pipe.log_thought(f"Processing: {content.strip()[:50]}...")
                 
                 full_output.append(content)
+                
+                self.emit(content)
                 chunk_count += 1
 
         result_text = "".join(full_output)
         
         # Log final result and metrics
         # We estimate tokens as length / 4 for now
+        self.set_token_counts(len(result_text) // 4)
         self.pipe.log_result(
             result=f"Generated {len(result_text)} characters.",
             metrics={
@@ -38,6 +38,7 @@ class GeminiWrapper(GravitasAgentWrapper):
             prompt,
             stream=True
         )
+        self.mark_connected()
 
         full_output = []
         
@@ -46,16 +47,21 @@ class GeminiWrapper(GravitasAgentWrapper):
             # 1. Parse and log thoughts (Chain of Thought)
             thought = self._parse_thought(chunk)
             if thought:
+                self.mark_token()
                 self.pipe.log_thought(thought)
             
             # 2. Extract regular text content
             if hasattr(chunk, 'text') and chunk.text:
+                if not thought:
+                    self.mark_token()
                 full_output.append(chunk.text)
+                self.emit(chunk.text)
 
         result_text = "".join(full_output)
         
         # Log final result and metrics
         # We estimate tokens as length / 4 for now as Gemini 2.0 doesn't always return token counts in stream chunks
+        self.set_token_counts(len(result_text) // 4)
         self.pipe.log_result(
             result=f"Generated {len(result_text)} characters.",
             metrics={
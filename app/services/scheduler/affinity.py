@@ -0,0 +1,169 @@
+import time
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.config import config
+from app.services.registry.shell_registry import ShellRegistry
+from app.services.scheduler.lock import ModelLock
+
+logger = logging.getLogger("Gravitas_SCHEDULER_AFFINITY")
+
+
+@dataclass(order=True)
+class AffinityItem:
+    priority: int
+    sequence: int
+    model: Optional[str] = field(compare=False, default=None)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+    request: Any = field(compare=False, default=None)
+
+
+class AffinityQueue:
+    """
+    L1 request queue that batches by target shell to avoid VRAM thrash.
+
+    Drop-in for RequestQueue (the request's `model` attribute is its shell).
+    dequeue() picks, in order:
+        1. Starved requests: waited past the limit for their priority
+           (L1_STARVATION_SECONDS; push_to_front maps to 0 s, i.e. always next).
+        2. The hot model's best request, while fewer than L1_AFFINITY_MAX_BATCH
+           have been served in a row with other shells waiting, unless the cost
+           model says switching now costs less total waiting.
+        3. Otherwise the best head request of the other shells (a model switch).
+    Within a shell, lower priority values and then older requests go first.
+    """
+
+    def __init__(self, model_lock: ModelLock, max_batch: Optional[int] = None,
+                 starvation: Optional[Dict[int, float]] = None):
+        self.model_lock = model_lock
+        self.max_batch = config.L1_AFFINITY_MAX_BATCH if max_batch is None else max_batch
+        self.starvation = sorted((starvation or config.L1_STARVATION_SECONDS).items())
+        self._groups: Dict[Optional[str], List[AffinityItem]] = {}
+        self._counter = itertools.count()
+        self._ready = asyncio.Semaphore(0)
+        self._streak = 0  # Hot-model picks in a row while other shells were waiting
+        self.switches = 0
+        self.affinity_hits = 0
+        self.starved = 0
+
+    # --- RequestQueue interface ---
+
+    async def enqueue(self, request: Any, priority: int = 10):
+        model = getattr(request, "model", None)
+        item = AffinityItem(priority=priority, sequence=next(self._counter), model=model, request=request)
+        heapq.heappush(self._groups.setdefault(model, []), item)
+        self._ready.release()
+
+    async def push_to_front(self, request: Any):
+        await self.enqueue(request, priority=-1)
+
+    async def dequeue(self) -> Any:
+        while True:
+            await self._ready.acquire()
+            if self._groups:  # Otherwise the permit belonged to a removed request
+                return self._pick().request
+
+    def remove(self, request: Any) -> bool:
+        """Withdraws a request that is still waiting; False if it was already dequeued."""
+        group = self._groups.get(getattr(request, "model", None), [])
+        for item in group:
+            if item.request is request:
+                self._drop(item)
+                return True
+        return False
+
+    def qsize(self) -> int:
+        return sum(len(group) for group in self._groups.values())
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": {model: len(group) for model, group in self._groups.items() if group},
+            "hot_model": self.model_lock.current_model,
+            "switches": self.switches,
+            "affinity_hits": self.affinity_hits,
+            "starved": self.starved,
+        }
+
+    # --- Scheduling ---
+
+    def starvation_limit(self, priority: int) -> float:
+        """Limit of the closest configured priority at or above this one in urgency."""
+        limit = self.starvation[0][1]
+        for level, seconds in self.starvation:
+            if level <= priority:
+                limit = seconds
+        return limit
+
+    def _pick(self) -> AffinityItem:
+        hot = self.model_lock.current_model
+        now = time.monotonic()
+
+        starved = [
+            item for group in self._groups.values() for item in group
+            if now - item.enqueued_at >= self.starvation_limit(item.priority)
+        ]
+        if starved:
+            self.starved += 1
+            return self._take(min(starved), hot)
+
+        heads = {model: group[0] for model, group in self._groups.items() if group}
+        others = [model for model in heads if model is not None and self.model_lock.needs_switch(model)]
+        if hot in heads and not others:
+            self._streak = 0
+            return self._take(heads[hot], hot)
+        target = self._switch_target(hot, others) if hot in heads else None
+        if target is None and hot in heads and self._streak < self.max_batch:
+            self._streak += 1
+            return self._take(heads[hot], hot)
+
+        if target is None:
+            target = min(others or heads, key=lambda model: heads[model])
+        return self._take(heads[target], hot)
+
+    def _switch_target(self, hot: str, others: List[str]) -> Optional[str]:
+        """
+        Shell worth switching to before the hot model's queue drains, or None.
+
+        Staying delays every request of another shell by the hot model's queued
+        work; switching first delays every hot-model request by the other shell's
+        load + work + the load back. Switch when that adds less total waiting.
+        """
+        n_hot = len(self._groups[hot])
+        hot_work = n_hot * self._latency(hot)
+        reload_hot = ShellRegistry.estimate_load_ms(hot)
+        best, best_gain = None, 0.0
+        for model in others:
+            n_other = len(self._groups[model])
+            switch_cost = n_hot * (ShellRegistry.estimate_load_ms(model) + n_other * self._latency(model) + reload_hot)
+            gain = n_other * hot_work - switch_cost
+            if gain > best_gain:
+                best, best_gain = model, gain
+        return best
+
+    @staticmethod
+    def _latency(model: str) -> float:
+        return ShellRegistry.estimate_latency_ms(model) or 1000.0
+
+    def _drop(self, item: AffinityItem):
+        group = self._groups[item.model]
+        group.remove(item)
+        heapq.heapify(group)
+        if not group:
+            del self._groups[item.model]
+
+    def _take(self, item: AffinityItem, hot: Optional[str]) -> AffinityItem:
+        self._drop(item)
+        if item.model is not None and self.model_lock.needs_switch(item.model):
+            self.switches += 1
+            self._streak = 0
+            logger.info(f"🔀 L1 switching {hot} -> {item.model} ({self.qsize()} still queued)")
+        elif hot is not None and item.model == hot:
+            self.affinity_hits += 1
+        return item
@@ -0,0 +1,143 @@
+import os
+import time
+import asyncio
+import logging
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from app.config import config
+from app.services.registry.shell_registry import ShellRegistry
+from app.services.scheduler.lock import ModelLock
+from app.services.scheduler.queue import RequestQueue
+
+logger = logging.getLogger("Gravitas_SCHEDULER_LOAD")
+
+
+@dataclass
+class LoadSnapshot:
+    """
+    Point-in-time view of the local (L1) load used by routing decisions.
+    GPU figures are None when nvidia-smi is not reachable from this container.
+    """
+    queue_depth: int = 0
+    in_flight: Dict[str, int] = field(default_factory=dict)
+    hot_model: Optional[str] = None
+    vram_used_mb: Optional[int] = None
+    vram_total_mb: Optional[int] = None
+    system_load_percent: float = 0.0
+    sampled_at: float = field(default_factory=time.time)
+
+    @property
+    def vram_free_gb(self) -> Optional[float]:
+        if self.vram_used_mb is None or self.vram_total_mb is None:
+            return None
+        return (self.vram_total_mb - self.vram_used_mb) / 1024
+
+    @property
+    def vram_usage_percent(self) -> float:
+        if not self.vram_total_mb:
+            return 0.0
+        return round(self.vram_used_mb / self.vram_total_mb * 100, 1)
+
+    @property
+    def l1_backlog(self) -> int:
+        """Requests that will hold the local GPU before a new one gets it."""
+        return self.queue_depth + self.in_flight.get("L1", 0)
+
+
+class LoadMonitor:
+    """
+    Cheap, cached load signals for the supervisor: queue depth and in-flight counts
+    are read live, the GPU probe (nvidia-smi) is refreshed at most every
+    LOAD_SAMPLE_TTL seconds so routing never waits on a subprocess per request.
+    """
+
+    def __init__(self, queue: RequestQueue, model_lock: ModelLock, ttl: Optional[float] = None):
+        self.queue = queue
+        self.model_lock = model_lock
+        self.ttl = config.LOAD_SAMPLE_TTL if ttl is None else ttl
+        self.in_flight: Dict[str, int] = {}
+        self._gpu: Tuple[Optional[int], Optional[int]] = (None, None)
+        self._gpu_sampled_at = 0.0
+        self._gpu_probe: Optional[asyncio.Future] = None
+
+    @contextmanager
+    def track(self, tier: str):
+        """Counts a request as in flight on `tier` for the duration of the block."""
+        self.in_flight[tier] = self.in_flight.get(tier, 0) + 1
+        try:
+            yield
+        finally:
+            self.in_flight[tier] -= 1
+
+    async def snapshot(self) -> LoadSnapshot:
+        used, total = await self._gpu_stats()
+        return LoadSnapshot(
+            queue_depth=self.queue.qsize(),
+            in_flight=dict(self.in_flight),
+            hot_model=self.model_lock.current_model,
+            vram_used_mb=used,
+            vram_total_mb=total,
+            system_load_percent=self._system_load()
+        )
+
+    async def _gpu_stats(self) -> Tuple[Optional[int], Optional[int]]:
+        if time.monotonic() - self._gpu_sampled_at < self.ttl:
+            return self._gpu
+        # Concurrent callers share one probe instead of each spawning nvidia-smi
+        if self._gpu_probe is None or self._gpu_probe.done():
+            self._gpu_probe = asyncio.ensure_future(self._probe_gpu())
+        return await asyncio.shield(self._gpu_probe)
+
+    async def _probe_gpu(self) -> Tuple[Optional[int], Optional[int]]:
+        try:
+            res = await asyncio.to_thread(
+                subprocess.check_output,
+                ["nvidia-smi", "--query-gpu=memory.used,memory.total", "--format=csv,noheader,nounits"],
+                encoding="utf-8",
+                timeout=2
+            )
+            used, total = map(int, res.strip().split("\n")[0].split(","))
+            self._gpu = (used, total)
+        except Exception as e:
+            if self._gpu_sampled_at == 0.0:
+                logger.warning(f"⚠️ GPU stats unavailable, routing without VRAM signal: {e}")
+            self._gpu = (None, None)
+        self._gpu_sampled_at = time.monotonic()
+        return self._gpu
+
+    @staticmethod
+    def _system_load() -> float:
+        try:
+            return round(os.getloadavg()[0] / (os.cpu_count() or 1) * 100, 1)
+        except OSError:
+            return 0.0
+
+    # --- Estimates ---
+
+    def needs_load(self, model_name: str, load: LoadSnapshot) -> bool:
+        """
+        True when serving `model_name` locally means loading it first: another model
+        is hot, or nothing is hot and the GPU has no room left for it.
+        """
+        if load.hot_model is not None:
+            return load.hot_model != model_name
+        spec = ShellRegistry.get_model(model_name)
+        free = load.vram_free_gb
+        return bool(spec and spec.vram_required_gb and free is not None and free < spec.vram_required_gb)
+
+    def estimate_l1_wait_ms(self, model_name: str, load: LoadSnapshot) -> float:
+        """
+        Pessimistic (p95) time until a new request for `model_name` would finish
+        locally: the L1 backlog served one at a time on the hot model, a model load
+        if one is needed, then the request itself.
+        """
+        own_ms = ShellRegistry.estimate_latency_ms(model_name, tail=True) or 0.0
+        ahead_ms = 0.0
+        if load.l1_backlog:
+            per_request = ShellRegistry.estimate_latency_ms(load.hot_model or model_name, tail=True) or own_ms
+            ahead_ms = load.l1_backlog * per_request
+        switch_ms = ShellRegistry.estimate_load_ms(model_name, tail=True) if self.needs_load(model_name, load) else 0.0
+        return ahead_ms + switch_ms + own_ms
@@ -0,0 +1,158 @@
+import time
+import asyncio
+import logging
+import contextvars
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.metrics import observe_queue_wait
+from app.services.scheduler.queue import RequestQueue
+
+logger = logging.getLogger("Gravitas_SCHEDULER_POOL")
+
+
+class QueueFullError(Exception):
+    """Raised when a tier's queue is at its depth limit; the caller should retry later."""
+    def __init__(self, tier: str, depth: int):
+        self.tier = tier
+        self.depth = depth
+        super().__init__(f"{tier} queue full ({depth} waiting)")
+
+
+@dataclass
+class Job:
+    tier: str
+    run: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    priority: int = 10
+    model: Optional[str] = None  # Target shell (lets an AffinityQueue batch by model)
+    # Submitter's context, so spans opened by the job nest under the request's trace
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def wait_s(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return self.started_at - self.enqueued_at
+
+
+class WorkerPool:
+    """
+    Tier-aware workers behind one RequestQueue per tier.
+
+    Each tier gets as many workers as its concurrency limit: L1 defaults to a
+    single worker (the local GPU serves one model at a time), L2/L3 to what the
+    provider rate limits allow. Queues are bounded so a burst is refused up front
+    instead of piling up behind Ollama. Lower priority values run first;
+    negative priorities jump the line via push_to_front.
+    """
+
+    def __init__(self, limits: Dict[str, int], max_depth: int = 0, queues: Optional[Dict[str, Any]] = None):
+        self.limits = limits
+        self.max_depth = max_depth  # Per tier; 0 = unbounded
+        # Any object with the RequestQueue interface can replace a tier's queue
+        self.queues: Dict[str, RequestQueue] = {tier: (queues or {}).get(tier) or RequestQueue() for tier in limits}
+        self.busy: Dict[str, int] = {tier: 0 for tier in limits}
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """Spawns the workers on the running loop (no-op if already running)."""
+        if self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        for tier, limit in self.limits.items():
+            for n in range(limit):
+                self._workers.append(loop.create_task(self._worker(tier), name=f"supervisor-{tier}-{n}"))
+        logger.info(f"👷 Worker pool started: {self.limits}")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def qsize(self, tier: Optional[str] = None) -> int:
+        if tier is not None:
+            return self.queues[tier].qsize()
+        return sum(queue.qsize() for queue in self.queues.values())
+
+    @property
+    def active(self) -> int:
+        return sum(self.busy.values())
+
+    def drain_estimate_s(self, tier: str, per_request_ms: float) -> float:
+        """Seconds until the work already queued or running on `tier` is done."""
+        backlog = self.queues[tier].qsize() + self.busy[tier]
+        return backlog / max(1, self.limits[tier]) * per_request_ms / 1000
+
+    async def submit(self, tier: str, run: Callable[[], Awaitable[Any]], priority: int = 10,
+                     model: Optional[str] = None) -> Any:
+        """
+        Queues `run` on `tier` and waits for its result. Cancelling the caller
+        drops the job if it is still queued and cancels it if it is running.
+        """
+        job = await self.enqueue(tier, run, priority=priority, model=model)
+        return await self.wait(job)
+
+    async def enqueue(self, tier: str, run: Callable[[], Awaitable[Any]], priority: int = 10,
+                      model: Optional[str] = None) -> Job:
+        """Queues `run` on `tier` without waiting (raises QueueFullError if the tier is full)."""
+        self.start()
+        queue = self.queues[tier]
+        if self.max_depth and queue.qsize() >= self.max_depth:
+            raise QueueFullError(tier, queue.qsize())
+
+        job = Job(tier=tier, run=run, future=asyncio.get_running_loop().create_future(),
+                  priority=priority, model=model)
+        if priority < 0:
+            await queue.push_to_front(job)
+        else:
+            await queue.enqueue(job, priority=priority)
+        return job
+
+    async def wait(self, job: Job) -> Any:
+        """Waits for a queued job; cancelling the caller drops or cancels the job."""
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            self.cancel(job)
+            raise
+
+    def cancel(self, job: Job):
+        """Takes a waiting job out of its queue (so depth and wait estimates forget it) or cancels it if running."""
+        job.future.cancel()
+        if job.started_at is None:
+            self.queues[job.tier].remove(job)
+        elif job.task is not None:
+            job.task.cancel()
+
+    async def _worker(self, tier: str):
+        queue = self.queues[tier]
+        while True:
+            job = await queue.dequeue()
+            if job.future.done():
+                continue  # Caller gave up while queued
+
+            job.started_at = time.perf_counter()
+            observe_queue_wait(tier, job.wait_s)
+            self.busy[tier] += 1
+            try:
+                job.task = job.context.run(asyncio.ensure_future, job.run())
+                result = await asyncio.shield(job.task)
+            except asyncio.CancelledError:
+                if job.task is not None and job.task.cancelled():
+                    continue  # The job was cancelled, not this worker
+                if job.task is not None:
+                    job.task.cancel()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.busy[tier] -= 1
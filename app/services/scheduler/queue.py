@@ -20,12 +20,15 @@ class RequestQueue:
     def __init__(self):
         self._queue = asyncio.PriorityQueue()
         self._counter = itertools.count()
+        self._queued = set()  # id() of requests still waiting
+        self._removed = set()  # id() of removed requests, skipped when they reach the head
 
     async def enqueue(self, request: Any, priority: int = 10):
         """
         Add a request to the queue.
         """
         count = next(self._counter)
+        self._queued.add(id(request))
         await self._queue.put(QueuedItem(priority=priority, sequence=count, request=request))
 
     async def push_to_front(self, request: Any):
@@ -41,11 +44,29 @@ class RequestQueue:
         """
         Retrieve the next request from the queue.
         """
-        item = await self._queue.get()
-        return item.request
+        while True:
+            item = await self._queue.get()
+            key = id(item.request)
+            if key in self._removed:
+                self._removed.discard(key)
+                continue
+            self._queued.discard(key)
+            return item.request
+
+    def remove(self, request: Any) -> bool:
+        """
+        Withdraws a request that is still waiting (e.g. its caller gave up).
+        Returns False if it was already dequeued.
+        """
+        key = id(request)
+        if key not in self._queued:
+            return False
+        self._queued.discard(key)
+        self._removed.add(key)
+        return True
 
     def qsize(self) -> int:
-        return self._queue.qsize()
+        return len(self._queued)
 
     def empty(self) -> bool:
-        return self._queue.empty()
+        return not self._queued
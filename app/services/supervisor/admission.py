@@ -0,0 +1,69 @@
+import math
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Optional
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger("Gravitas_SUPERVISOR_ADMISSION")
+
+CLIENT_CLOSED_REQUEST = 499  # nginx convention; never reaches the (gone) client, but shows in /metrics
+
+
+@dataclass
+class Deadline:
+    """A request's latency budget, counted from its arrival at the supervisor."""
+    budget_ms: Optional[float] = None  # None = no deadline
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started_at) * 1000
+
+    @property
+    def remaining_ms(self) -> Optional[float]:
+        if not self.budget_ms:
+            return None
+        return self.budget_ms - self.elapsed_ms
+
+    def admits(self, eta_ms: float) -> bool:
+        remaining = self.remaining_ms
+        return remaining is None or eta_ms <= remaining
+
+    def retry_after(self, eta_ms: float) -> int:
+        """Whole seconds until a request with the same budget could expect to make it."""
+        remaining = self.remaining_ms or 0.0
+        return max(1, math.ceil((eta_ms - remaining) / 1000))
+
+    async def run(self, work: Awaitable[Any]) -> Any:
+        """Awaits `work`, cancelling it (and raising 504) once the budget is spent."""
+        remaining = self.remaining_ms
+        if remaining is None:
+            return await work
+        try:
+            return await asyncio.wait_for(work, timeout=max(0.0, remaining) / 1000)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail=f"Deadline of {self.budget_ms:.0f}ms exceeded")
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[Any], poll_interval: float = 0.5) -> Any:
+    """
+    Runs `work` while watching the client connection. If the client goes away the
+    work is cancelled, which drops a queued job or aborts the upstream LLM call.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                logger.info(f"🔌 Client disconnected from {request.url.path}, cancelled upstream work")
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
@@ -10,6 +10,8 @@ from app.services.security.policy_engine import policy_engine
 # but for local fallback we might skip or use the local one.
 # Given the plan says "Duplicate security logic", we can use the local modules.
 from app.services.security.audit_log import audit_logger, AuditEvent
+from app.services.tracing import inject, span
+from app.services.http_clients import HttpClientRegistry
 
 logger = logging.getLogger("Gravitas_GATEKEEPER_CLIENT")
 
@@ -31,16 +33,19 @@ class GatekeeperClient:
         """
         if not self.circuit_open:
             try:
-                async with httpx.AsyncClient(timeout=0.5) as client: # strict timeout
+                with span("gatekeeper.validate", kind="client", resource=resource) as call:
                     payload = {
                         "action": action,
                         "resource": resource,
                         "metadata": metadata
                     }
-                    headers = {"Authorization": f"Bearer {token}"}
-                    
-                    response = await client.post(f"{GATEKEEPER_URL}/validate", json=payload, headers=headers)
-                    
+                    headers = inject({"Authorization": f"Bearer {token}"})
+
+                    response = await HttpClientRegistry.get("gatekeeper").post(
+                        f"{GATEKEEPER_URL}/validate", json=payload, headers=headers, timeout=0.5  # strict timeout
+                    )
+                    call.set_attribute("http.status_code", response.status_code)
+
                     if response.status_code == 200:
                         return response.json()
                     elif response.status_code in [401, 403]:
@@ -50,7 +55,7 @@ class GatekeeperClient:
                     else:
                         logger.warning(f"Gatekeeper returned unexpected status {response.status_code}. Falling back.")
                         # server error, fall back
-                        
+
             except httpx.RequestError as e:
                 logger.error(f"Gatekeeper unreachable: {e}. Falling back to local validation.")
                 # Fallback
@@ -65,7 +70,8 @@ class GatekeeperClient:
         logger.info(f"⚠️ Using LOCAL validation fallback for {resource}")
         
         # 1. Auth
-        claims = decode_access_token(token)
+        with span("auth", local=True):
+            claims = decode_access_token(token)
         if not claims:
              return {"allowed": False, "error_code": 401, "detail": "Invalid or expired token (Local)"}
              
@@ -73,11 +79,12 @@ class GatekeeperClient:
         groups = claims.get("groups", [])
         
         # 2. Policy
-        allowed = policy_engine.check_permission(
-            ghost_id=ghost_id,
-            action=action,
-            resource=resource
-        )
+        with span("policy", resource=resource, local=True):
+            allowed = policy_engine.check_permission(
+                ghost_id=ghost_id,
+                action=action,
+                resource=resource
+            )
         
         # 3. Audit (Local)
         audit_result = "ALLOWED" if allowed else "DENIED"
@@ -92,7 +99,8 @@ class GatekeeperClient:
             reason=audit_reason,
             metadata=metadata
         )
-        await audit_logger.log_event(event)
+        with span("audit.enqueue", local=True):
+            await audit_logger.log_event(event)
         
         if not allowed:
              return {"allowed": False, "error_code": 403, "detail": "Access denied by policy (Local)"}
@@ -11,6 +11,8 @@ from typing import Optional
 from pathlib import Path
 from dataclasses import dataclass
 
+from app.services.tracing import TRACE_HOOKS, span
+
 from app.services.supervisor.guardian import (
     SupervisorGuardian,
     AgentNotCertifiedError,
@@ -52,7 +54,7 @@ class GuardianClient:
             except Exception as e:
                 logger.warning(f"Failed to initialize local Guardian fallback: {e}")
         
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        self.client = httpx.AsyncClient(timeout=self.timeout, event_hooks=TRACE_HOOKS)
         logger.info(f"Guardian client initialized (service: {self.guardian_url}, fallback: {fallback_to_local})")
     
     async def notify_session_start(
@@ -66,15 +68,16 @@ class GuardianClient:
         Falls back to local Guardian if service unavailable.
         """
         try:
-            resp = await self.client.post(
-                f"{self.guardian_url}/session/start",
-                json={
-                    "agent": agent,
-                    "session_id": session_id,
-                    "metadata": metadata
-                }
-            )
-            resp.raise_for_status()
+            with span("guardian.session_start", kind="client", agent=agent):
+                resp = await self.client.post(
+                    f"{self.guardian_url}/session/start",
+                    json={
+                        "agent": agent,
+                        "session_id": session_id,
+                        "metadata": metadata
+                    }
+                )
+                resp.raise_for_status()
             data = resp.json()
             return SessionPermission(allowed=data["allowed"], reason=data.get("reason"))
             
@@ -100,14 +103,15 @@ class GuardianClient:
         Falls back to local Guardian if service unavailable.
         """
         try:
-            resp = await self.client.post(
-                f"{self.guardian_url}/session/end",
-                json={
-                    "session_id": session_id,
-                    "output_file": str(output_file)
-                }
-            )
-            resp.raise_for_status()
+            with span("guardian.session_end", kind="client"):
+                resp = await self.client.post(
+                    f"{self.guardian_url}/session/end",
+                    json={
+                        "session_id": session_id,
+                        "output_file": str(output_file)
+                    }
+                )
+                resp.raise_for_status()
             
         except Exception as e:
             logger.warning(f"Guardian service error during session_end: {e}")
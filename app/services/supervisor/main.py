@@ -8,6 +8,10 @@ from app.services.supervisor.database import db
 from app.services.supervisor.router import router as supervisor_router, engine
 # from app.services.security.auth import decode_access_token # Removed
 from app.services.security.badges import badge_system
+from app.services.metrics import instrument_app
+from app.services.tracing import instrument_tracing, tracer
+from app.services.registry.shell_registry import ShellRegistry
+from app.services.http_clients import HttpClientRegistry
 
 # ... (rest of imports)
 
@@ -34,10 +38,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Initialization failed: {e}")
     
+    # Routing reads measured shell latency/throughput from telemetry
+    ShellRegistry.start_live_refresh()
+    engine.pool.start()
+    
     yield
     
     # Shutdown: Disconnect
+    await engine.pool.stop()
+    await ShellRegistry.stop_live_refresh()
     await db.disconnect()
+    await tracer.shutdown()
+    await HttpClientRegistry.aclose()  # After the tracer's final OTLP flush
     logger.info("🛑 Supervisor Service shutting down.")
 
 app = FastAPI(
@@ -46,6 +58,10 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan
 )
+instrument_app(app, "supervisor", queues={
+    f"supervisor_{tier.lower()}": queue.qsize for tier, queue in engine.pool.queues.items()
+}, pool=lambda: db.pool)
+instrument_tracing(app, "supervisor")
 
 # --- Security Middleware ---
 
@@ -54,8 +70,9 @@ app = FastAPI(
 async def health():
     return {
         "status": "healthy",
-        "queue_size": engine.queue.qsize(),
+        "queue_size": engine.pool.qsize(),
         "active_workers": engine.active_workers,
+        "queues": {tier: engine.pool.qsize(tier) for tier in engine.pool.queues},
         "mode": "standalone"
     }
 
@@ -67,7 +84,7 @@ async def root():
     return {
         "service": "Gravitas Supervisor",
         "status": "online",
-        "endpoints": ["/v1/chat/completions", "/health"]
+        "endpoints": ["/v1/chat/completions", "/health", "/metrics", "/traces"]
     }
 
 if __name__ == "__main__":
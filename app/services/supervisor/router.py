@@ -2,16 +2,26 @@ import os
 import time
 import uuid
 import logging
+import math
+import json
 import asyncio
-from typing import Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Depends
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from app.config import config
+from app.services.audit.shadow_audit import ActualPerformance, RoutingDecision, TelemetrySnapshot, get_audit_loop
 from app.services.registry.ghost_registry import GhostRegistry, GhostSpec
 from app.services.registry.shell_registry import ShellRegistry, ModelSpec, ModelTier
 from app.services.supervisor.guardian_client import GuardianClient
 from app.services.supervisor.guardian import AgentNotCertifiedError
-from app.services.scheduler.queue import RequestQueue
+from app.services.scheduler.lock import ModelLock
+from app.services.scheduler.load import LoadMonitor, LoadSnapshot
+from app.services.scheduler.pool import QueueFullError, WorkerPool
+from app.services.scheduler.affinity import AffinityQueue
+from app.services.supervisor.admission import Deadline, cancel_on_disconnect
 from app.services.supervisor.gatekeeper_client import gatekeeper_client
 from app.wrappers.base_wrapper import GravitasAgentWrapper
 from app.wrappers.gemini_wrapper import GeminiWrapper
@@ -30,8 +40,18 @@ class ChatCompletionRequest(BaseModel):
     complexity: Optional[int] = 5
     priority: Optional[int] = 10
     force_tier: Optional[str] = None
-    stream: Optional[bool] = False
+    stream: Optional[bool] = False  # Server-sent `chat.completion.chunk` events as tokens arrive
     max_tokens: Optional[int] = 4096
+    deadline_ms: Optional[float] = None  # Latency budget; local work that would miss it spills to L2
+
+@dataclass
+class RoutingPlan:
+    """Where a request runs, why, and the latency we expect for it (audited against the actual)."""
+    tier: ModelTier
+    shell: str
+    reasoning: str
+    expected_latency_ms: float = 0.0
+    spilled_from: Optional[str] = None  # L1 shell the request was moved away from
 
 # --- Supervisor Engine ---
 
@@ -41,27 +61,189 @@ class SupervisorEngine:
     """
     def __init__(self):
         self.guardian = GuardianClient(fallback_to_local=True)
-        self.queue = RequestQueue()
-        self.active_workers = 0
-        self.max_workers = 5 # Parallelism for L2/L3, L1 is serialized by model lock
+        self.model_lock = ModelLock()
+        self.pool = WorkerPool({
+            ModelTier.L1.value: config.SUPERVISOR_WORKERS_L1,  # Serialized: one model hot on the local GPU
+            ModelTier.L2.value: config.SUPERVISOR_WORKERS_L2,
+            ModelTier.L3.value: config.SUPERVISOR_WORKERS_L3,
+        }, max_depth=config.SUPERVISOR_QUEUE_MAX, queues={
+            ModelTier.L1.value: AffinityQueue(self.model_lock)  # Batches L1 work by shell to avoid VRAM thrash
+        })
+        self.queue = self.pool.queues[ModelTier.L1.value]  # L1 backlog drives routing
+        self.load = LoadMonitor(self.queue, self.model_lock)
+        self.audit = get_audit_loop()
+
+    @property
+    def active_workers(self) -> int:
+        return self.pool.active
 
-    def determine_routing(self, request: ChatCompletionRequest) -> ModelTier:
+    def determine_routing(self, request: ChatCompletionRequest, shell_name: Optional[str] = None,
+                          load: Optional[LoadSnapshot] = None) -> ModelTier:
         """
         Logic from docs/007_model_governance.md
         """
+        return self.plan_routing(request, shell_name or request.model, load).tier
+
+    def plan_routing(self, request: ChatCompletionRequest, shell_name: str,
+                     load: Optional[LoadSnapshot] = None) -> RoutingPlan:
+        """
+        Routing decision for `shell_name`. Without a load snapshot only the static
+        rules apply; with one, local work spills to the fastest L2 shell when the
+        host is overloaded or the estimated L1 wait would miss the deadline.
+        """
         if request.force_tier:
-            return ModelTier(request.force_tier)
+            tier = ModelTier(request.force_tier)
+            return RoutingPlan(tier, shell_name, "forced tier", self._remote_eta_ms(tier, shell_name))
         
         # Rule A: Complexity Threshold
         if request.complexity > 8:
-            return ModelTier.L3
-            
-        # Rule B: System Load Protection (Placeholder for telemetry integration)
-        # if telemetry.system_load_percent > 90:
-        #     return ModelTier.L2
+            return RoutingPlan(ModelTier.L3, shell_name, f"complexity {request.complexity} > 8",
+                               self._remote_eta_ms(ModelTier.L3, shell_name))
+
+        spec = ShellRegistry.get_model(shell_name)
+        if spec and spec.tier != ModelTier.L1:
+            return RoutingPlan(spec.tier, shell_name, "remote shell", self._remote_eta_ms(spec.tier, shell_name))
+        if load is None:
+            return RoutingPlan(ModelTier.L1, shell_name, "default",
+                               ShellRegistry.estimate_latency_ms(shell_name, tail=True) or 0.0)
+
+        wait_ms = self.load.estimate_l1_wait_ms(shell_name, load)
+        deadline = request.deadline_ms or config.ROUTING_DEFAULT_DEADLINE_MS
+        local = f"L1 wait {wait_ms:.0f}ms (backlog {load.l1_backlog}, hot {load.hot_model})"
+        spill = self._spill_target()
+
+        # Rule B: System Load Protection
+        if spill and load.system_load_percent > config.ROUTING_MAX_SYSTEM_LOAD:
+            return RoutingPlan(ModelTier.L2, spill[1], f"system load {load.system_load_percent}%", spill[0], shell_name)
+
+        # Rule B2: Deadline Protection (only when the cloud is actually faster)
+        if spill and deadline and wait_ms > deadline and spill[0] < wait_ms:
+            return RoutingPlan(
+                ModelTier.L2, spill[1], f"{local} > deadline {deadline:.0f}ms", spill[0], shell_name
+            )
             
         # Rule C: Default Path
-        return ModelTier.L1
+        return RoutingPlan(ModelTier.L1, shell_name, local, wait_ms)
+
+    @staticmethod
+    def _lane(tier: ModelTier, shell_name: str) -> ModelTier:
+        """
+        Worker pool lane the shell executes in. Ollama shells share the local GPU,
+        so they always take the serialized L1 lane, even when forced or escalated
+        to another tier.
+        """
+        spec = ShellRegistry.get_model(shell_name)
+        if spec and (spec.provider or "").lower() == "ollama":
+            return ModelTier.L1
+        return tier
+
+    def _remote_eta_ms(self, tier: ModelTier, shell_name: str) -> float:
+        """p95 completion time on a bounded tier: its queued/running work, then this request."""
+        own = ShellRegistry.estimate_latency_ms(shell_name, tail=True) or 0.0
+        lane = self._lane(tier, shell_name).value
+        if lane not in self.pool.queues:
+            return own
+        return self.pool.drain_estimate_s(lane, own) * 1000 + own
+
+    def _spill_target(self) -> Optional[tuple]:
+        """(p95 completion time, name) of the fastest L2 shell, or None if none is registered."""
+        candidates = [
+            (self._remote_eta_ms(ModelTier.L2, name), name)
+            for name in ShellRegistry.get_models_by_tier(ModelTier.L2)
+            if ShellRegistry.estimate_latency_ms(name, tail=True) is not None
+        ]
+        return min(candidates) if candidates else None
+
+    async def _audit_decision(self, request: ChatCompletionRequest, plan: RoutingPlan,
+                              load: LoadSnapshot) -> Optional[str]:
+        try:
+            return await self.audit.log_routing_decision(
+                complexity=request.complexity,
+                telemetry=TelemetrySnapshot(
+                    vram_usage_percent=load.vram_usage_percent,
+                    system_load_percent=load.system_load_percent,
+                    avg_latency_ms=plan.expected_latency_ms,
+                    queue_depth=load.queue_depth,
+                    in_flight=load.in_flight,
+                    hot_model=load.hot_model,
+                    deadline_ms=request.deadline_ms or config.ROUTING_DEFAULT_DEADLINE_MS or None
+                ),
+                routing=RoutingDecision(
+                    tier=plan.tier.value, model=plan.shell, reasoning=plan.reasoning,
+                    complexity_estimated=request.complexity
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Routing audit failed: {e}")
+            return None
+
+    async def _audit_outcome(self, audit_id: Optional[str], wrapper: GravitasAgentWrapper, shell_name: str,
+                             started: float, error: Optional[str] = None):
+        if audit_id is None:
+            return
+        stream = getattr(wrapper, "stream", None)
+        tokens = stream.tokens if stream is not None else 0
+        try:
+            await self.audit.log_actual_performance(audit_id, ActualPerformance(
+                latency_ms=(time.perf_counter() - started) * 1000,
+                tokens_generated=tokens,
+                success=error is None,
+                cost=ShellRegistry.estimate_cost(shell_name, tokens),
+                error=error
+            ))
+        except Exception as e:
+            logger.warning(f"Routing audit failed: {e}")
+
+    async def _stream_chunks(self, execution: asyncio.Future, deltas: asyncio.Queue, session_id: str,
+                             shell_name: str, audit_id: Optional[str], wrapper: GravitasAgentWrapper,
+                             started: float) -> AsyncIterator[str]:
+        """
+        OpenAI-style SSE for a streamed completion: a role chunk, one chunk per output
+        delta as the worker produces it, a final chunk with finish_reason, `[DONE]`.
+        Failures after the response has started are sent as an `error` event.
+        If the client disconnects, the generation is cancelled.
+        """
+        chunk_id, created = f"chatcmpl-{session_id}", int(time.time())
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            return "data: " + json.dumps({
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": shell_name,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }) + "\n\n"
+
+        error = "cancelled"
+        try:
+            yield chunk({"role": "assistant"})
+            while (delta := await deltas.get()) is not None:
+                yield chunk({"content": delta})
+
+            status_code = 500
+            try:
+                execution.result()
+                error = None
+            except HTTPException as e:
+                status_code, error = e.status_code, str(e.detail)
+            except AgentNotCertifiedError as e:
+                status_code, error = 403, str(e)
+            except Exception as e:
+                logger.error(f"Streamed execution failed: {e}")
+                error = str(e)
+
+            if error is None:
+                logger.info(f"Streamed execution successful on {shell_name}")
+                yield chunk({}, finish_reason="stop")
+            else:
+                yield "data: " + json.dumps({"error": {"message": error, "code": status_code}}) + "\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            if not execution.done():
+                # Client went away mid-stream: drop the queued job or abort the upstream call
+                execution.cancel()
+                await asyncio.gather(execution, return_exceptions=True)
+            await asyncio.shield(self._audit_outcome(audit_id, wrapper, shell_name, started, error=error))
 
     def get_wrapper(self, ghost_name: str, shell_name: str, tier: ModelTier, session_id: str) -> GravitasAgentWrapper:
         """
@@ -104,9 +286,7 @@ class SupervisorEngine:
         The main processing flow.
         """
         session_id = str(uuid.uuid4())
-        
-        # 1. Routing Decision
-        target_tier = self.determine_routing(request)
+        deadline = Deadline(request.deadline_ms or config.ROUTING_DEFAULT_DEADLINE_MS or None)
         
         # 'request.model' specifies the TARGET execution shell (e.g. "gemma2:27b")
         # However, if the user requested a Ghost Name as the model (e.g. "Librarian"),
@@ -119,6 +299,11 @@ class SupervisorEngine:
         else:
             # User asked for "gemma2:27b" -> use as is
             shell_name = request.model
+
+        # 1. Routing Decision (may move L1 work to an L2 shell under load)
+        load = await self.load.snapshot()
+        plan = self.plan_routing(request, shell_name, load)
+        target_tier, shell_name = plan.tier, plan.shell
             
         # 2. Gatekeeper Validation (Auth + Policy + Audit)
         if not authorization:
@@ -145,6 +330,19 @@ class SupervisorEngine:
             resource=shell_name, 
             metadata=metadata
         )
+
+        if not validation["allowed"] and plan.spilled_from:
+            # Policy does not allow the cloud shell for this caller: wait for the local one instead
+            logger.info(f"Spill to {shell_name} denied, staying on {plan.spilled_from}")
+            plan = RoutingPlan(ModelTier.L1, plan.spilled_from, "spill denied by policy",
+                               self.load.estimate_l1_wait_ms(plan.spilled_from, load))
+            target_tier, shell_name = plan.tier, plan.shell
+            validation = await gatekeeper_client.validate_request(
+                token=token,
+                action="execute",
+                resource=shell_name,
+                metadata={"shell_id": shell_name, "routing_tier": target_tier.value}
+            )
         
         if not validation["allowed"]:
             detail = validation.get("detail", "Access denied")
@@ -162,17 +360,57 @@ class SupervisorEngine:
             logger.error(f"Failed to create wrapper: {e}")
             raise HTTPException(status_code=400, detail=str(e))
 
-        # 4. Certification Check (Implicit in execute_task, but we should be aware)
-        # and Queue Submission
-        # Note: True queuing logic for L1 (shared VRAM) would involve a worker loop
-        # For this implementation, we'll execute it and let guardian handle session tracking.
+        # 4. Queue Submission (certification is implicit in execute_task, run by the tier's worker)
         
-        logger.info(f"Routing {ghost_name} to {shell_name} ({target_tier.value})")
+        lane = self._lane(target_tier, shell_name)
+        logger.info(f"Routing {ghost_name} to {shell_name} ({target_tier.value}): {plan.reasoning}")
+        audit_id = await self._audit_decision(request, plan, load)
+        started = time.perf_counter()
+
+        # 5. Admission: refuse early what cannot finish in time, rather than let it time out in a queue
+        if not deadline.admits(plan.expected_latency_ms):
+            retry_after = deadline.retry_after(plan.expected_latency_ms)
+            detail = f"Expected {plan.expected_latency_ms:.0f}ms on {shell_name}, deadline {deadline.budget_ms:.0f}ms"
+            logger.warning(f"Rejecting request: {detail}")
+            await self._audit_outcome(audit_id, wrapper, shell_name, started, error=f"rejected: {detail}")
+            raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
         
         try:
             # We wrap the internal execution to match our spec's task format
-            task = {"prompt": request.messages[-1]["content"], "messages": request.messages}
-            result = await wrapper.execute_task(task)
+            task = {
+                "prompt": request.messages[-1]["content"],
+                "messages": request.messages,
+                "queued_at": time.perf_counter()  # Queue wait is measured from here to generation start
+            }
+
+            deltas = asyncio.Queue() if request.stream else None
+
+            async def run():
+                with self.load.track(lane.value):
+                    if deltas is None:
+                        result = await wrapper.execute_task(task)
+                    else:
+                        # Forward tokens to the SSE response as the wrapper produces them
+                        async for delta in wrapper.stream_task(task):
+                            deltas.put_nowait(delta)
+                        result = wrapper.result
+                if lane == ModelTier.L1:
+                    await self.model_lock.set_model(shell_name)  # Ollama keeps the last served model hot
+                return result
+
+            priority = request.priority if request.priority is not None else 10
+            if deltas is not None:
+                job = await self.pool.enqueue(lane.value, run, priority=priority, model=shell_name)
+                execution = asyncio.ensure_future(deadline.run(self.pool.wait(job)))
+                execution.add_done_callback(lambda _: deltas.put_nowait(None))
+                logger.info(f"Streaming {ghost_name} from {shell_name}")
+                return StreamingResponse(
+                    self._stream_chunks(execution, deltas, session_id, shell_name, audit_id, wrapper, started),
+                    media_type="text/event-stream"
+                )
+
+            result = await deadline.run(self.pool.submit(lane.value, run, priority=priority, model=shell_name))
+            await self._audit_outcome(audit_id, wrapper, shell_name, started)
             
             # Audit success via standard logging (Gatekeeper logged the access grant)
             logger.info(f"Execution successful for {ghost_name} on {shell_name}")
@@ -199,10 +437,25 @@ class SupervisorEngine:
                     "total_tokens": 0
                 }
             }
+        except QueueFullError as e:
+            await self._audit_outcome(audit_id, wrapper, shell_name, started, error=str(e))
+            per_request = ShellRegistry.estimate_latency_ms(shell_name, tail=True) or 1000.0
+            retry_after = math.ceil(self.pool.drain_estimate_s(lane.value, per_request)) or 1
+            logger.warning(f"Shedding request for {shell_name}: {e}, retry in {retry_after}s")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(retry_after)})
         except AgentNotCertifiedError as e:
+            await self._audit_outcome(audit_id, wrapper, shell_name, started, error=str(e))
             raise HTTPException(status_code=403, detail=str(e))
+        except HTTPException as e:
+            await self._audit_outcome(audit_id, wrapper, shell_name, started, error=str(e.detail))
+            raise
+        except asyncio.CancelledError:
+            # Client went away: the pool has already dropped or cancelled the upstream call
+            await asyncio.shield(self._audit_outcome(audit_id, wrapper, shell_name, started, error="cancelled"))
+            raise
         except Exception as e:
             logger.error(f"Execution failed: {e}")
+            await self._audit_outcome(audit_id, wrapper, shell_name, started, error=str(e))
             raise HTTPException(status_code=500, detail=str(e))
 
 # --- API Router ---
@@ -213,7 +466,7 @@ engine = SupervisorEngine()
 from fastapi import Header
 
 @router.post("/v1/chat/completions")
-async def chat_completions(request: ChatCompletionRequest, authorization: Optional[str] = Header(None)):
+async def chat_completions(request: ChatCompletionRequest, http_request: Request, authorization: Optional[str] = Header(None)):
     if not authorization:
         # Check env for AUTH_DISABLED, but really Gatekeeper handles that logic too? 
         # Gatekeeper client local fallback handles AUTH_DISABLED check if implemented there.
@@ -221,6 +474,24 @@ async def chat_completions(request: ChatCompletionRequest, authorization: Option
         # Actually Supervisor main.py had logic for AUTH_DISABLED.
         pass
     
-    return await engine.process_chat(request, authorization)
+    return await cancel_on_disconnect(
+        http_request, engine.process_chat(request, authorization), poll_interval=config.DISCONNECT_POLL_INTERVAL
+    )
+
+@router.get("/v1/routing/stats")
+async def routing_stats():
+    """Audited outcomes per tier plus the current load signals behind routing."""
+    load = await engine.load.snapshot()
+    return {
+        "tiers": {tier.value: await engine.audit.get_tier_statistics(tier.value) for tier in ModelTier},
+        "l1_scheduler": engine.queue.stats(),
+        "load": {
+            "queue_depth": load.queue_depth,
+            "in_flight": load.in_flight,
+            "hot_model": load.hot_model,
+            "vram_free_gb": load.vram_free_gb,
+            "system_load_percent": load.system_load_percent
+        }
+    }
 
 
@@ -2,12 +2,130 @@
 Gravitas Telemetry Service - Database Manager
 Manages PostgreSQL connection and schema for telemetry tables.
 """
+import re
+import json
 import logging
 import asyncpg
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 from app.config import config
+from app.services.telemetry.histogram import LogHistogram, SeriesKey, merge_series
 
 logger = logging.getLogger("Gravitas_TELEMETRY_DATABASE")
 
+# Raw events, one range partition per day (system_telemetry_pYYYYMMDD)
+RAW_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS system_telemetry (
+        id BIGSERIAL,
+        event_type VARCHAR(50) NOT NULL,
+        component VARCHAR(100),
+        value FLOAT,
+        metadata JSONB,
+        status VARCHAR(20),
+        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) PARTITION BY RANGE (timestamp)
+'''
+
+# Catches rows no daily partition covers yet (maintenance behind), so writes never fail
+DEFAULT_PARTITION = "system_telemetry_default"
+DEFAULT_PARTITION_SQL = f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF system_telemetry DEFAULT"
+
+# Rollup table -> date_trunc unit
+ROLLUPS = {"telemetry_rollup_minute": "minute", "telemetry_rollup_hour": "hour"}
+
+# component is '' (not NULL) for events without one, so it can sit in the primary key
+ROLLUP_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        bucket TIMESTAMP NOT NULL,
+        component VARCHAR(100) NOT NULL,
+        event_type VARCHAR(50) NOT NULL,
+        event_count BIGINT NOT NULL,
+        value_count BIGINT NOT NULL,
+        value_sum DOUBLE PRECISION,
+        value_min DOUBLE PRECISION,
+        value_max DOUBLE PRECISION,
+        p50 DOUBLE PRECISION,
+        p95 DOUBLE PRECISION,
+        tokens BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (bucket, component, event_type)
+    )
+'''
+
+ROLLUP_SQL = '''
+    INSERT INTO {table} (
+        bucket, component, event_type, event_count, value_count,
+        value_sum, value_min, value_max, p50, p95, tokens
+    )
+    SELECT
+        date_trunc('{unit}', timestamp),
+        COALESCE(component, ''),
+        event_type,
+        COUNT(*),
+        COUNT(value),
+        SUM(value),
+        MIN(value),
+        MAX(value),
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY value),
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY value),
+        COALESCE(SUM(CASE WHEN metadata->>'tokens_generated' ~ '^[0-9]+$'
+                          THEN (metadata->>'tokens_generated')::bigint END), 0)
+    FROM {source}
+    WHERE timestamp >= $1 AND timestamp < $2
+    GROUP BY 1, 2, 3
+    ON CONFLICT (bucket, component, event_type) DO UPDATE SET
+        event_count = EXCLUDED.event_count,
+        value_count = EXCLUDED.value_count,
+        value_sum = EXCLUDED.value_sum,
+        value_min = EXCLUDED.value_min,
+        value_max = EXCLUDED.value_max,
+        p50 = EXCLUDED.p50,
+        p95 = EXCLUDED.p95,
+        tokens = EXCLUDED.tokens
+'''
+
+# Persisted LogHistogram sketches; several rows may share a bucket and series
+# (e.g. two service instances) and are merged on read.
+HISTOGRAM_TABLES = {"telemetry_histogram_minute": "minute", "telemetry_histogram_hour": "hour"}
+
+HISTOGRAM_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        bucket TIMESTAMP NOT NULL,
+        component VARCHAR(100) NOT NULL,
+        event_type VARCHAR(50) NOT NULL,
+        event_count BIGINT NOT NULL,
+        sketch JSONB NOT NULL
+    )
+'''
+
+_PARTITION_NAME = re.compile(r"^system_telemetry_p(\d{8})$")
+
+
+def partition_name(day: date) -> str:
+    return f"system_telemetry_p{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    """Day covered by a raw partition, or None for tables that are not ours."""
+    match = _PARTITION_NAME.match(name)
+    return datetime.strptime(match.group(1), "%Y%m%d").date() if match else None
+
+
+def _decode_sketches(rows) -> List[Tuple[SeriesKey, LogHistogram]]:
+    decoded = []
+    for row in rows:
+        sketch = row["sketch"]
+        data = json.loads(sketch) if isinstance(sketch, str) else sketch
+        decoded.append(((row["component"], row["event_type"]), LogHistogram.from_dict(data)))
+    return decoded
+
+
+def _row_count(status: str) -> int:
+    """Row count from an asyncpg status string like 'INSERT 0 42'."""
+    try:
+        return int(str(status).split()[-1])
+    except (ValueError, IndexError):
+        return 0
+
 
 class TelemetryDatabase:
     """Database manager for telemetry service."""
@@ -29,7 +147,8 @@ class TelemetryDatabase:
                 host=config.DB_HOST,
                 port=config.DB_PORT,
                 min_size=2,
-                max_size=10
+                # Writers hold one connection each; leave room for query endpoints
+                max_size=max(config.TELEMETRY_DB_POOL_SIZE, config.TELEMETRY_WRITERS + 2)
             )
             logger.info("✅ PostgreSQL connection pool ready")
             
@@ -40,7 +159,8 @@ class TelemetryDatabase:
     async def init_schema(self):
         """
         Initialize telemetry database schema.
-        Creates system_telemetry and usage_stats tables.
+        Creates the daily-partitioned system_telemetry table (migrating a legacy
+        unpartitioned one), its minute/hour rollups and the usage_stats table.
         """
         if not self.pool:
             logger.warning("⚠️ Cannot initialize schema: Database not connected")
@@ -48,20 +168,23 @@ class TelemetryDatabase:
 
         try:
             async with self.pool.acquire() as conn:
-                # Create system_telemetry table
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS system_telemetry (
-                        id SERIAL PRIMARY KEY,
-                        event_type VARCHAR(50) NOT NULL,
-                        component VARCHAR(100),
-                        value FLOAT,
-                        metadata JSONB,
-                        status VARCHAR(20),
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # Create index on timestamp for efficient queries
+                # Rollups first: migrating a legacy table rolls its history up into them
+                for table in ROLLUPS:
+                    await conn.execute(ROLLUP_TABLE_SQL.format(table=table))
+                for table in HISTOGRAM_TABLES:
+                    await conn.execute(HISTOGRAM_TABLE_SQL.format(table=table))
+                    await conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket)")
+
+                relkind = await conn.fetchval(
+                    "SELECT relkind::text FROM pg_class WHERE oid = to_regclass('system_telemetry')"
+                )
+                if relkind == "r":
+                    await self._migrate_legacy(conn)
+                else:
+                    await conn.execute(RAW_TABLE_SQL)
+                    await conn.execute(DEFAULT_PARTITION_SQL)
+
+                # Create index on timestamp for efficient queries (inherited by every partition)
                 await conn.execute('''
                     CREATE INDEX IF NOT EXISTS idx_telemetry_timestamp 
                     ON system_telemetry(timestamp DESC)
@@ -72,6 +195,8 @@ class TelemetryDatabase:
                     CREATE INDEX IF NOT EXISTS idx_telemetry_component 
                     ON system_telemetry(component)
                 ''')
+
+                await self.ensure_partitions(conn)
                 
                 # Create usage_stats table
                 await conn.execute('''
@@ -93,11 +218,294 @@ class TelemetryDatabase:
                     ON usage_stats(timestamp DESC)
                 ''')
                 
-                logger.info("✅ Telemetry schema initialized (system_telemetry, usage_stats)")
+                logger.info("✅ Telemetry schema initialized (system_telemetry partitions, rollups, usage_stats)")
                 
         except Exception as e:
             logger.error(f"❌ Schema initialization failed: {e}")
 
+    async def _migrate_legacy(self, conn):
+        """
+        One-time move of an unpartitioned system_telemetry into daily partitions.
+        The whole history is first rolled up into the minute/hour rollups and hour
+        histograms (within their retention), so stats keep it. Raw rows are only
+        carried over inside the raw retention window; any dated past the last
+        partition created ahead wait in the default partition.
+        """
+        logger.info("🔄 Migrating system_telemetry to daily partitions...")
+        async with conn.transaction():
+            await conn.execute("ALTER TABLE system_telemetry RENAME TO system_telemetry_legacy")
+            await conn.execute("ALTER SEQUENCE IF EXISTS system_telemetry_id_seq RENAME TO system_telemetry_legacy_id_seq")
+            await conn.execute("DROP INDEX IF EXISTS idx_telemetry_timestamp")
+            await conn.execute("DROP INDEX IF EXISTS idx_telemetry_component")
+            await conn.execute(RAW_TABLE_SQL)
+            await conn.execute(DEFAULT_PARTITION_SQL)
+
+            rolled = await self._rollup_legacy(conn)
+
+            today = await conn.fetchval("SELECT CURRENT_DATE")
+            ahead = config.TELEMETRY_PARTITION_DAYS_AHEAD
+            first = await conn.fetchval(
+                "SELECT MIN(timestamp)::date FROM system_telemetry_legacy WHERE timestamp >= CURRENT_DATE - $1::int",
+                config.TELEMETRY_RAW_RETENTION_DAYS
+            )
+            if first:
+                first = min(first, today)
+                await self._create_partitions(conn, first, (today - first).days + ahead)
+            moved = await conn.execute('''
+                INSERT INTO system_telemetry (id, event_type, component, value, metadata, status, timestamp)
+                SELECT id, event_type, component, value, metadata, status, timestamp
+                FROM system_telemetry_legacy
+                WHERE timestamp >= CURRENT_DATE - $1::int
+            ''', config.TELEMETRY_RAW_RETENTION_DAYS)
+            await conn.execute(
+                "SELECT setval(pg_get_serial_sequence('system_telemetry', 'id'), "
+                "(SELECT COALESCE(MAX(id), 0) + 1 FROM system_telemetry), false)"
+            )
+            await conn.execute("DROP TABLE system_telemetry_legacy")
+        logger.info(f"✅ system_telemetry migrated to daily partitions ({_row_count(moved)} rows kept, rolled up: {rolled})")
+
+    async def _rollup_legacy(self, conn) -> Dict[str, int]:
+        """
+        Rolls system_telemetry_legacy up the way refresh_rollups would have:
+        minute buckets up to now, complete hours only, each within its retention.
+        Hour latency sketches are built from the raw values, since legacy rows
+        never went through the HistogramStore.
+        """
+        now = await conn.fetchval("SELECT LOCALTIMESTAMP")
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        retention = {
+            "minute": config.TELEMETRY_MINUTE_ROLLUP_RETENTION_DAYS,
+            "hour": config.TELEMETRY_HOUR_ROLLUP_RETENTION_DAYS,
+        }
+
+        def cutoff(days: int) -> datetime:
+            return datetime.combine(now.date() - timedelta(days=days), datetime.min.time())
+
+        rows = {}
+        for table, unit in ROLLUPS.items():
+            sql = ROLLUP_SQL.format(table=table, unit=unit, source="system_telemetry_legacy")
+            until = now if unit == "minute" else hour
+            rows[unit] = _row_count(await conn.execute(sql, cutoff(retention[unit]), until))
+
+        sketches: Dict[Tuple[datetime, SeriesKey], LogHistogram] = {}
+        async for row in conn.cursor('''
+            SELECT date_trunc('hour', timestamp) AS bucket, COALESCE(component, '') AS component, event_type, value
+            FROM system_telemetry_legacy
+            WHERE value IS NOT NULL AND timestamp >= $1 AND timestamp < $2
+        ''', cutoff(retention["hour"]), hour):
+            key = (row["bucket"], (row["component"], row["event_type"]))
+            if key not in sketches:
+                sketches[key] = LogHistogram(config.TELEMETRY_HISTOGRAM_ACCURACY)
+            sketches[key].add(row["value"])
+        if sketches:
+            await conn.executemany(
+                "INSERT INTO telemetry_histogram_hour (bucket, component, event_type, event_count, sketch) "
+                "VALUES ($1, $2, $3, $4, $5)",
+                [(bucket, component, event_type, h.count, json.dumps(h.to_dict()))
+                 for (bucket, (component, event_type)), h in sketches.items()]
+            )
+        rows["hour_histograms"] = len(sketches)
+        return rows
+
+    # --- Partitions, rollups and retention ---
+
+    async def _create_partitions(self, conn, first: date, days: int) -> List[str]:
+        """
+        Creates the daily partitions for first .. first + days. Postgres refuses to
+        add a range the default partition holds rows for, so those rows are moved
+        into a standalone table that is then attached as the day's partition.
+        """
+        created = []
+        async with conn.transaction():
+            # Writers routed to the default partition wait until their day has a partition
+            await conn.execute(f"LOCK TABLE {DEFAULT_PARTITION} IN EXCLUSIVE MODE")
+            parked = await conn.fetch(
+                f"SELECT DISTINCT timestamp::date AS day FROM {DEFAULT_PARTITION} "
+                f"WHERE timestamp >= $1::date AND timestamp < $2::date",
+                first, first + timedelta(days=days + 1)
+            )
+            parked_days = {row["day"] for row in parked}
+            for offset in range(days + 1):
+                day = first + timedelta(days=offset)
+                name = partition_name(day)
+                bounds = f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                if day in parked_days:
+                    await conn.execute(f"CREATE TABLE {name} (LIKE system_telemetry INCLUDING DEFAULTS)")
+                    moved = await conn.execute(f'''
+                        WITH moved AS (
+                            DELETE FROM {DEFAULT_PARTITION}
+                            WHERE timestamp >= $1::date AND timestamp < $2::date
+                            RETURNING *
+                        )
+                        INSERT INTO {name} SELECT * FROM moved
+                    ''', day, day + timedelta(days=1))
+                    await conn.execute(f"ALTER TABLE system_telemetry ATTACH PARTITION {name} {bounds}")
+                    logger.info(f"🧹 Moved {_row_count(moved)} telemetry rows from the default partition into {name}")
+                else:
+                    await conn.execute(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF system_telemetry {bounds}")
+                created.append(name)
+        return created
+
+    async def ensure_partitions(self, conn) -> List[str]:
+        """
+        Creates today's raw partition and the next TELEMETRY_PARTITION_DAYS_AHEAD,
+        reaching back to the oldest day still parked in the default partition.
+        """
+        today = await conn.fetchval("SELECT CURRENT_DATE")
+        parked = await conn.fetchval(
+            f"SELECT MIN(timestamp)::date FROM {DEFAULT_PARTITION} WHERE timestamp >= CURRENT_DATE - $1::int",
+            config.TELEMETRY_RAW_RETENTION_DAYS
+        )
+        first = min(parked or today, today)
+        return await self._create_partitions(conn, first, (today - first).days + config.TELEMETRY_PARTITION_DAYS_AHEAD)
+
+    async def refresh_rollups(self, conn) -> Dict[str, int]:
+        """
+        Aggregates raw events into the rollup tables; re-running is idempotent.
+        Minute buckets are recomputed from the latest one (which may have been
+        partial) up to now; hour buckets are only written once the hour is complete.
+        """
+        now = await conn.fetchval("SELECT LOCALTIMESTAMP")
+        oldest = await conn.fetchval("SELECT MIN(timestamp) FROM system_telemetry")
+        if oldest is None:
+            return {"minute": 0, "hour": 0}
+
+        rows = {}
+        for table, unit in ROLLUPS.items():
+            latest = await conn.fetchval(f"SELECT MAX(bucket) FROM {table}")
+            if unit == "minute":
+                since, until = latest or oldest.replace(second=0, microsecond=0), now
+            else:
+                since = latest + timedelta(hours=1) if latest else oldest.replace(minute=0, second=0, microsecond=0)
+                until = now.replace(minute=0, second=0, microsecond=0)
+            if since >= until:
+                rows[unit] = 0
+                continue
+            sql = ROLLUP_SQL.format(table=table, unit=unit, source="system_telemetry")
+            rows[unit] = _row_count(await conn.execute(sql, since, until))
+        return rows
+
+    async def apply_retention(self, conn) -> List[str]:
+        """Drops raw partitions past TELEMETRY_RAW_RETENTION_DAYS and prunes old rollup rows."""
+        today = await conn.fetchval("SELECT CURRENT_DATE")
+        cutoff = today - timedelta(days=config.TELEMETRY_RAW_RETENTION_DAYS)
+        partitions = await conn.fetch('''
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'system_telemetry'::regclass
+        ''')
+
+        dropped = []
+        for row in partitions:
+            day = partition_day(row["relname"])
+            # A partition covers [day, day + 1): drop it once all of it is past the cutoff
+            if day and day < cutoff:
+                await conn.execute(f"DROP TABLE IF EXISTS {row['relname']}")
+                dropped.append(row["relname"])
+        await conn.execute(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < $1::date", cutoff)
+
+        for table in ("telemetry_rollup_minute", "telemetry_histogram_minute"):
+            await conn.execute(
+                f"DELETE FROM {table} WHERE bucket < CURRENT_DATE - $1::int",
+                config.TELEMETRY_MINUTE_ROLLUP_RETENTION_DAYS
+            )
+        for table in ("telemetry_rollup_hour", "telemetry_histogram_hour"):
+            await conn.execute(
+                f"DELETE FROM {table} WHERE bucket < CURRENT_DATE - $1::int",
+                config.TELEMETRY_HOUR_ROLLUP_RETENTION_DAYS
+            )
+        return dropped
+
+    # --- Histograms ---
+
+    async def save_histograms(self, conn, rows: List[Tuple[datetime, SeriesKey, LogHistogram]]):
+        """Persists minute sketches drained from the in-memory HistogramStore."""
+        if rows:
+            await conn.executemany(
+                "INSERT INTO telemetry_histogram_minute (bucket, component, event_type, event_count, sketch) "
+                "VALUES ($1, $2, $3, $4, $5)",
+                [(bucket, component, event_type, h.count, json.dumps(h.to_dict())) for bucket, (component, event_type), h in rows]
+            )
+
+    async def compact_histograms(self, conn, now: Optional[datetime] = None) -> int:
+        """Merges minute sketches into one sketch per series for every completed hour."""
+        now = now or datetime.now()
+        until = now.replace(minute=0, second=0, microsecond=0)
+        latest = await conn.fetchval("SELECT MAX(bucket) FROM telemetry_histogram_hour")
+        if latest:
+            hour = latest + timedelta(hours=1)
+        else:
+            oldest = await conn.fetchval("SELECT MIN(bucket) FROM telemetry_histogram_minute")
+            if oldest is None:
+                return 0
+            hour = oldest.replace(minute=0)
+
+        compacted = 0
+        while hour < until:
+            rows = await conn.fetch(
+                "SELECT component, event_type, sketch FROM telemetry_histogram_minute WHERE bucket >= $1 AND bucket < $2",
+                hour, hour + timedelta(hours=1)
+            )
+            merged = merge_series(_decode_sketches(rows))
+            if merged:
+                await conn.executemany(
+                    "INSERT INTO telemetry_histogram_hour (bucket, component, event_type, event_count, sketch) "
+                    "VALUES ($1, $2, $3, $4, $5)",
+                    [(hour, component, event_type, h.count, json.dumps(h.to_dict())) for (component, event_type), h in merged.items()]
+                )
+                compacted += len(merged)
+            hour += timedelta(hours=1)
+        return compacted
+
+    async def load_histograms(
+        self,
+        conn,
+        since: datetime,
+        until: datetime,
+        event_type: Optional[str] = None,
+        component: Optional[str] = None
+    ) -> Dict[SeriesKey, LogHistogram]:
+        """
+        Merged sketch per (component, event_type) for [since, until), at minute resolution.
+        Complete hours the compactor has reached come from telemetry_histogram_hour,
+        the rest of the window from telemetry_histogram_minute.
+        """
+        since = since.replace(second=0, microsecond=0)
+        first_hour = since.replace(minute=0) + (timedelta(hours=1) if since.minute else timedelta(0))
+        latest = await conn.fetchval("SELECT MAX(bucket) FROM telemetry_histogram_hour")
+        head = until.replace(minute=0, second=0, microsecond=0)
+        head = max(first_hour, min(head, latest + timedelta(hours=1) if latest else first_hour))
+
+        filters, params = "", [since, until, first_hour, head]
+        if event_type:
+            params.append(event_type)
+            filters += f" AND event_type = ${len(params)}"
+        if component is not None:
+            params.append(component)
+            filters += f" AND component = ${len(params)}"
+
+        rows = await conn.fetch(f'''
+            SELECT component, event_type, sketch FROM telemetry_histogram_hour
+            WHERE bucket >= $3 AND bucket < $4{filters}
+            UNION ALL
+            SELECT component, event_type, sketch FROM telemetry_histogram_minute
+            WHERE bucket >= $1 AND bucket < $2 AND (bucket < $3 OR bucket >= $4){filters}
+        ''', *params)
+        return merge_series(_decode_sketches(rows))
+
+    async def run_maintenance(self) -> Dict[str, Any]:
+        """One background pass: partitions ahead, rollups, then retention."""
+        if not self.pool:
+            return {}
+        async with self.pool.acquire() as conn:
+            await self.ensure_partitions(conn)
+            rolled = await self.refresh_rollups(conn)
+            compacted = await self.compact_histograms(conn)
+            dropped = await self.apply_retention(conn)
+        if dropped:
+            logger.info(f"🗑️ Dropped {len(dropped)} expired telemetry partitions: {', '.join(dropped)}")
+        return {"rollup_rows": rolled, "hour_histograms": compacted, "dropped_partitions": dropped}
+
     async def disconnect(self):
         """Close the connection pool."""
         if self.pool:
@@ -0,0 +1,179 @@
+"""
+Gravitas Telemetry Service - Mergeable Histograms
+Log-bucketed latency sketches kept per (component, event_type) and minute.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SeriesKey = Tuple[str, str]  # (component or '', event_type)
+
+
+class LogHistogram:
+    """
+    Mergeable log-bucketed histogram (DDSketch-style). Every quantile is within
+    relative_accuracy of the true value, and two histograms with the same accuracy
+    merge exactly by adding bucket counts, so minute sketches combine into hours
+    and arbitrary windows without going back to raw rows.
+    """
+    MIN_VALUE = 1e-9  # Magnitudes below this land in the zero bucket
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        # Midpoint (in relative terms) of (gamma^(i-1), gamma^i]
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        if abs(value) < self.MIN_VALUE:
+            self.zero += count
+        else:
+            store = self.positive if value > 0 else self.negative
+            index = self._index(abs(value))
+            store[index] = store.get(index, 0) + count
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge histograms with different relative accuracy")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in theirs.items():
+                mine[index] = mine.get(index, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1), or None when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank >= self.count - 1:
+            return self.max
+        seen = 0
+        buckets = (
+            [(-self._value(i), c) for i, c in sorted(self.negative.items(), reverse=True)]
+            + [(0.0, self.zero)]
+            + [(self._value(i), c) for i, c in sorted(self.positive.items())]
+        )
+        for value, count in buckets:
+            seen += count
+            if seen > rank:
+                # Never report outside the observed range
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "accuracy": self.relative_accuracy,
+            "positive": {str(i): c for i, c in self.positive.items()},
+            "negative": {str(i): c for i, c in self.negative.items()},
+            "zero": self.zero,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogHistogram":
+        histogram = cls(data["accuracy"])
+        histogram.positive = {int(i): c for i, c in data.get("positive", {}).items()}
+        histogram.negative = {int(i): c for i, c in data.get("negative", {}).items()}
+        histogram.zero = data.get("zero", 0)
+        histogram.count = data.get("count", 0)
+        histogram.sum = data.get("sum", 0.0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
+
+
+def minute_of(moment: datetime) -> datetime:
+    return moment.replace(second=0, microsecond=0)
+
+
+def quantile_label(q: float) -> str:
+    """0.5 -> 'p50', 0.999 -> 'p99.9'."""
+    return f"p{q * 100:g}"
+
+
+def merge_series(histograms: Iterable[Tuple[SeriesKey, LogHistogram]]) -> Dict[SeriesKey, LogHistogram]:
+    """Merges (key, histogram) pairs into one histogram per key."""
+    merged: Dict[SeriesKey, LogHistogram] = {}
+    for key, histogram in histograms:
+        if key in merged:
+            merged[key].merge(histogram)
+        else:
+            merged[key] = LogHistogram(histogram.relative_accuracy).merge(histogram)
+    return merged
+
+
+class HistogramStore:
+    """
+    Minute histograms per (component, event_type) that have not been persisted yet.
+    The maintenance loop drains completed minutes to Postgres; queries merge the
+    persisted sketches with whatever is still pending here.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.pending: Dict[datetime, Dict[SeriesKey, LogHistogram]] = {}
+
+    def record(self, event_type: str, component: Optional[str], value: float, at: Optional[datetime] = None):
+        bucket = minute_of(at or datetime.now())
+        key = (component or "", event_type)
+        series = self.pending.setdefault(bucket, {})
+        if key not in series:
+            series[key] = LogHistogram(self.relative_accuracy)
+        series[key].add(value)
+
+    def drain(self, before: Optional[datetime] = None) -> List[Tuple[datetime, SeriesKey, LogHistogram]]:
+        """Removes and returns minute sketches older than `before` (all of them when None)."""
+        buckets = [b for b in self.pending if before is None or b < before]
+        return [
+            (bucket, key, histogram)
+            for bucket in sorted(buckets)
+            for key, histogram in self.pending.pop(bucket).items()
+        ]
+
+    def restore(self, rows: List[Tuple[datetime, SeriesKey, LogHistogram]]):
+        """Puts drained sketches back after a failed save."""
+        for bucket, key, histogram in rows:
+            series = self.pending.setdefault(bucket, {})
+            if key in series:
+                series[key].merge(histogram)
+            else:
+                series[key] = histogram
+
+    def window(self, since: datetime, until: datetime) -> List[Tuple[SeriesKey, LogHistogram]]:
+        """Pending sketches whose minute overlaps [since, until)."""
+        return [
+            (key, histogram)
+            for bucket, series in self.pending.items()
+            if bucket + timedelta(minutes=1) > since and bucket < until
+            for key, histogram in series.items()
+        ]
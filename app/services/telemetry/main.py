@@ -5,19 +5,28 @@ Standalone microservice for telemetry event ingestion and querying.
 import logging
 import asyncio
 import json
-from fastapi import FastAPI, HTTPException
+import time
+from datetime import datetime, timedelta
+from fastapi import FastAPI, HTTPException, Query
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.services.telemetry.models import (
     TelemetryEvent,
     TelemetryEventResponse,
+    TelemetryBatch,
+    TelemetryBatchResponse,
     TelemetryQuery,
     TelemetryEventRecord,
     TelemetryStatsResponse,
+    PercentileSeries,
+    PercentilesResponse,
     HealthResponse
 )
 from app.services.telemetry.database import db
+from app.services.telemetry.histogram import HistogramStore, LogHistogram, minute_of, quantile_label
+from app.config import config
+from app.services.metrics import instrument_app
 
 # Configure logging
 logging.basicConfig(
@@ -27,84 +36,186 @@ logging.basicConfig(
 logger = logging.getLogger("Gravitas_TELEMETRY_SERVICE")
 
 # Background queue for batching writes
-event_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
-worker_task: Optional[asyncio.Task] = None
+event_queue: asyncio.Queue = asyncio.Queue(maxsize=config.TELEMETRY_QUEUE_SIZE)
+worker_tasks: List[asyncio.Task] = []
+maintenance_task: Optional[asyncio.Task] = None
 
+COPY_COLUMNS = ["event_type", "component", "value", "metadata", "status"]
 
-async def telemetry_worker():
+
+class WriterMetrics:
+    """Counters shared by the COPY writers, reported on /health."""
+
+    def __init__(self):
+        self.batches = 0
+        self.events_written = 0
+        self.events_failed = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_write_ms = 0.0
+        self.avg_write_ms = 0.0  # EWMA, alpha 0.2
+        self.max_write_ms = 0.0
+        self.max_queue_depth = 0
+        self.started = time.monotonic()
+
+    def record(self, size: int, seconds: float, ok: bool = True):
+        ms = seconds * 1000
+        self.batches += 1
+        self.last_batch_size = size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.last_write_ms = ms
+        self.avg_write_ms = ms if self.batches == 1 else 0.8 * self.avg_write_ms + 0.2 * ms
+        self.max_write_ms = max(self.max_write_ms, ms)
+        if ok:
+            self.events_written += size
+        else:
+            self.events_failed += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        uptime = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "writers": sum(1 for task in worker_tasks if not task.done()),
+            "batches": self.batches,
+            "events_written": self.events_written,
+            "events_failed": self.events_failed,
+            "events_per_second": round(self.events_written / uptime, 1),
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "target_batch_size": _target_batch_size(),
+            "last_write_ms": round(self.last_write_ms, 2),
+            "avg_write_ms": round(self.avg_write_ms, 2),
+            "max_write_ms": round(self.max_write_ms, 2),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+metrics = WriterMetrics()
+histograms = HistogramStore(config.TELEMETRY_HISTOGRAM_ACCURACY)
+
+
+def _target_batch_size() -> int:
     """
-    Background worker that batches telemetry events for efficient writes.
-    Processes events from queue and writes to database.
+    Adaptive batch size: each writer takes its share of the backlog, clamped to
+    [TELEMETRY_WRITE_BATCH_MIN, TELEMETRY_WRITE_BATCH_MAX]. Light traffic gets small,
+    low-latency batches; a burst is drained in a few large COPYs.
     """
-    logger.info("📊 Telemetry worker started")
-    batch_size = 50
-    batch_timeout = 2.0  # seconds
-    
+    share = event_queue.qsize() // max(config.TELEMETRY_WRITERS, 1)
+    return max(config.TELEMETRY_WRITE_BATCH_MIN, min(config.TELEMETRY_WRITE_BATCH_MAX, share))
+
+
+async def _collect_batch() -> Tuple[List[TelemetryEvent], bool]:
+    """
+    Takes up to the target batch size from the queue. Whatever is already queued is
+    taken without waiting; the writer only waits (up to TELEMETRY_WRITE_TIMEOUT) while
+    the batch is below TELEMETRY_WRITE_BATCH_MIN. Returns (batch, shutdown).
+    """
+    loop = asyncio.get_running_loop()
+    metrics.max_queue_depth = max(metrics.max_queue_depth, event_queue.qsize())
+    target = _target_batch_size()
+    deadline = loop.time() + config.TELEMETRY_WRITE_TIMEOUT
+    batch: List[TelemetryEvent] = []
+
+    while len(batch) < target:
+        try:
+            event = event_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            remaining = deadline - loop.time()
+            if len(batch) >= config.TELEMETRY_WRITE_BATCH_MIN or remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(event_queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        if event is None:  # Shutdown signal
+            return batch, True
+        batch.append(event)
+    return batch, False
+
+
+async def telemetry_worker(writer_id: int = 0):
+    """
+    Background writer: collects adaptive batches from the shared queue and COPYs
+    them into Postgres. Several writers run at once, each on its own pool connection.
+    """
+    logger.info(f"📊 Telemetry writer {writer_id} started")
+
     while True:
         try:
-            batch = []
-            deadline = asyncio.get_event_loop().time() + batch_timeout
-            
-            # Collect events until batch size or timeout
-            while len(batch) < batch_size:
-                timeout = max(0.1, deadline - asyncio.get_event_loop().time())
-                try:
-                    event = await asyncio.wait_for(event_queue.get(), timeout=timeout)
-                    if event is None:  # Shutdown signal
-                        logger.info("📊 Telemetry worker received shutdown signal")
-                        # Process remaining batch before shutdown
-                        if batch:
-                            await _write_batch(batch)
-                        return
-                    batch.append(event)
-                except asyncio.TimeoutError:
-                    break
-            
-            # Write batch if we have events
+            batch, shutdown = await _collect_batch()
+            # Process remaining batch before shutdown
             if batch:
                 await _write_batch(batch)
-                
+            if shutdown:
+                logger.info(f"📊 Telemetry writer {writer_id} received shutdown signal")
+                return
         except Exception as e:
-            logger.error(f"❌ Telemetry worker error: {e}")
+            logger.error(f"❌ Telemetry writer {writer_id} error: {e}")
             await asyncio.sleep(1)  # Brief pause before retry
 
 
+def _encode_metadata(metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+    # asyncpg's jsonb codec takes text; compact separators keep the COPY payload small
+    return json.dumps(metadata, separators=(",", ":")) if metadata else None
+
+
 async def _write_batch(batch: List[TelemetryEvent]):
-    """Write a batch of events to the database."""
+    """Write a batch of events with a single binary COPY."""
     if not db.is_ready():
         logger.warning(f"⚠️ Database not ready, dropping {len(batch)} events")
+        metrics.events_failed += len(batch)
         return
-    
+
+    records = [
+        (event.event_type, event.component, event.value, _encode_metadata(event.metadata), event.status)
+        for event in batch
+    ]
+    start = time.perf_counter()
     try:
         async with db.pool.acquire() as conn:
-            # Prepare batch insert
-            values = [
-                (
-                    event.event_type,
-                    event.component,
-                    event.value,
-                    json.dumps(event.metadata) if event.metadata else None,
-                    event.status
-                )
-                for event in batch
-            ]
-            
-            await conn.executemany('''
-                INSERT INTO system_telemetry (event_type, component, value, metadata, status)
-                VALUES ($1, $2, $3, $4, $5)
-            ''', values)
-            
-            logger.debug(f"✅ Wrote batch of {len(batch)} telemetry events")
-            
+            await conn.copy_records_to_table("system_telemetry", records=records, columns=COPY_COLUMNS)
+        metrics.record(len(batch), time.perf_counter() - start)
+        for event in batch:
+            if event.value is not None:
+                histograms.record(event.event_type, event.component, event.value)
+        logger.debug(f"✅ Wrote batch of {len(batch)} telemetry events")
+
+    except Exception as e:
+        metrics.record(len(batch), time.perf_counter() - start, ok=False)
+        logger.error(f"❌ Batch write failed ({len(batch)} events): {e}")
+
+
+async def flush_histograms(everything: bool = False):
+    """Persists completed minute sketches (all pending ones on shutdown)."""
+    if not db.is_ready():
+        return
+    rows = histograms.drain(None if everything else minute_of(datetime.now()))
+    if not rows:
+        return
+    try:
+        async with db.pool.acquire() as conn:
+            await db.save_histograms(conn, rows)
     except Exception as e:
-        logger.error(f"❌ Batch write failed: {e}")
+        histograms.restore(rows)
+        logger.error(f"❌ Histogram flush failed ({len(rows)} sketches kept in memory): {e}")
+
+
+async def maintenance_loop():
+    """Keeps raw partitions ahead of time, rollups and histograms fresh and old partitions dropped."""
+    while True:
+        try:
+            await flush_histograms()
+            result = await db.run_maintenance()
+            if result:
+                logger.debug(f"🧹 Telemetry maintenance: {result}")
+        except Exception as e:
+            logger.error(f"❌ Telemetry maintenance failed: {e}")
+        await asyncio.sleep(config.TELEMETRY_MAINTENANCE_INTERVAL)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    global worker_task
-    
+    global maintenance_task
     # Startup
     logger.info("📊 Telemetry Service starting up...")
     try:
@@ -114,19 +225,28 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Database initialization failed: {e}")
     
-    # Start background worker
-    worker_task = asyncio.create_task(telemetry_worker())
-    logger.info("✅ Background telemetry worker started")
+    # Start background writers
+    worker_tasks[:] = [
+        asyncio.create_task(telemetry_worker(i)) for i in range(max(config.TELEMETRY_WRITERS, 1))
+    ]
+    logger.info(f"✅ {len(worker_tasks)} background telemetry writers started")
+    maintenance_task = asyncio.create_task(maintenance_loop())
     
     yield
     
     # Shutdown
     logger.info("📊 Telemetry Service shutting down...")
     
-    # Stop worker and flush queue
-    if worker_task:
-        await event_queue.put(None)  # Shutdown signal
-        await worker_task
+    if maintenance_task:
+        maintenance_task.cancel()
+        await asyncio.gather(maintenance_task, return_exceptions=True)
+
+    # Stop writers once the queue is drained (one shutdown signal per writer)
+    for _ in worker_tasks:
+        await event_queue.put(None)
+    await asyncio.gather(*worker_tasks, return_exceptions=True)
+    worker_tasks.clear()
+    await flush_histograms(everything=True)
     
     await db.disconnect()
     logger.info("🛑 Telemetry Service shutdown complete")
@@ -138,6 +258,7 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan
 )
+instrument_app(app, "telemetry", queues={"telemetry_events": event_queue.qsize}, pool=lambda: db.pool)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -147,7 +268,9 @@ async def health():
         "status": "healthy",
         "service": "telemetry",
         "database": db.is_ready(),
-        "queue_depth": event_queue.qsize()
+        "queue_depth": event_queue.qsize(),
+        "queue_capacity": event_queue.maxsize,
+        "writers": metrics.snapshot()
     }
 
 
@@ -169,6 +292,28 @@ async def log_event(event: TelemetryEvent):
         raise HTTPException(status_code=503, detail="Telemetry queue full")
 
 
+@app.post("/v1/telemetry/log_batch", response_model=TelemetryBatchResponse)
+async def log_batch(batch: TelemetryBatch):
+    """
+    Log a batch of telemetry events in one request.
+    Events are queued like /v1/telemetry/log; once the queue is full the rest are dropped.
+    """
+    accepted = 0
+    for event in batch.events:
+        try:
+            event_queue.put_nowait(event)
+            accepted += 1
+        except asyncio.QueueFull:
+            break
+
+    dropped = len(batch.events) - accepted
+    if dropped:
+        logger.error(f"❌ Telemetry queue full, dropping {dropped} of {len(batch.events)} batched events")
+        if accepted == 0:
+            raise HTTPException(status_code=503, detail="Telemetry queue full")
+    return {"success": dropped == 0, "accepted": accepted, "dropped": dropped}
+
+
 @app.get("/v1/telemetry/events", response_model=List[TelemetryEventRecord])
 async def get_events(
     limit: int = 10,
@@ -228,6 +373,40 @@ async def get_events(
         raise HTTPException(status_code=500, detail="Query execution failed")
 
 
+# THOUGHT_LATENCY aggregates over the last $1 hours. Hours in [first_hour, head) come
+# from hour rollups; everything else (window start, current hour, or hours the hour
+# rollup has not reached yet) from minute rollups.
+STATS_SQL = '''
+    WITH bounds AS (
+        SELECT
+            date_trunc('minute', LOCALTIMESTAMP - make_interval(hours => $1)) AS start_ts,
+            date_trunc('hour', LOCALTIMESTAMP - make_interval(hours => $1)) + INTERVAL '1 hour' AS first_hour
+    ),
+    hour_bounds AS (
+        SELECT start_ts, first_hour, GREATEST(first_hour, LEAST(
+            date_trunc('hour', LOCALTIMESTAMP),
+            COALESCE((SELECT MAX(bucket) FROM telemetry_rollup_hour) + INTERVAL '1 hour', first_hour)
+        )) AS head
+        FROM bounds
+    ),
+    buckets AS (
+        SELECT r.* FROM telemetry_rollup_hour r, hour_bounds b
+        WHERE r.bucket >= b.first_hour AND r.bucket < b.head
+        UNION ALL
+        SELECT r.* FROM telemetry_rollup_minute r, hour_bounds b
+        WHERE r.bucket >= b.start_ts AND (r.bucket < b.first_hour OR r.bucket >= b.head)
+    )
+    SELECT
+        COALESCE(SUM(event_count), 0)::bigint AS measurement_count,
+        SUM(value_sum) / NULLIF(SUM(value_count), 0) AS avg_efficiency_score,
+        MIN(value_min) AS best_efficiency,
+        MAX(value_max) AS worst_efficiency,
+        SUM(tokens)::bigint AS total_tokens
+    FROM buckets
+    WHERE event_type = 'THOUGHT_LATENCY'
+'''
+
+
 @app.get("/v1/telemetry/stats", response_model=TelemetryStatsResponse)
 async def get_stats(
     component: Optional[str] = None,
@@ -235,53 +414,123 @@ async def get_stats(
 ):
     """
     Get aggregated statistics for telemetry events.
+    Without a component the figures cover all components together.
+    Served from the rollup tables (complete hours from telemetry_rollup_hour, the
+    ragged ends of the window from telemetry_rollup_minute), so the cost does not
+    grow with the raw table. Rollups trail live traffic by up to one maintenance interval;
+    percentiles come from the latency histograms and include pending minutes.
     """
     if not db.is_ready():
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
         async with db.pool.acquire() as conn:
-            query = '''
-                SELECT 
-                    component,
-                    COUNT(*) as measurement_count,
-                    AVG(value) as avg_efficiency_score,
-                    MIN(value) as best_efficiency,
-                    MAX(value) as worst_efficiency,
-                    COALESCE(SUM((metadata->>'tokens_generated')::int), 0) as total_tokens
-                FROM system_telemetry
-                WHERE event_type = 'THOUGHT_LATENCY'
-                    AND timestamp > NOW() - INTERVAL '%s hours'
-            '''
-            
             if component:
-                query += " AND component = $1 GROUP BY component"
-                row = await conn.fetchrow(query % hours, component)
+                row = await conn.fetchrow(STATS_SQL + " AND component = $2", hours, component)
             else:
-                query += " GROUP BY component LIMIT 1"
-                row = await conn.fetchrow(query % hours)
-            
-            if not row:
-                return TelemetryStatsResponse(
-                    component=component,
-                    measurement_count=0,
-                    avg_efficiency_score=None,
-                    best_efficiency=None,
-                    worst_efficiency=None,
-                    total_tokens=None,
-                    time_window_hours=hours
-                )
-            
-            return TelemetryStatsResponse(
-                **dict(row),
-                time_window_hours=hours
+                row = await conn.fetchrow(STATS_SQL, hours)
+
+            until = datetime.now()
+            series = await _window_histograms(
+                conn, until - timedelta(hours=hours), until, "THOUGHT_LATENCY", component
             )
+
+        latency = LogHistogram(config.TELEMETRY_HISTOGRAM_ACCURACY)
+        for histogram in series.values():
+            latency.merge(histogram)
+
+        stats = dict(row) if row else {
+            "measurement_count": 0,
+            "avg_efficiency_score": None,
+            "best_efficiency": None,
+            "worst_efficiency": None,
+            "total_tokens": None,
+        }
+        return TelemetryStatsResponse(
+            **stats,
+            component=component,
+            p50=latency.quantile(0.5),
+            p90=latency.quantile(0.9),
+            p95=latency.quantile(0.95),
+            p99=latency.quantile(0.99),
+            time_window_hours=hours
+        )
             
     except Exception as e:
         logger.error(f"❌ Stats query failed: {e}")
         raise HTTPException(status_code=500, detail="Stats query failed")
 
 
+async def _window_histograms(conn, since: datetime, until: datetime, event_type: Optional[str], component: Optional[str]):
+    """Persisted sketches for the window merged with the ones still pending in memory."""
+    merged = await db.load_histograms(conn, since, until, event_type, component)
+    for key, histogram in histograms.window(since, until):
+        if (event_type and key[1] != event_type) or (component is not None and key[0] != component):
+            continue
+        if key in merged:
+            merged[key].merge(histogram)
+        else:
+            merged[key] = LogHistogram(histogram.relative_accuracy).merge(histogram)
+    return merged
+
+
+def _series(component: Optional[str], event_type: Optional[str], histogram: LogHistogram, quantiles: List[float]) -> PercentileSeries:
+    return PercentileSeries(
+        component=component,
+        event_type=event_type,
+        count=histogram.count,
+        mean=histogram.mean,
+        min=histogram.min,
+        max=histogram.max,
+        percentiles={quantile_label(q): histogram.quantile(q) for q in quantiles}
+    )
+
+
+@app.get("/v1/telemetry/percentiles", response_model=PercentilesResponse)
+async def get_percentiles(
+    event_type: str = "THOUGHT_LATENCY",
+    component: Optional[str] = None,
+    hours: float = Query(1.0, gt=0, le=24 * 400),
+    until: Optional[datetime] = None,
+    quantiles: str = "0.5,0.9,0.99"
+):
+    """
+    Latency percentiles for every component (plus all of them merged) over
+    [until - hours, until), from the mergeable histograms at minute resolution.
+    """
+    try:
+        qs = [float(q) for q in quantiles.split(",") if q.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="quantiles must be comma-separated numbers")
+    if not qs or any(not 0 <= q <= 1 for q in qs):
+        raise HTTPException(status_code=422, detail="quantiles must be between 0 and 1")
+    if not db.is_ready():
+        raise HTTPException(status_code=503, detail="Database not available")
+
+    until = until or datetime.now()
+    since = until - timedelta(hours=hours)
+    try:
+        async with db.pool.acquire() as conn:
+            merged = await _window_histograms(conn, since, until, event_type, component)
+    except Exception as e:
+        logger.error(f"❌ Percentile query failed: {e}")
+        raise HTTPException(status_code=500, detail="Percentile query failed")
+
+    overall = LogHistogram(config.TELEMETRY_HISTOGRAM_ACCURACY)
+    for histogram in merged.values():
+        overall.merge(histogram)
+
+    return PercentilesResponse(
+        since=since,
+        until=until,
+        components=[
+            _series(key[0] or None, key[1], histogram, qs)
+            for key, histogram in sorted(merged.items())
+        ],
+        overall=_series(component, event_type, overall, qs)
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8006)
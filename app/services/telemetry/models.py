@@ -38,6 +38,18 @@ class TelemetryEventResponse(BaseModel):
     event_id: Optional[int] = None
 
 
+class TelemetryBatch(BaseModel):
+    """Batch of events flushed by a client-side TelemetryLogger buffer."""
+    events: List[TelemetryEvent] = Field(..., max_length=1000, description="Events in arrival order")
+
+
+class TelemetryBatchResponse(BaseModel):
+    """Response after queueing a batch of telemetry events."""
+    success: bool
+    accepted: int
+    dropped: int = 0
+
+
 class TelemetryQuery(BaseModel):
     """Query parameters for retrieving telemetry events."""
     limit: int = Field(10, ge=1, le=1000, description="Maximum number of events to return")
@@ -68,12 +80,37 @@ class TelemetryStatsResponse(BaseModel):
     best_efficiency: Optional[float]
     worst_efficiency: Optional[float]
     total_tokens: Optional[int]
+    p50: Optional[float] = Field(None, description="Median latency over the window (histogram, ~1% error)")
+    p90: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
     time_window_hours: int
 
 
+class PercentileSeries(BaseModel):
+    """Percentiles for one component/event_type (component None = all merged)."""
+    component: Optional[str]
+    event_type: Optional[str]
+    count: int
+    mean: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+    percentiles: Dict[str, Optional[float]] = Field(..., description="e.g. {'p50': 1.2, 'p99': 4.8}")
+
+
+class PercentilesResponse(BaseModel):
+    """Per-component percentiles for a time window, plus all components merged."""
+    since: datetime
+    until: datetime
+    components: List[PercentileSeries]
+    overall: PercentileSeries
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
     service: str
     database: bool
     queue_depth: int = 0
+    queue_capacity: Optional[int] = None
+    writers: Optional[Dict[str, Any]] = Field(None, description="COPY writer metrics (batch size, write latency, throughput)")
@@ -0,0 +1,518 @@
+"""
+Gravitas Request Tracing
+W3C trace context propagation and lightweight spans for the internal services.
+
+A chat request hops supervisor -> gatekeeper -> guardian -> LLM wrapper. Each
+service continues the caller's trace from the incoming `traceparent` header and
+every internal httpx call passes it on, so one trace id follows the request
+end to end. Finished spans are kept in a per-process ring buffer (served as
+waterfalls at /traces) and optionally exported to a JSONL file and/or an
+OTLP/HTTP collector in the background.
+
+    from app.services.tracing import instrument_tracing, inject, span
+    instrument_tracing(app, "supervisor")
+    with span("policy", resource=shell_name):
+        ...
+    await client.post(url, json=payload, headers=inject({"Authorization": token}))
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import secrets
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from app.config import config
+from app.services.http_clients import HttpClientRegistry
+
+logger = logging.getLogger("Gravitas_TRACING")
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+_UNTRACED_PATHS = ("/metrics", "/traces", "/health")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    service: str = ""
+    kind: str = "internal"  # internal | server | client
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Span":
+        return cls(**data)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace_id, parent span id) from a W3C traceparent header, or None if absent/invalid."""
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if not match:
+        return None
+    version, trace_id, span_id, _flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("gravitas_current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def inject(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Copy of headers with the current span's traceparent added (for outgoing internal calls)."""
+    headers = dict(headers or {})
+    active = _current.get()
+    if active is not None:
+        headers[TRACEPARENT] = active.traceparent
+    return headers
+
+
+async def _inject_request(request: httpx.Request):
+    active = _current.get()
+    if active is not None:
+        request.headers[TRACEPARENT] = active.traceparent
+
+
+# httpx.AsyncClient(event_hooks=TRACE_HOOKS): every request on a long-lived client carries the caller's traceparent
+TRACE_HOOKS = {"request": [_inject_request]}
+
+
+def waterfall(spans: List[Span]) -> Dict[str, Any]:
+    """Spans of one trace as a depth-first tree with offsets relative to the first span."""
+    if not spans:
+        return {"trace_id": None, "duration_ms": 0.0, "services": [], "spans": []}
+    ordered = sorted(spans, key=lambda s: s.start_ns)
+    ids = {s.span_id for s in ordered}
+    children: Dict[str, List[Span]] = {}
+    roots = []
+    for s in ordered:
+        if s.parent_id in ids:
+            children.setdefault(s.parent_id, []).append(s)
+        else:
+            roots.append(s)
+
+    t0 = ordered[0].start_ns
+    t_end = max(s.end_ns or s.start_ns for s in ordered)
+    rows = []
+
+    def visit(s: Span, depth: int):
+        rows.append({
+            "span_id": s.span_id,
+            "parent_id": s.parent_id,
+            "name": s.name,
+            "service": s.service,
+            "kind": s.kind,
+            "depth": depth,
+            "offset_ms": round((s.start_ns - t0) / 1e6, 3),
+            "duration_ms": round(s.duration_ms, 3),
+            "status": s.status,
+            "error": s.error,
+            "attributes": s.attributes,
+        })
+        for child in children.get(s.span_id, []):
+            visit(child, depth + 1)
+
+    for root in roots:
+        visit(root, 0)
+    return {
+        "trace_id": ordered[0].trace_id,
+        "duration_ms": round((t_end - t0) / 1e6, 3),
+        "services": sorted({s.service for s in ordered}),
+        "spans": rows,
+    }
+
+
+def render_waterfall(view: Dict[str, Any], width: int = 48) -> str:
+    """Plain-text waterfall (one bar per span) for curl-friendly viewing."""
+    total = view["duration_ms"] or 1.0
+    lines = [f"trace {view['trace_id']}  {view['duration_ms']:.1f} ms  services: {', '.join(view['services'])}"]
+    for row in view["spans"]:
+        start = int(row["offset_ms"] / total * width)
+        length = max(1, int(row["duration_ms"] / total * width))
+        bar = (" " * start + "█" * length).ljust(width)
+        flag = " ✗" if row["status"] == "error" else ""
+        label = "  " * row["depth"] + f"{row['service']}:{row['name']}"
+        lines.append(f"|{bar[:width]}| {row['offset_ms']:>9.1f} {row['duration_ms']:>9.1f} ms  {label}{flag}")
+    return "\n".join(lines) + "\n"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON body (ExportTraceServiceRequest) grouped by service."""
+    by_service: Dict[str, List[Span]] = {}
+    for s in spans:
+        by_service.setdefault(s.service, []).append(s)
+    resource_spans = []
+    for service, group in by_service.items():
+        otlp_spans = []
+        for s in group:
+            otlp = {
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": _OTLP_KINDS.get(s.kind, 1),
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error or ""} if s.status == "error" else {"code": 1},
+            }
+            if s.parent_id:
+                otlp["parentSpanId"] = s.parent_id
+            otlp_spans.append(otlp)
+        resource_spans.append({
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+            "scopeSpans": [{"scope": {"name": "gravitas"}, "spans": otlp_spans}],
+        })
+    return {"resourceSpans": resource_spans}
+
+
+class Tracer:
+    """
+    Per-process span sink. Recording a span is an append to a deque; file and
+    OTLP export happen in a background task so request paths never do I/O.
+    """
+
+    def __init__(
+        self,
+        service: str = "gravitas",
+        enabled: bool = True,
+        buffer_size: int = 10000,
+        export_path: str = "",
+        export_max_bytes: int = 50 * 1024 * 1024,
+        otlp_endpoint: str = "",
+        export_interval: float = 2.0,
+    ):
+        self.service = service
+        self.enabled = enabled
+        self.spans: deque = deque(maxlen=buffer_size)
+        self.export_path = export_path
+        self.export_max_bytes = export_max_bytes
+        self.otlp_endpoint = otlp_endpoint.rstrip("/")
+        self.export_interval = export_interval
+        self.pending: List[Span] = []
+        self.exported = 0  # Spans that reached at least one sink
+        self.dropped = 0  # Spans that reached none
+        self.export_errors = 0
+        self._export_task: Optional[asyncio.Task] = None
+
+    @property
+    def exporting(self) -> bool:
+        return bool(self.export_path or self.otlp_endpoint)
+
+    # --- Recording ---
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        kind: str = "internal",
+        remote: Optional[Tuple[str, str]] = None,
+        start_ns: Optional[int] = None,
+        **attributes,
+    ) -> Span:
+        """New span; child of `parent` (default: the current span) or of a remote traceparent."""
+        if remote is not None:
+            trace_id, parent_id = remote
+        else:
+            parent = parent if parent is not None else _current.get()
+            trace_id = parent.trace_id if parent else secrets.token_hex(16)
+            parent_id = parent.span_id if parent else None
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            service=self.service,
+            kind=kind,
+            start_ns=start_ns or time.time_ns(),
+            attributes=attributes,
+        )
+
+    def finish(self, span: Span, end_ns: Optional[int] = None):
+        if span.end_ns is None:
+            span.end_ns = end_ns or time.time_ns()
+        if not self.enabled:
+            return
+        self.spans.append(span)
+        if self.exporting:
+            self.pending.append(span)
+            self._schedule_export()
+
+    # --- Export ---
+
+    def _schedule_export(self):
+        if self._export_task is not None and not self._export_task.done():
+            return
+        try:
+            self._export_task = asyncio.get_running_loop().create_task(self._export_loop())
+        except RuntimeError:
+            pass  # No loop (sync caller): picked up by the next flush
+
+    async def _export_loop(self):
+        while self.pending:
+            await asyncio.sleep(self.export_interval)
+            await self.flush()
+
+    async def flush(self):
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        delivered = False
+        if self.export_path:
+            try:
+                await asyncio.to_thread(self._write_file, batch)
+                delivered = True
+            except Exception as e:
+                self.export_errors += 1
+                logger.warning(f"⚠️ Span file export failed ({len(batch)} spans): {e}")
+        if self.otlp_endpoint:
+            try:
+                response = await HttpClientRegistry.get("otlp").post(
+                    f"{self.otlp_endpoint}/v1/traces", json=to_otlp(batch), timeout=5.0
+                )
+                response.raise_for_status()
+                delivered = True
+            except Exception as e:
+                self.export_errors += 1
+                logger.warning(f"⚠️ OTLP export failed ({len(batch)} spans): {e}")
+        if delivered:
+            self.exported += len(batch)
+        else:
+            self.dropped += len(batch)
+
+    def _write_file(self, batch: List[Span]):
+        directory = os.path.dirname(self.export_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.export_path) and os.path.getsize(self.export_path) > self.export_max_bytes:
+            os.replace(self.export_path, self.export_path + ".1")
+        with open(self.export_path, "a", encoding="utf-8") as f:
+            for s in batch:
+                f.write(json.dumps(s.to_dict(), separators=(",", ":")) + "\n")
+
+    def _read_file(self, trace_id: str) -> List[Span]:
+        found = []
+        for path in (self.export_path + ".1", self.export_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if trace_id in line:
+                        try:
+                            found.append(Span.from_dict(json.loads(line)))
+                        except (ValueError, TypeError):
+                            continue
+        return found
+
+    async def shutdown(self):
+        if self._export_task is not None:
+            self._export_task.cancel()
+            await asyncio.gather(self._export_task, return_exceptions=True)
+            self._export_task = None
+        await self.flush()  # The service lifespan closes the pooled OTLP client afterwards
+
+    # --- Queries ---
+
+    async def trace(self, trace_id: str) -> List[Span]:
+        """
+        All known spans of a trace: this process's buffer plus the shared export
+        file, which is how one service's viewer shows the other services' hops.
+        """
+        spans = {s.span_id: s for s in list(self.spans) if s.trace_id == trace_id}
+        if self.export_path:
+            for s in await asyncio.to_thread(self._read_file, trace_id):
+                spans.setdefault(s.span_id, s)
+        return list(spans.values())
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent traces seen by this process, newest first."""
+        traces: Dict[str, Dict[str, Any]] = {}
+        for s in reversed(self.spans):
+            entry = traces.get(s.trace_id)
+            if entry is None:
+                if len(traces) >= limit:
+                    continue
+                entry = traces[s.trace_id] = {"trace_id": s.trace_id, "root": None, "spans": 0, "errors": 0,
+                                              "start_ns": s.start_ns, "end_ns": s.end_ns or s.start_ns}
+            entry["spans"] += 1
+            entry["errors"] += s.status == "error"
+            entry["start_ns"] = min(entry["start_ns"], s.start_ns)
+            entry["end_ns"] = max(entry["end_ns"], s.end_ns or s.start_ns)
+            if entry["root"] is None or s.kind == "server" and s.parent_id is None:
+                entry["root"] = f"{s.service}:{s.name}"
+        return [
+            {
+                "trace_id": t["trace_id"],
+                "root": t["root"],
+                "spans": t["spans"],
+                "errors": t["errors"],
+                "started_at": t["start_ns"] / 1e9,
+                "duration_ms": round((t["end_ns"] - t["start_ns"]) / 1e6, 3),
+            }
+            for t in traces.values()
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "service": self.service,
+            "enabled": self.enabled,
+            "buffered": len(self.spans),
+            "pending_export": len(self.pending),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "export_errors": self.export_errors,
+        }
+
+
+# Process-wide tracer: each service runs in its own process (service name set by instrument_tracing)
+tracer = Tracer(
+    enabled=config.TRACING_ENABLED,
+    buffer_size=config.TRACE_BUFFER_SPANS,
+    export_path=config.TRACE_EXPORT_PATH,
+    export_max_bytes=config.TRACE_EXPORT_MAX_MB * 1024 * 1024,
+    otlp_endpoint=config.TRACE_OTLP_ENDPOINT,
+    export_interval=config.TRACE_EXPORT_INTERVAL,
+)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Span]:
+    """Records a child of the current span around the block; exceptions mark it as failed."""
+    s = tracer.start_span(name, kind=kind, **attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        tracer.finish(s)
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware: one server span per request, continuing the caller's
+    trace from `traceparent` and echoing the server span's traceparent back.
+    """
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path", "").startswith(_UNTRACED_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        remote = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        method = scope.get("method", "")
+        server_span = tracer.start_span(f"{method} {scope.get('path', '')}", kind="server", remote=remote)
+        server_span.set_attribute("http.method", method)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceparent", server_span.traceparent.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = _current.set(server_span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            server_span.set_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                server_span.name = f"{method} {route}"
+            server_span.set_attribute("http.status_code", status["code"])
+            if status["code"] >= 500:
+                server_span.status = "error"
+            tracer.finish(server_span)
+
+
+def instrument_tracing(app, service: str):
+    """
+    Adds trace propagation and the trace viewer to a FastAPI app:
+    GET /traces lists recent traces, GET /traces/{trace_id} returns the
+    waterfall (JSON, or text bars with ?format=text).
+    """
+    tracer.service = service
+    app.add_middleware(TracingMiddleware, service=service)
+
+    async def list_traces(request: Request) -> Response:
+        limit = int(request.query_params.get("limit", 20))
+        return JSONResponse({"tracer": tracer.stats(), "traces": tracer.recent(limit)})
+
+    async def show_trace(request: Request) -> Response:
+        trace_id = request.path_params["trace_id"].lower()
+        spans = await tracer.trace(trace_id)
+        if not spans:
+            return JSONResponse({"detail": f"Trace {trace_id} not found"}, status_code=404)
+        view = waterfall(spans)
+        if request.query_params.get("format") == "text":
+            return PlainTextResponse(render_waterfall(view))
+        return JSONResponse(view)
+
+    app.add_route("/traces", list_traces, methods=["GET"], include_in_schema=False)
+    app.add_route("/traces/{trace_id}", show_trace, methods=["GET"], include_in_schema=False)
+    logger.info(f"🧵 Tracing enabled for {service} (viewer at /traces)")
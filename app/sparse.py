@@ -0,0 +1,67 @@
+import re
+import zlib
+from collections import Counter
+from typing import List, Tuple
+
+# Identifiers, words and numbers. Dotted paths split on '.', so
+# "DocumentIngestor.ingest_all" yields two identifier tokens.
+_TOKEN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "with"
+})
+
+SparseVector = Tuple[List[int], List[float]]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased terms for lexical matching. Identifiers are kept whole (so exact
+    function names match) and also split into snake_case / CamelCase parts.
+    """
+    terms = []
+    for raw in _TOKEN.findall(text):
+        token = raw.lower()
+        if len(token) > 1 and token not in _STOPWORDS:
+            terms.append(token)
+        parts = [p for chunk in raw.split("_") for p in _CAMEL.findall(chunk)]
+        if len(parts) > 1:
+            terms.extend(p.lower() for p in parts if len(p) > 1 and p.lower() not in _STOPWORDS)
+    return terms
+
+
+def term_index(term: str) -> int:
+    """Stable uint32 index for a term (hashing trick, no vocabulary to persist)."""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+class BM25SparseEncoder:
+    """
+    Client half of BM25 for Qdrant sparse vectors.
+    Documents carry saturated term frequencies; the collection's IDF modifier
+    supplies the inverse document frequency at query time.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_len: float = 200.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_len = avg_doc_len
+
+    def encode_document(self, text: str) -> SparseVector:
+        terms = tokenize(text)
+        if not terms:
+            return [], []
+        length_norm = self.k1 * (1 - self.b + self.b * len(terms) / self.avg_doc_len)
+        weights = {}
+        for term, tf in Counter(terms).items():
+            index = term_index(term)
+            # Hash collisions merge into one dimension
+            weights[index] = weights.get(index, 0.0) + tf * (self.k1 + 1) / (tf + length_norm)
+        indices = sorted(weights)
+        return indices, [weights[i] for i in indices]
+
+    def encode_query(self, text: str) -> SparseVector:
+        indices = sorted({term_index(term) for term in tokenize(text)})
+        return indices, [1.0] * len(indices)
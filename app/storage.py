@@ -1,7 +1,9 @@
 import io
+import time
 import asyncio
 import logging
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 from minio import Minio
 from minio.error import S3Error
 from app.interfaces import ObjectStore
@@ -111,3 +113,162 @@ class MinioConnector(ObjectStore):
         except Exception as e:
             logger.error(f"❌ STORAGE SYSTEM ERROR (Get): {e}")
             return None
+
+    async def delete(self, key: str) -> bool:
+        """Removes a blob from MinIO. MinIO treats missing keys as success."""
+        try:
+            await asyncio.to_thread(self.client.remove_object, self.bucket_name, key)
+            return True
+        except S3Error as e:
+            logger.error(f"❌ MINIO API ERROR (Delete): {e}")
+            return False
+        except Exception as e:
+            logger.error(f"❌ STORAGE SYSTEM ERROR (Delete): {e}")
+            return False
+
+
+class CachedObjectStore(ObjectStore):
+    """
+    Read-through LRU cache in front of another ObjectStore.
+    Bounded by total cached bytes with optional TTL. Blob keys are content-addressed
+    (see app.manifest.make_blob_key), so entries never go stale; the TTL only caps
+    how long cold blobs hold memory.
+    """
+
+    def __init__(self, backend: ObjectStore, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 0.0,
+                 report_interval: float = 60.0):
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.report_interval = report_interval
+
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()  # key -> (data, size, stored_at)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._last_report = time.monotonic()
+        self._report_task: Optional[asyncio.Task] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for telemetry and /health."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+    def _evict(self, key: str):
+        data, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _store(self, key: str, data: str):
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return  # Larger than the whole cache; never worth caching
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (data, size, time.monotonic())
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._evict(oldest)
+            self.evictions += 1
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        data, _, stored_at = entry
+        if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+            self._evict(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def _maybe_report(self):
+        """Ships counters to telemetry at most once per report_interval, off the request path."""
+        now = time.monotonic()
+        if now - self._last_report < self.report_interval:
+            return
+        if self._report_task and not self._report_task.done():
+            return
+        self._last_report = now
+        from .telemetry import telemetry
+        stats = self.stats()
+        self._report_task = asyncio.create_task(
+            telemetry.log(
+                event_type="BLOB_CACHE_STATS",
+                component="storage",
+                value=stats["hit_rate"],
+                metadata=stats,
+                status="OK"
+            )
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        """Serves from cache; concurrent misses for the same key share one backend fetch."""
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            self._maybe_report()
+            return cached
+
+        self.misses += 1
+        self._maybe_report()
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This caller was cancelled, not the shared fetch
+                # The caller that owned the fetch gave up (e.g. search deadline); fetch ourselves.
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await self.backend.get(key)
+            if data is not None:
+                self._store(key, data)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so a waiter-less failure doesn't warn at GC
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.cancel()  # Fetcher was cancelled; release any waiters
+
+    async def upload(self, key: str, data: str) -> bool:
+        """Writes through to the backend; cached copy is dropped rather than warmed."""
+        if key in self._entries:
+            self._evict(key)
+        return await self.backend.upload(key, data)
+
+    async def delete(self, key: str) -> bool:
+        if key in self._entries:
+            self._evict(key)
+        return await self.backend.delete(key)
+
+    async def purge(self) -> bool:
+        self._entries.clear()
+        self.current_bytes = 0
+        return await self.backend.purge()
+
+    async def check_health(self) -> bool:
+        return await self.backend.check_health()
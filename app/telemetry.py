@@ -2,6 +2,8 @@ import logging
 import json
 import time
 import os
+import asyncio
+from collections import deque
 from typing import Any, Dict, Optional
 import httpx
 
@@ -51,7 +53,7 @@ class CircuitBreaker:
 class TelemetryLogger:
     """
     HTTP-based telemetry logger for system events.
-    Sends events to dedicated telemetry service via fire-and-forget HTTP requests.
+    Buffers events in-process and ships them in batches to the dedicated telemetry service.
     
     Supports:
     - Load Latency: VRAM model loading time tracking
@@ -59,17 +61,32 @@ class TelemetryLogger:
     - Token-aware efficiency metrics
     
     Features:
+    - log() is a non-blocking enqueue into a bounded ring buffer (oldest dropped on overflow)
+    - Background flush to /v1/telemetry/log_batch on batch size or interval
+    - flush()/close() drain the buffer on shutdown
     - Circuit breaker pattern to prevent cascading failures
-    - Fallback to stdout logging when service unavailable
-    - Fire-and-forget async requests (non-blocking)
+    - Fallback to stdout logging when a batch cannot be delivered
     """
 
     def __init__(self):
         # Get telemetry service URL from environment
         self.telemetry_url = os.getenv("TELEMETRY_URL", "http://gravitas_telemetry:8006")
         self.enabled = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+        self.buffer_size = int(os.getenv("TELEMETRY_BUFFER_SIZE", "5000"))
+        self.batch_size = int(os.getenv("TELEMETRY_BATCH_SIZE", "100"))
+        self.flush_interval = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "1.0"))
         self.circuit_breaker = CircuitBreaker()
         self.client = None
+
+        self._buffer: deque = deque(maxlen=self.buffer_size)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._loop = None
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
         
         if self.enabled:
             logger.info(f"📊 Telemetry client initialized (service: {self.telemetry_url})")
@@ -85,6 +102,19 @@ class TelemetryLogger:
             )
         return self.client
 
+    def _ensure_flusher(self):
+        """Starts the background flush task on the running loop (restarted if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Loop-bound primitives (and pooled connections) cannot cross event loops
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._flush_task = None
+            self.client = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_loop())
+
     async def log(
         self,
         event_type: str,
@@ -94,7 +124,7 @@ class TelemetryLogger:
         status: str = None
     ) -> bool:
         """
-        Logs a telemetry event asynchronously to the telemetry service.
+        Queues a telemetry event for the next batch. Never waits on the network.
 
         Args:
             event_type: Type of event (e.g., "VRAM_CHECK", "VRAM_LOCKOUT")
@@ -104,54 +134,104 @@ class TelemetryLogger:
             status: Event status (e.g., "OK", "WARNING", "ERROR")
 
         Returns:
-            bool: True if logged successfully, False otherwise
+            bool: True if the event was queued, False if telemetry is disabled
         """
         if not self.enabled:
             return False
-        
-        # Check circuit breaker
-        if not self.circuit_breaker.can_attempt():
-            logger.debug("⚠️ Circuit breaker OPEN - skipping telemetry log")
-            return False
 
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1  # deque drops the oldest event on append
+        self._buffer.append({
+            "event_type": event_type,
+            "component": component,
+            "value": value,
+            "metadata": metadata,
+            "status": status
+        })
+
+        self._ensure_flusher()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def _flush_loop(self):
+        """Flushes whenever a full batch is waiting or flush_interval has passed."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ TELEMETRY FLUSH FAILURE: {e}")
+
+    async def flush(self) -> int:
+        """
+        Sends buffered events in batches until the buffer is empty or the service
+        is unavailable. Returns the number of events delivered.
+        """
+        if not self._buffer:
+            return 0
+        if self._flush_lock is None:
+            self._ensure_flusher()
+
+        delivered = 0
+        async with self._flush_lock:
+            while self._buffer:
+                # Circuit open: keep events buffered (ring buffer bounds memory) until it closes
+                if not self.circuit_breaker.can_attempt():
+                    logger.debug("⚠️ Circuit breaker OPEN - holding telemetry batch")
+                    break
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not await self._send_batch(batch):
+                    break
+                delivered += len(batch)
+        return delivered
+
+    async def _send_batch(self, batch: list) -> bool:
+        """POSTs one batch; undeliverable events go to the fallback log."""
         try:
-            # Prepare event payload
-            event = {
-                "event_type": event_type,
-                "component": component,
-                "value": value,
-                "metadata": metadata,
-                "status": status
-            }
-            
-            # Fire-and-forget HTTP request
             client = self._get_client()
             response = await client.post(
-                f"{self.telemetry_url}/v1/telemetry/log",
-                json=event
+                f"{self.telemetry_url}/v1/telemetry/log_batch",
+                json={"events": batch}
             )
             
             if response.status_code == 200:
                 self.circuit_breaker.record_success()
-                logger.debug(f"📊 TELEMETRY LOGGED: {event_type} ({component or 'unknown'})")
+                self.sent += len(batch)
+                self.batches += 1
+                logger.debug(f"📊 TELEMETRY BATCH SENT: {len(batch)} events")
                 return True
             else:
                 logger.warning(f"⚠️ Telemetry service returned {response.status_code}")
                 self.circuit_breaker.record_failure()
-                self._fallback_log(event)
-                return False
 
         except (httpx.TimeoutException, httpx.ConnectError) as e:
             # Service unavailable - circuit breaker will open after threshold
             self.circuit_breaker.record_failure()
             logger.debug(f"⚠️ Telemetry service unavailable: {e}")
-            self._fallback_log(event)
-            return False
         
         except Exception as e:
-            logger.error(f"❌ TELEMETRY LOG FAILURE: {e}")
+            logger.error(f"❌ TELEMETRY BATCH FAILURE: {e}")
+
+        self.failed += len(batch)
+        for event in batch:
             self._fallback_log(event)
-            return False
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Client-side counters for /health."""
+        return {
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches
+        }
     
     def _fallback_log(self, event: dict):
         """Fallback logging to stdout when service is unavailable."""
@@ -256,6 +336,55 @@ class TelemetryLogger:
             status="OK"
         )
     
+    # One event type per streamed-generation figure, so the telemetry service
+    # keeps a percentile histogram for each of them per shell (component)
+    STREAM_EVENTS = {
+        "queue_wait_ms": "LLM_QUEUE_WAIT",
+        "connect_ms": "LLM_CONNECT",
+        "ttft_ms": "LLM_TTFT",
+        "inter_token_ms": "LLM_INTER_TOKEN",
+        "tokens_per_second": "LLM_DECODE_TPS",
+        "total_ms": "LLM_LATENCY",
+    }
+
+    async def log_stream_metrics(
+        self,
+        model_name: str,
+        tier: str,
+        stream: Dict[str, Any],
+        session_id: str = None
+    ) -> bool:
+        """
+        Logs the phase timings of one streamed generation (see StreamMetrics.to_dict):
+        the THOUGHT_LATENCY efficiency event plus one LLM_* event per measured figure.
+        
+        Args:
+            model_name: Shell that served the generation
+            tier: L1/L2/L3
+            stream: queue_wait_ms, connect_ms, ttft_ms, inter_token_ms, tokens_per_second,
+                    total_ms, tokens, prompt_tokens (None = not measured)
+            session_id: Wrapper session, for correlating the events
+            
+        Returns:
+            bool: True if the events were queued
+        """
+        if not self.enabled:
+            return False
+        
+        if stream.get("total_ms") is not None:
+            await self.log_thought_latency(
+                model_name,
+                stream["total_ms"] / 1000,
+                tokens_generated=stream.get("tokens") or 0,
+                prompt_tokens=stream.get("prompt_tokens") or 0
+            )
+        metadata = {"tier": tier, "session_id": session_id}
+        for key, event_type in self.STREAM_EVENTS.items():
+            value = stream.get(key)
+            if value is not None:
+                await self.log(event_type, component=model_name, value=value, metadata=metadata, status="OK")
+        return True
+    
     @staticmethod
     def start_timer() -> float:
         """Returns current time for latency measurement."""
@@ -315,8 +444,58 @@ class TelemetryLogger:
             self.circuit_breaker.record_failure()
             return {}
     
+    async def get_percentiles(
+        self,
+        event_type: str,
+        hours: float = 1.0,
+        quantiles: str = "0.5,0.95"
+    ) -> Dict[str, Any]:
+        """
+        Per-component percentiles of one event type from the telemetry service's histograms.
+        
+        Args:
+            event_type: e.g. "LLM_TTFT"
+            hours: Window length ending now
+            quantiles: Comma-separated quantiles (e.g. "0.05,0.5,0.95")
+            
+        Returns:
+            PercentilesResponse as a dict ({} on failure)
+        """
+        if not self.enabled or not self.circuit_breaker.can_attempt():
+            return {}
+        
+        try:
+            client = self._get_client()
+            response = await client.get(
+                f"{self.telemetry_url}/v1/telemetry/percentiles",
+                params={"event_type": event_type, "hours": hours, "quantiles": quantiles}
+            )
+            
+            if response.status_code == 200:
+                self.circuit_breaker.record_success()
+                return response.json()
+            else:
+                self.circuit_breaker.record_failure()
+                return {}
+                
+        except Exception as e:
+            logger.error(f"❌ PERCENTILE QUERY FAILURE: {e}")
+            self.circuit_breaker.record_failure()
+            return {}
+    
     async def close(self):
-        """Close the HTTP client."""
+        """Flush buffered events, stop the background flusher and close the HTTP client."""
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ TELEMETRY SHUTDOWN FLUSH FAILURE: {e}")
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._flush_task = None
         if self.client:
             await self.client.aclose()
             self.client = None
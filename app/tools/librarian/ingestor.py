@@ -32,7 +32,8 @@ class IngestionTool:
             # Create ingestor with container dependencies
             self.ingestor = DocumentIngestor(
                 vector_store=container.memory,
-                storage=container.storage
+                storage=container.storage,
+                manifest=container.manifest
             )
             
             logger.info(f"📚 Configured paths: {self.ingestor.docs_path}")
@@ -1,7 +1,13 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import AsyncIterator, Optional, Dict
 from pathlib import Path
 from app.lib.reasoning_pipe import ReasoningPipe
+from app.lib.stream_metrics import StreamMetrics
+from app.services.metrics import observe_llm
+from app.services.tracing import span, tracer
+from app.services.registry.shell_registry import ShellRegistry
+from app.telemetry import telemetry
 from app.services.supervisor.guardian import SupervisorGuardian
 
 class GravitasAgentWrapper(ABC):
@@ -31,6 +37,11 @@ class GravitasAgentWrapper(ABC):
         self.model = model
         self.tier = tier
         
+        self._generation_span = None  # Open while _execute_internal runs (parent of llm.first_token)
+        self.stream = StreamMetrics(model=model, tier=tier)  # Timings of the current generation
+        self._deltas: Optional[asyncio.Queue] = None  # Set while a stream_task() consumer is attached
+        self.result: Optional[Dict] = None  # Final result of the last stream_task()
+
         self.pipe = ReasoningPipe(ghost_name=ghost_name, session_id=session_id, model=model, tier=tier)
         self.supervisor = SupervisorGuardian()
 
@@ -40,11 +51,13 @@ class GravitasAgentWrapper(ABC):
         DO NOT OVERRIDE this method. Subclasses should implement _execute_internal.
         """
         # 1. Request permission from Supervisor
-        permission = await self.supervisor.notify_session_start(
-            agent=self.ghost_name,
-            session_id=self.session_id,
-            metadata={"task": task, "model": self.model, "tier": self.tier}
-        )
+        with span("certification", agent=self.ghost_name) as certification:
+            permission = await self.supervisor.notify_session_start(
+                agent=self.ghost_name,
+                session_id=self.session_id,
+                metadata={"task": task, "model": self.model, "tier": self.tier}
+            )
+            certification.set_attribute("allowed", permission.allowed)
         
         if not permission.allowed:
             raise RuntimeError(f"Session rejected by Supervisor: {permission.reason}")
@@ -54,11 +67,31 @@ class GravitasAgentWrapper(ABC):
             if "prompt" in task:
                 self.pipe.set_task(task["prompt"][:200]) # Summary of task
             
-            # 3. Execute model-specific logic
-            result = await self._execute_internal(task)
+            # 3. Execute model-specific logic (timed per tier for /metrics, traced as llm.generate)
+            self.stream = StreamMetrics(model=self.model, tier=self.tier)
+            self.stream.start(queued_at=task.get("queued_at"))
+            try:
+                with span("llm.generate", model=self.model, tier=self.tier) as generation:
+                    self._generation_span = generation
+                    result = await self._execute_internal(task)
+            except asyncio.CancelledError:
+                # Caller gave up (deadline or client disconnect); the upstream stream is closed with us
+                self.stream.finish()
+                observe_llm(self.tier, self.model, self.stream.total_ms / 1000, outcome="cancelled")
+                raise
+            except Exception:
+                self.stream.finish()
+                observe_llm(self.tier, self.model, self.stream.total_ms / 1000, outcome="error")
+                raise
+            finally:
+                self._generation_span = None
+            self.stream.finish()
+            observe_llm(self.tier, self.model, self.stream.total_ms / 1000)
+            await self._report_stream()
             
             # 4. Finalize the reasoning pipe
-            pipe_file = self.pipe.finalize()
+            with span("pipe.finalize"):
+                pipe_file = self.pipe.finalize()
             
             # 5. Notify Supervisor of completion
             await self.supervisor.notify_session_end(
@@ -67,7 +100,7 @@ class GravitasAgentWrapper(ABC):
             )
             
             return result
-        except Exception as e:
+        except (Exception, asyncio.CancelledError) as e:
             # Even on failure, we should try to finalize if there's content
             if self.pipe.buffer:
                 try:
@@ -78,6 +111,72 @@ class GravitasAgentWrapper(ABC):
                     pass
             raise e
 
+    async def stream_task(self, task: Dict) -> AsyncIterator[str]:
+        """
+        execute_task() as an async generator of output deltas, yielded as the provider
+        streams them. Certification, the ReasoningPipe transcript and telemetry are
+        unchanged; the final result is in self.result once the generator is exhausted.
+        Closing the generator early cancels the generation.
+        """
+        self._deltas = deltas = asyncio.Queue()
+        self.result = None
+        runner = asyncio.ensure_future(self.execute_task(task))
+        runner.add_done_callback(lambda _: deltas.put_nowait(None))
+        try:
+            while (delta := await deltas.get()) is not None:
+                yield delta
+            self.result = runner.result()
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+            self._deltas = None
+
+    # --- Stream timing hooks (called by subclasses while streaming) ---
+
+    def emit(self, text: str):
+        """Hands an output delta to the stream_task() consumer, if any."""
+        if self._deltas is not None and text:
+            self._deltas.put_nowait(text)
+
+    def mark_connected(self):
+        """The provider accepted the request and the response stream is open."""
+        self.stream.mark_connected()
+
+    def mark_token(self):
+        """
+        Called for each streamed chunk that carries output. The first call also
+        records an llm.first_token span (generation start -> first token).
+        """
+        if not self.stream.mark_token():
+            return
+        generation = self._generation_span
+        if generation is not None:
+            first_token = tracer.start_span("llm.first_token", parent=generation, start_ns=generation.start_ns)
+            tracer.finish(first_token)
+
+    def set_token_counts(self, generated: int, prompt: int = 0, decode_seconds: Optional[float] = None):
+        """Token counts (and provider-measured decode time, if any) for throughput figures."""
+        self.stream.tokens = generated
+        self.stream.prompt_tokens = prompt
+        self.stream.provider_decode_s = decode_seconds
+
+    def set_load_time(self, seconds: float):
+        """Provider-measured time spent loading the model before generating (local shells)."""
+        self.stream.load_s = seconds
+
+    async def _report_stream(self):
+        """Ships this generation's timings to telemetry and to the shell's rolling stats."""
+        if not self.stream.tokens:
+            self.stream.tokens = self.stream.chunks  # ~1 token per streamed chunk
+        figures = self.stream.to_dict()
+        ShellRegistry.record_generation(self.model, figures)
+        await telemetry.log_stream_metrics(self.model, self.tier, figures, session_id=self.session_id)
+        if self.stream.load_s is not None and self.stream.load_s >= ShellRegistry.COLD_LOAD_SECONDS:
+            # A real VRAM swap: feeds the L1 scheduler's switch cost
+            ShellRegistry.record_load(self.model, self.stream.load_s)
+            await telemetry.log_load_latency(self.model, self.stream.load_s)
+
     @abstractmethod
     async def _execute_internal(self, task: Dict) -> Dict:
         """
@@ -1,7 +1,7 @@
 import json
 import re
-import httpx
 from typing import Optional, Dict
+from app.services.http_clients import HttpClientRegistry
 from app.wrappers.base_wrapper import GravitasAgentWrapper
 
 class OllamaWrapper(GravitasAgentWrapper):
@@ -30,44 +30,48 @@ class OllamaWrapper(GravitasAgentWrapper):
         full_output = []
         last_chunk = {}
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            async with client.stream(
-                "POST",
-                f"{self.ollama_url}/api/generate",
-                json={"model": self.model, "prompt": prompt, "stream": True}
-            ) as response:
-                if response.status_code != 200:
-                    error_text = await response.aread()
-                    raise RuntimeError(f"Ollama API error ({response.status_code}): {error_text.decode()}")
-
-                async for line in response.aiter_lines():
-                    if not line:
-                        continue
-                    
-                    try:
-                        chunk = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    
-                    last_chunk = chunk
-                    
-                    # 1. Parse and log thoughts (Chain of Thought)
-                    thought = self._parse_thought(chunk)
-                    if thought:
-                        self.pipe.log_thought(thought)
-                    
-                    # 2. Parse and log actions
-                    action = self._parse_action(chunk)
-                    if action:
-                        self.pipe.log_action(action)
-                    
-                    # 3. Extract regular text content
-                    text = chunk.get("response", "")
-                    if text:
-                        full_output.append(text)
-                    
-                    if chunk.get("done"):
-                        break
+        client = HttpClientRegistry.get("ollama")
+        async with client.stream(
+            "POST",
+            f"{self.ollama_url}/api/generate",
+            json={"model": self.model, "prompt": prompt, "stream": True},
+            timeout=120.0
+        ) as response:
+            if response.status_code != 200:
+                error_text = await response.aread()
+                raise RuntimeError(f"Ollama API error ({response.status_code}): {error_text.decode()}")
+            self.mark_connected()
+
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+
+                try:
+                    chunk = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                last_chunk = chunk
+
+                # 1. Parse and log thoughts (Chain of Thought)
+                thought = self._parse_thought(chunk)
+                if thought:
+                    self.pipe.log_thought(thought)
+
+                # 2. Parse and log actions
+                action = self._parse_action(chunk)
+                if action:
+                    self.pipe.log_action(action)
+
+                # 3. Extract regular text content
+                text = chunk.get("response", "")
+                if text:
+                    self.mark_token()
+                    full_output.append(text)
+                    self.emit(text)
+
+                if chunk.get("done"):
+                    break
 
         result_text = "".join(full_output)
         
@@ -75,6 +79,16 @@ class OllamaWrapper(GravitasAgentWrapper):
         tokens = last_chunk.get("eval_count", 0)  # eval_count is tokens generated
         if tokens == 0:
             tokens = len(result_text) // 4 # Fallback
+        # eval_duration (ns) is Ollama's own decode time, free of network jitter
+        eval_duration = last_chunk.get("eval_duration")
+        self.set_token_counts(
+            tokens,
+            prompt=last_chunk.get("prompt_eval_count", 0),
+            decode_seconds=eval_duration / 1e9 if eval_duration else None
+        )
+        load_duration = last_chunk.get("load_duration")  # ns; near zero when the model was already hot
+        if load_duration is not None:
+            self.set_load_time(load_duration / 1e9)
             
         self.pipe.log_result(
             result=f"Generated {len(result_text)} characters.",
@@ -152,17 +152,39 @@ async function refreshHealth() {
     }
 }
 
+/**
+ * Applies an RFC 7386 JSON merge patch (null removes a key).
+ */
+function applyMergePatch(target, patch) {
+    if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+    const result = (target && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+    for (const [key, value] of Object.entries(patch)) {
+        if (value === null) delete result[key];
+        else result[key] = applyMergePatch(result[key], value);
+    }
+    return result;
+}
+
 /**
  * Initializes Server-Sent Events (SSE) for real-time monitoring.
  */
 function initHealthStream() {
     console.log("📡 Initializing Nexus Health Stream...");
     const evtSource = new EventSource(`${API_URL}/health/stream`);
-
-    evtSource.onmessage = (event) => {
-        const data = JSON.parse(event.data);
-        updateHealthUI(data);
-    };
+    let healthState = null;
+
+    // Full state on connect (and after the server resyncs a slow client)
+    evtSource.addEventListener('snapshot', (event) => {
+        healthState = JSON.parse(event.data);
+        updateHealthUI(healthState);
+    });
+
+    // Only what changed since the previous sample (JSON merge patch)
+    evtSource.addEventListener('delta', (event) => {
+        if (!healthState) return;
+        healthState = applyMergePatch(healthState, JSON.parse(event.data));
+        updateHealthUI(healthState);
+    });
 
     evtSource.onerror = (err) => {
         console.error("SSE connection failed:", err);
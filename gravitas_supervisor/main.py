@@ -2,8 +2,10 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 import httpx
 import os
+import time
 import asyncio
 import logging
+import subprocess
 from typing import Dict, Any
 
 # Relative imports from copied logic
@@ -28,12 +30,50 @@ deepinfra = DeepInfraClient()
 gemini = GeminiClient()
 
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://Gravitas_ollama:11434/v1/chat/completions")
+GPU_SAMPLE_TTL = float(os.getenv("GPU_SAMPLE_TTL", "2.0"))
+MODEL_LOAD_ESTIMATE_MS = float(os.getenv("MODEL_LOAD_ESTIMATE_MS", "15000"))
+
+# Live load signals (replace the hard-coded telemetry the router used to get)
+l1_in_flight = 0
+l1_latency_ms = 1000.0  # EWMA of completed L1 requests, seeded with a conservative guess
+_gpu = {"used": None, "total": None, "sampled_at": 0.0}
+
+def _probe_gpu():
+    try:
+        res = subprocess.check_output(
+            ["nvidia-smi", "--query-gpu=memory.used,memory.total", "--format=csv,noheader,nounits"],
+            encoding="utf-8", timeout=2
+        )
+        _gpu["used"], _gpu["total"] = map(int, res.strip().split("\n")[0].split(","))
+    except Exception:
+        _gpu["used"] = _gpu["total"] = None
+    _gpu["sampled_at"] = time.monotonic()
+
+async def current_telemetry(model: str) -> TelemetryState:
+    """Routing inputs from this process: queue, in-flight work, hot model, GPU and host load."""
+    if time.monotonic() - _gpu["sampled_at"] > GPU_SAMPLE_TTL:
+        await asyncio.to_thread(_probe_gpu)
+    vram = round(_gpu["used"] / _gpu["total"] * 100, 1) if _gpu["total"] else 0.0
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1) * 100
+    except OSError:
+        load = 0.0
+    backlog = queue.qsize() + l1_in_flight
+    switch_ms = MODEL_LOAD_ESTIMATE_MS if model_lock.needs_switch(model) else 0.0
+    return TelemetryState(
+        vram_usage_percent=vram,
+        system_load_percent=round(load, 1),
+        avg_latency=l1_latency_ms / 1000,
+        queue_depth=backlog,
+        estimated_wait_ms=(backlog + 1) * l1_latency_ms + switch_ms
+    )
 
 @app.post("/v1/chat/completions")
 async def chat_completions(request: Request):
     """
     OpenAI-compatible chat completions endpoint with intelligent routing and queuing.
     """
+    global l1_in_flight, l1_latency_ms
     try:
         body = await request.json()
     except Exception:
@@ -46,18 +86,16 @@ async def chat_completions(request: Request):
     # Mock complexity or extract from body if available
     complexity = body.get("complexity", 5)
     
-    # Mock telemetry (in real scenario, this would come from a telemetry service)
-    # We'll assume normal state for now
-    telemetry = TelemetryState(
-        vram_usage_percent=40.0,
-        system_load_percent=10.0,
-        avg_latency=0.5
-    )
+    local_model = body.get("model", "")
+    telemetry = await current_telemetry(local_model)
 
     # 1. Route the request
-    query = UserQuery(text=user_text, code_complexity=complexity)
+    query = UserQuery(text=user_text, code_complexity=complexity, deadline_ms=body.get("deadline_ms"))
     target = router.route(query, telemetry)
-    logger.info(f"Routing query to {target.value} (Complexity: {complexity})")
+    logger.info(
+        f"Routing query to {target.value} (Complexity: {complexity}, "
+        f"L1 wait ~{telemetry.estimated_wait_ms:.0f}ms, backlog {telemetry.queue_depth})"
+    )
 
     # 2. Handle Routing
     if target == TargetModel.L3:
@@ -85,18 +123,26 @@ async def chat_completions(request: Request):
         # Here we'll just process it immediately to fulfill the request.
         queued_body = await queue.dequeue()
         
+        l1_in_flight += 1
+        started = time.perf_counter()
         async with httpx.AsyncClient() as client:
             try:
                 response = await client.post(OLLAMA_URL, json=queued_body, timeout=120.0)
+                l1_latency_ms += 0.2 * ((time.perf_counter() - started) * 1000 - l1_latency_ms)
+                await model_lock.set_model(local_model)
                 return JSONResponse(content=response.json(), status_code=response.status_code)
             except Exception as e:
                 logger.error(f"L1 Error: {e}")
                 return JSONResponse({"error": str(e)}, status_code=500)
+            finally:
+                l1_in_flight -= 1
 
 @app.get("/health")
 async def health():
     return {
         "status": "healthy", 
         "queue_size": queue.qsize(),
+        "l1_in_flight": l1_in_flight,
+        "l1_latency_ms": round(l1_latency_ms, 1),
         "hot_model": model_lock.current_model
     }
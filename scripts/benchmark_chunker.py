@@ -0,0 +1,156 @@
+"""
+Chunker benchmark: structure-aware Chunker vs the legacy 1000-character slicer.
+
+Builds both indexes over app/ and docs/, then asks two kinds of queries with a
+known answer location:
+  - Python: the first docstring line of each function/method -> the chunk holding its `def` line.
+  - Markdown: each heading title -> the chunk holding that heading line.
+Reports recall@k and index size (chunks, stored bytes, dense vector bytes).
+
+Usage:
+    python scripts/benchmark_chunker.py              # dense (all-MiniLM-L6-v2)
+    python scripts/benchmark_chunker.py --lexical    # BM25 only, no model download
+"""
+import os
+import sys
+import ast
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.chunker import Chunker, _HEADING
+from app.sparse import tokenize
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+KS = (1, 5, 10)
+
+
+def legacy_chunks(text: str, size: int = 1000):
+    """The previous DocumentIngestor.chunk_text, with line spans for scoring."""
+    for i in range(0, len(text), size):
+        start_line = text.count("\n", 0, i) + 1
+        yield text[i:i + size], start_line, start_line + text.count("\n", i, i + size)
+
+
+def structured_chunks(chunker: Chunker, path: str):
+    for chunk in chunker.chunk_file(path):
+        yield chunk.text, chunk.start_line, chunk.end_line
+
+
+def collect(paths):
+    """(path, text) for every .py/.md file under the given roots."""
+    for base in paths:
+        for root, _, files in os.walk(os.path.join(ROOT, base)):
+            if "__pycache__" in root or "journals" in root:
+                continue
+            for name in sorted(files):
+                if name.endswith((".py", ".md")):
+                    path = os.path.join(root, name)
+                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                        yield path, f.read()
+
+
+def queries_for(path: str, text: str):
+    """(query, line) pairs whose answer is the chunk covering `line`."""
+    if path.endswith(".py"):
+        try:
+            tree = ast.parse(text)
+        except SyntaxError:
+            return
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                doc = ast.get_docstring(node)
+                if doc and len(doc.split()) >= 4:
+                    yield doc.strip().splitlines()[0], node.lineno
+    else:
+        in_fence = False
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            if line.lstrip().startswith(("```", "~~~")):
+                in_fence = not in_fence
+            heading = None if in_fence else _HEADING.match(line)
+            if heading and len(heading.group(2).split()) >= 2:
+                yield heading.group(2), lineno
+
+
+class DenseScorer:
+    def __init__(self, texts):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.matrix = self.model.encode(texts, batch_size=64, normalize_embeddings=True, show_progress_bar=False)
+
+    def rank(self, query: str):
+        q = self.model.encode(query, normalize_embeddings=True)
+        return np.argsort(-(self.matrix @ q))
+
+
+class LexicalScorer:
+    """Plain BM25 over the same tokenizer the sparse index uses."""
+    def __init__(self, texts, k1: float = 1.2, b: float = 0.75):
+        self.docs = [tokenize(t) for t in texts]
+        self.k1, self.b = k1, b
+        self.avg_len = sum(len(d) for d in self.docs) / max(len(self.docs), 1)
+        self.df = {}
+        for doc in self.docs:
+            for term in set(doc):
+                self.df[term] = self.df.get(term, 0) + 1
+        self.counts = [{t: doc.count(t) for t in set(doc)} for doc in self.docs]
+
+    def rank(self, query: str):
+        n = len(self.docs)
+        scores = np.zeros(n)
+        for term in set(tokenize(query)):
+            if term not in self.df:
+                continue
+            idf = np.log(1 + (n - self.df[term] + 0.5) / (self.df[term] + 0.5))
+            for i, counts in enumerate(self.counts):
+                tf = counts.get(term)
+                if tf:
+                    norm = self.k1 * (1 - self.b + self.b * len(self.docs[i]) / self.avg_len)
+                    scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return np.argsort(-scores)
+
+
+def evaluate(name, chunker_fn, files, scorer_cls):
+    chunks = []  # (path, text, start_line, end_line)
+    for path, text in files:
+        for chunk_text, start, end in chunker_fn(path, text):
+            chunks.append((path, chunk_text, start, end))
+
+    scorer = scorer_cls([c[1] for c in chunks])
+    hits = {k: 0 for k in KS}
+    total = 0
+    for path, text in files:
+        for query, line in queries_for(path, text):
+            total += 1
+            ranking = scorer.rank(query)[:max(KS)]
+            for k in KS:
+                if any(chunks[i][0] == path and chunks[i][2] <= line <= chunks[i][3] for i in ranking[:k]):
+                    hits[k] += 1
+
+    stored = sum(len(c[1].encode("utf-8")) for c in chunks)
+    print(f"\n== {name} ==")
+    print(f"chunks: {len(chunks)}  stored: {stored / 1024:.0f} KiB  dense vectors: {len(chunks) * 384 * 4 / 1024:.0f} KiB")
+    print(f"queries: {total}  " + "  ".join(f"recall@{k}: {hits[k] / max(total, 1):.3f}" for k in KS))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lexical", action="store_true", help="Score with BM25 instead of the dense model")
+    parser.add_argument("--paths", nargs="+", default=["app", "docs"])
+    args = parser.parse_args()
+
+    files = list(collect(args.paths))
+    scorer_cls = LexicalScorer if args.lexical else DenseScorer
+    chunker = Chunker()
+
+    print(f"Files: {len(files)}  Scorer: {'BM25' if args.lexical else 'all-MiniLM-L6-v2'}")
+    evaluate("legacy (1000 chars)", lambda path, text: legacy_chunks(text), files, scorer_cls)
+    evaluate(
+        f"structured (target {chunker.target_tokens}, max {chunker.max_tokens}, overlap {chunker.overlap_tokens} tokens)",
+        lambda path, text: structured_chunks(chunker, path), files, scorer_cls
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Test Suite: Deadline-aware admission
+Validates deadline budgets (admit / Retry-After / 504 on expiry), cancellation of
+upstream work when the client disconnects, and wrapper cleanup on cancellation.
+"""
+import asyncio
+import pytest
+from pathlib import Path
+from typing import Dict, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+
+from app.services.scheduler.pool import WorkerPool
+from app.services.supervisor.admission import CLIENT_CLOSED_REQUEST, Deadline, cancel_on_disconnect
+
+
+def test_deadline_budget():
+    unlimited = Deadline()
+    assert unlimited.remaining_ms is None
+    assert unlimited.admits(10 ** 9)
+
+    deadline = Deadline(budget_ms=5000)
+    deadline.started_at -= 1.0  # 1 s already spent (gatekeeper, routing)
+
+    assert deadline.admits(3500)
+    assert not deadline.admits(4500)
+    assert deadline.retry_after(12000) == 9  # ceil((12000 - ~4000) / 1000)
+    assert deadline.retry_after(4001) == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_cancels_queued_work():
+    pool = WorkerPool({"L1": 1})
+    release = asyncio.Event()
+    ran = []
+
+    async def slow():
+        await release.wait()
+
+    async def never():
+        ran.append("queued job")
+
+    blocker = asyncio.create_task(pool.submit("L1", slow))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as expired:
+        await Deadline(budget_ms=50).run(pool.submit("L1", never))
+    assert expired.value.status_code == 504
+
+    release.set()
+    await blocker
+    await pool.submit("L1", lambda: asyncio.sleep(0))
+    assert ran == []
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_upstream_call():
+    cancelled = asyncio.Event()
+
+    async def upstream():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(side_effect=[False, True])
+
+    with pytest.raises(HTTPException) as closed:
+        await cancel_on_disconnect(request, upstream(), poll_interval=0.01)
+
+    assert closed.value.status_code == CLIENT_CLOSED_REQUEST
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_while_queued_leaves_the_l1_backlog_unchanged():
+    from app.services.scheduler.load import LoadMonitor
+    from app.services.scheduler.lock import ModelLock
+
+    pool = WorkerPool({"L1": 1})
+    load = LoadMonitor(pool.queues["L1"], ModelLock(), ttl=3600)
+    release = asyncio.Event()
+
+    async def generation():
+        with load.track("L1"):
+            await release.wait()
+
+    busy = asyncio.create_task(pool.submit("L1", generation))
+    await asyncio.sleep(0.01)
+    before = (await load.snapshot()).l1_backlog
+
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(side_effect=[False, True])
+    with pytest.raises(HTTPException):
+        await cancel_on_disconnect(request, pool.submit("L1", generation), poll_interval=0.01)
+
+    assert before == 1
+    assert (await load.snapshot()).l1_backlog == before  # The abandoned job no longer counts as waiting
+    release.set()
+    await busy
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_connected_client_gets_the_result():
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+
+    async def upstream():
+        await asyncio.sleep(0.03)
+        return {"choices": []}
+
+    assert await cancel_on_disconnect(request, upstream(), poll_interval=0.01) == {"choices": []}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wrapper_closes_its_session():
+    from app.wrappers.base_wrapper import GravitasAgentWrapper
+
+    class HangingWrapper(GravitasAgentWrapper):
+        async def _execute_internal(self, task: Dict) -> Dict:
+            self.pipe.buffer = ["partial thought"]
+            await asyncio.sleep(30)
+
+        def _parse_thought(self, chunk: Dict) -> Optional[str]:
+            return None
+
+        def _parse_action(self, chunk: Dict) -> Optional[str]:
+            return None
+
+    with patch("app.wrappers.base_wrapper.ReasoningPipe"), patch("app.wrappers.base_wrapper.SupervisorGuardian"):
+        wrapper = HangingWrapper(ghost_name="Hang", session_id="s9", model="gemma2:27b", tier="L1")
+    wrapper.supervisor = MagicMock()
+    wrapper.supervisor.notify_session_start = AsyncMock(return_value=MagicMock(allowed=True))
+    wrapper.supervisor.notify_session_end = AsyncMock()
+    wrapper.pipe.finalize.return_value = Path("journal.md")
+
+    task = asyncio.create_task(wrapper.execute_task({"prompt": "hi"}))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    wrapper.supervisor.notify_session_end.assert_awaited_once_with("s9", Path("journal.md"))
+
+
+@pytest.mark.asyncio
+async def test_supervisor_rejects_what_cannot_meet_its_deadline(monkeypatch):
+    pytest.importorskip("google.generativeai")  # Supervisor router imports every wrapper
+    import time
+    from app.services.registry.shell_registry import LiveStats, ShellRegistry
+    from app.services.scheduler.load import LoadSnapshot
+    from app.services.supervisor.router import ChatCompletionRequest, SupervisorEngine
+
+    now = time.time()
+    monkeypatch.setattr(ShellRegistry, "_live", {
+        "gemma2:27b": LiveStats(model="gemma2:27b", source="telemetry", latency_ms=2000.0, updated_at=now),
+        "meta-llama/Meta-Llama-3-70B-Instruct": LiveStats(
+            model="meta-llama/Meta-Llama-3-70B-Instruct", source="telemetry", latency_ms=5000.0, updated_at=now
+        ),
+    })
+    monkeypatch.setenv("DEEPINFRA_API_KEY", "test")
+    engine = SupervisorEngine()
+    engine.load.snapshot = AsyncMock(return_value=LoadSnapshot(queue_depth=10, hot_model="gemma2:27b"))
+    request = ChatCompletionRequest(model="gemma2:27b", messages=[{"role": "user", "content": "hi"}], deadline_ms=3000)
+
+    with patch("app.services.supervisor.router.gatekeeper_client.validate_request",
+               AsyncMock(return_value={"allowed": True, "ghost_id": "Tester"})):
+        with pytest.raises(HTTPException) as rejected:
+            await engine.process_chat(request, "Bearer token")
+
+    # Spilled to L2 (5 s) instead of queueing locally (22 s), still over the 3 s budget
+    assert rejected.value.status_code == 429
+    assert int(rejected.value.headers["Retry-After"]) in (2, 3)  # ~2 s over budget, rounded up
+    entry = (await engine.audit.get_recent_entries(1))[0]
+    assert entry.routing_decision.tier == "L2"
+    assert entry.actual_performance.error.startswith("rejected")
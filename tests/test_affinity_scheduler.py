@@ -0,0 +1,186 @@
+"""
+Test Suite: L1 model-affinity scheduler
+Validates batching by shell, the fairness bound, the switch cost model,
+per-priority starvation limits and the measured model-load latency it relies on.
+"""
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.services.registry.shell_registry import LiveStats, ShellRegistry
+from app.services.scheduler.affinity import AffinityQueue
+from app.services.scheduler.lock import ModelLock
+from app.services.scheduler.pool import WorkerPool
+
+GEMMA, QWEN = "gemma2:27b", "qwen2.5-coder:32b"
+
+
+@pytest.fixture(autouse=True)
+def shells(monkeypatch):
+    """gemma 2 s per request, qwen 300 ms; both take 15 s to load."""
+    now = time.time()
+    monkeypatch.setattr(ShellRegistry, "_measured", {})
+    monkeypatch.setattr(ShellRegistry, "_live", {
+        GEMMA: LiveStats(model=GEMMA, source="telemetry", latency_ms=2000.0, load_ms=15000.0, updated_at=now),
+        QWEN: LiveStats(model=QWEN, source="telemetry", latency_ms=300.0, load_ms=15000.0, updated_at=now),
+    })
+
+
+async def hot_queue(model=GEMMA, **kwargs):
+    lock = ModelLock()
+    await lock.set_model(model)
+    return AffinityQueue(lock, starvation={-1: 0.0, 0: 30.0, 10: 120.0}, **kwargs)
+
+
+async def fill(queue, *models, priority=10):
+    for name in models:
+        await queue.enqueue(SimpleNamespace(model=name), priority=priority)
+
+
+async def drain(queue):
+    order = []
+    while not queue.empty():
+        request = await queue.dequeue()
+        order.append(request.model)
+        await queue.model_lock.set_model(request.model)  # The worker ran it, so it is hot now
+    return order
+
+
+@pytest.mark.asyncio
+async def test_serves_hot_model_backlog_before_switching():
+    queue = await hot_queue()
+    await fill(queue, QWEN, GEMMA, QWEN, GEMMA)
+
+    assert await drain(queue) == [GEMMA, GEMMA, QWEN, QWEN]
+    assert queue.switches == 1
+    assert queue.affinity_hits == 3
+
+
+@pytest.mark.asyncio
+async def test_fairness_bound_forces_a_switch():
+    queue = await hot_queue(max_batch=2)
+    await fill(queue, QWEN, GEMMA, GEMMA, GEMMA, GEMMA)
+
+    assert await drain(queue) == [GEMMA, GEMMA, QWEN, GEMMA, GEMMA]
+
+
+@pytest.mark.asyncio
+async def test_cheap_switch_to_a_large_batch_pays_off():
+    ShellRegistry._live[QWEN].load_ms = 100.0
+    ShellRegistry._live[GEMMA].load_ms = 100.0
+    queue = await hot_queue()
+    await fill(queue, GEMMA, QWEN, QWEN, QWEN, QWEN, QWEN)
+
+    # Five 300 ms requests waiting 2 s each outweigh one 2 s request waiting ~1.7 s
+    assert (await drain(queue))[0] == QWEN
+
+
+@pytest.mark.asyncio
+async def test_starved_and_urgent_requests_jump_affinity():
+    queue = await hot_queue()
+    await fill(queue, QWEN, GEMMA, GEMMA)
+    queue._groups[QWEN][0].enqueued_at -= 121  # Past the priority-10 limit
+
+    assert (await queue.dequeue()).model == QWEN
+    assert queue.starved == 1
+
+    await queue.model_lock.set_model(GEMMA)
+    await queue.push_to_front(SimpleNamespace(model=QWEN))
+    assert (await queue.dequeue()).model == QWEN
+
+
+@pytest.mark.asyncio
+async def test_starvation_limit_per_priority():
+    queue = await hot_queue()
+
+    assert queue.starvation_limit(-1) == 0.0
+    assert queue.starvation_limit(0) == 30.0
+    assert queue.starvation_limit(5) == 30.0
+    assert queue.starvation_limit(10) == 120.0
+    assert queue.starvation_limit(-5) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_l1_jobs_in_affinity_order():
+    queue = await hot_queue()
+    pool = WorkerPool({"L1": 1}, queues={"L1": queue})
+    gate = asyncio.Event()
+    order = []
+
+    def job(model):
+        async def run():
+            await gate.wait()
+            order.append(model)
+            await queue.model_lock.set_model(model)
+        return run
+
+    jobs = [asyncio.create_task(pool.submit("L1", job(m), model=m)) for m in (GEMMA, QWEN, GEMMA, QWEN, GEMMA)]
+    for _ in range(5):
+        await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*jobs)
+
+    assert order == [GEMMA, GEMMA, GEMMA, QWEN, QWEN]
+    await pool.stop()
+
+
+def test_load_latency_estimates():
+    ShellRegistry._live.clear()
+    with patch("app.services.registry.shell_registry.settings.MODEL_LOAD_ESTIMATE_MS", 9000.0):
+        assert ShellRegistry.estimate_load_ms(GEMMA) == 9000.0
+        ShellRegistry.record_load(GEMMA, 12.0)
+        ShellRegistry.record_load(GEMMA, 7.0)
+        assert ShellRegistry.estimate_load_ms(GEMMA) == 11000.0  # EWMA, alpha 0.2
+        assert ShellRegistry.get_measured_stats(GEMMA).samples == 0  # Loads are not generations
+
+
+@pytest.mark.asyncio
+async def test_refresh_reads_load_latency_in_seconds():
+    ShellRegistry._live.clear()
+
+    async def get_percentiles(event_type, hours=1.0, quantiles="0.5,0.95"):
+        if event_type != "LOAD_LATENCY":
+            return {"components": []}
+        return {"components": [{"component": QWEN, "count": 3, "mean": 8.5, "percentiles": {"p95": 14.0}}]}
+
+    with patch("app.services.registry.shell_registry.telemetry") as telemetry:
+        telemetry.get_percentiles = AsyncMock(side_effect=get_percentiles)
+        await ShellRegistry.refresh_live_stats()
+
+    assert ShellRegistry.estimate_load_ms(QWEN) == 8500.0
+    assert ShellRegistry.estimate_load_ms(QWEN, tail=True) == 14000.0
+    assert ShellRegistry.get_live_stats(QWEN).source == "yaml"  # Load times alone say nothing about latency
+
+
+@pytest.mark.asyncio
+async def test_ollama_cold_load_is_reported():
+    from app.wrappers.base_wrapper import GravitasAgentWrapper
+    from app.lib.stream_metrics import StreamMetrics
+
+    class Wrapper(GravitasAgentWrapper):
+        async def _execute_internal(self, task):
+            return {}
+
+        def _parse_thought(self, chunk):
+            return None
+
+        def _parse_action(self, chunk):
+            return None
+
+    with patch("app.wrappers.base_wrapper.ReasoningPipe"), patch("app.wrappers.base_wrapper.SupervisorGuardian"):
+        wrapper = Wrapper(ghost_name="Loader", session_id="s", model=QWEN, tier="L1")
+
+    with patch("app.wrappers.base_wrapper.telemetry") as telemetry:
+        telemetry.log_stream_metrics = AsyncMock(return_value=True)
+        telemetry.log_load_latency = AsyncMock(return_value=True)
+        for seconds in (0.01, 6.0):
+            wrapper.stream = StreamMetrics(model=QWEN, tier="L1")
+            wrapper.stream.start()
+            wrapper.set_load_time(seconds)
+            wrapper.stream.finish()
+            await wrapper._report_stream()
+
+    telemetry.log_load_latency.assert_awaited_once_with(QWEN, 6.0)
+    assert ShellRegistry.get_measured_stats(QWEN).load_ms == 6000.0
@@ -0,0 +1,144 @@
+"""
+Test Suite: Read-through blob cache (CachedObjectStore)
+Validates hit/miss accounting, byte-bounded LRU eviction, TTL and miss coalescing.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.storage import CachedObjectStore
+
+
+def make_backend(blobs: dict):
+    backend = MagicMock()
+    backend.get = AsyncMock(side_effect=lambda key: blobs.get(key))
+    backend.upload = AsyncMock(return_value=True)
+    backend.delete = AsyncMock(return_value=True)
+    backend.purge = AsyncMock(return_value=True)
+    return backend
+
+
+@pytest.mark.asyncio
+async def test_repeat_get_is_served_from_cache():
+    backend = make_backend({"blob_a": "alpha"})
+    cache = CachedObjectStore(backend, max_bytes=1024)
+
+    assert await cache.get("blob_a") == "alpha"
+    assert await cache.get("blob_a") == "alpha"
+
+    assert backend.get.call_count == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes"] == 5
+
+
+@pytest.mark.asyncio
+async def test_missing_blob_is_not_cached():
+    backend = make_backend({})
+    cache = CachedObjectStore(backend, max_bytes=1024)
+
+    assert await cache.get("blob_missing") is None
+    assert await cache.get("blob_missing") is None
+    assert backend.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_respects_byte_budget():
+    backend = make_backend({"a": "x" * 40, "b": "y" * 40, "c": "z" * 40})
+    cache = CachedObjectStore(backend, max_bytes=100)
+
+    await cache.get("a")
+    await cache.get("b")
+    await cache.get("a")  # 'a' becomes most recently used
+    await cache.get("c")  # Over budget: evicts 'b'
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes <= 100
+
+    backend.get.reset_mock()
+    await cache.get("a")
+    backend.get.assert_not_called()
+    await cache.get("b")
+    backend.get.assert_called_once_with("b")
+
+
+@pytest.mark.asyncio
+async def test_ttl_expires_entries():
+    backend = make_backend({"a": "alpha"})
+    cache = CachedObjectStore(backend, max_bytes=1024, ttl_seconds=10)
+
+    with patch("app.storage.time.monotonic", return_value=1000.0):
+        await cache.get("a")
+    with patch("app.storage.time.monotonic", return_value=1005.0):
+        await cache.get("a")
+    assert backend.get.call_count == 1
+
+    with patch("app.storage.time.monotonic", return_value=1020.0):
+        await cache.get("a")
+    assert backend.get.call_count == 2
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    release = asyncio.Event()
+
+    async def slow_get(key):
+        await release.wait()
+        return "payload"
+
+    backend = make_backend({})
+    backend.get = AsyncMock(side_effect=slow_get)
+    cache = CachedObjectStore(backend, max_bytes=1024)
+
+    tasks = [asyncio.create_task(cache.get("a")) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == ["payload"] * 5
+    assert backend.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_upload_delete_and_purge_invalidate():
+    backend = make_backend({"a": "alpha"})
+    cache = CachedObjectStore(backend, max_bytes=1024)
+
+    await cache.get("a")
+    await cache.upload("a", "alpha")
+    await cache.get("a")
+    assert backend.get.call_count == 2
+
+    await cache.delete("a")
+    assert cache.stats()["entries"] == 0
+    backend.delete.assert_called_once_with("a")
+
+    await cache.get("a")
+    await cache.purge()
+    assert cache.current_bytes == 0
+    backend.purge.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_waiter_refetches_when_owning_fetch_is_cancelled():
+    calls = []
+
+    async def get(key):
+        calls.append(key)
+        if len(calls) == 1:
+            await asyncio.sleep(5)  # First fetch hangs until cancelled
+        return "payload"
+
+    backend = make_backend({})
+    backend.get = AsyncMock(side_effect=get)
+    cache = CachedObjectStore(backend, max_bytes=1024)
+
+    owner = asyncio.create_task(cache.get("a"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get("a"))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    assert await waiter == "payload"
+    assert len(calls) == 2
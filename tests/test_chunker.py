@@ -0,0 +1,109 @@
+"""
+Test Suite: Structure-aware chunker
+Validates Python AST boundaries, Markdown heading sections, sentence splitting,
+token targets and overlap.
+"""
+import os
+import tempfile
+from app.chunker import Chunker, iter_lines
+
+PY_SOURCE = '''import os
+
+
+def alpha():
+    """First."""
+    return 1
+
+
+# Explains beta
+@staticmethod
+def beta():
+    return 2
+
+
+class Gamma:
+    def one(self):
+        return 1
+'''
+
+
+def test_python_chunks_never_cut_a_function():
+    chunker = Chunker(target_tokens=10, max_tokens=50, overlap_tokens=0)
+
+    chunks = list(chunker.chunk_text(PY_SOURCE, "py"))
+
+    by_section = {c.section: c for c in chunks}
+    assert "def alpha():" in by_section["alpha"].text
+    assert 'return 1' in by_section["alpha"].text
+    # Leading comment and decorator travel with the function
+    assert by_section["beta"].text.startswith("# Explains beta\n@staticmethod")
+    assert by_section["beta"].start_line == 9
+    assert "def one" in by_section["Gamma"].text
+
+
+def test_small_functions_are_packed_together():
+    chunker = Chunker(target_tokens=200, max_tokens=256, overlap_tokens=0)
+
+    chunks = list(chunker.chunk_text(PY_SOURCE, "py"))
+
+    assert len(chunks) == 1
+    assert chunks[0].section == "alpha, beta, Gamma"
+
+
+def test_oversized_class_splits_per_method():
+    methods = "".join(f"    def m{i}(self):\n        return '{'x' * 60}'\n\n" for i in range(6))
+    source = f"class Big:\n    '''Doc.'''\n\n{methods}"
+    chunker = Chunker(target_tokens=30, max_tokens=40, overlap_tokens=0)
+
+    sections = [c.section for c in chunker.chunk_text(source, "py")]
+
+    assert sections == ["Big, Big.m0", "Big.m1", "Big.m2", "Big.m3", "Big.m4", "Big.m5"]
+
+
+def test_invalid_python_falls_back_to_text():
+    chunks = list(Chunker().chunk_text("def broken(:\n    pass\n", "py"))
+    assert chunks[0].text.startswith("def broken(")
+
+
+def test_markdown_splits_on_headings_with_paths():
+    doc = (
+        "# Guide\nIntro.\n\n## Install\n" + "Run the installer now. " * 20 + "\n\n"
+        "```\n# not a heading\n```\n\n## Usage\nCall it.\n"
+    )
+    chunker = Chunker(target_tokens=60, max_tokens=200, overlap_tokens=0)
+
+    chunks = list(chunker.chunk_text(doc, "md"))
+
+    assert [c.section for c in chunks] == ["Guide", "Guide > Install", "Guide > Usage"]
+    install = next(c for c in chunks if "Guide > Install" in c.section)
+    assert "# not a heading" in install.text
+    assert chunks[-1].text.startswith("## Usage")
+
+
+def test_long_prose_splits_on_sentences_with_overlap():
+    text = " ".join(f"Sentence number {i} is here." for i in range(100))
+    chunker = Chunker(target_tokens=50, max_tokens=60, overlap_tokens=10)
+
+    chunks = list(chunker.chunk_text(text, "txt"))
+
+    assert len(chunks) > 1
+    assert all(c.text.endswith(".") for c in chunks)
+    assert all(chunker.count_tokens(c.text) <= 60 for c in chunks)
+    # Consecutive chunks share trailing context
+    last_sentence = chunks[0].text.rsplit(". ", 1)[-1]
+    assert chunks[1].text.startswith(last_sentence)
+
+
+def test_chunk_file_streams_from_disk():
+    with tempfile.NamedTemporaryFile("w", suffix=".md", delete=False) as f:
+        f.write("# A\none\n\n# B\ntwo\n")
+        path = f.name
+    try:
+        chunks = list(Chunker(target_tokens=1, max_tokens=100).chunk_file(path))
+        assert [(c.section, c.start_line, c.end_line) for c in chunks] == [("A", 1, 2), ("B", 4, 5)]
+    finally:
+        os.remove(path)
+
+
+def test_iter_lines_keeps_newlines():
+    assert list(iter_lines("a\nb\n\nc")) == ["a\n", "b\n", "\n", "c"]
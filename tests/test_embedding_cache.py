@@ -0,0 +1,74 @@
+"""
+Test Suite: Embedding cache
+Validates key normalization, model separation, float16 storage and LRU bounds.
+"""
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from app.embedding_cache import EmbeddingCache, normalize_text
+
+
+def test_normalize_text_collapses_whitespace_and_case():
+    assert normalize_text("  Hello\n\tWORLD  ") == "hello world"
+    assert normalize_text("Ｇravitas") == "gravitas"  # NFKC folds full-width forms
+    assert normalize_text("Mixed Case", casefold=False) == "Mixed Case"
+
+
+def test_vectors_stored_compact_and_returned_float32():
+    cache = EmbeddingCache(max_entries=10)
+    cache.put("model-a", "query", np.ones(384, dtype=np.float32))
+
+    vector = cache.get("model-a", "QUERY")
+    assert vector.dtype == np.float32
+    assert vector.shape == (384,)
+    assert cache.stats()["bytes"] == 384 * 2
+
+
+def test_model_name_is_part_of_key():
+    cache = EmbeddingCache(max_entries=10)
+    cache.put("model-a", "query", np.ones(4))
+
+    assert cache.get("model-b", "query") is None
+    assert cache.get("model-a", "query") is not None
+
+
+def test_lru_bound_and_hit_rate():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("m", "a", np.zeros(4))
+    cache.put("m", "b", np.zeros(4))
+    cache.get("m", "a")  # 'a' most recently used
+    cache.put("m", "c", np.zeros(4))  # evicts 'b'
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_encode_reads_through():
+    embedder = MagicMock()
+    embedder.encode = MagicMock(return_value=np.full(8, 0.5))
+    cache = EmbeddingCache(max_entries=10)
+
+    first = await cache.encode(embedder, "m", "summary text")
+    second = await cache.encode(embedder, "m", "Summary  text")
+
+    embedder.encode.assert_called_once_with("summary text")
+    assert np.allclose(first, second)
+
+
+@pytest.mark.asyncio
+async def test_encode_many_batches_only_misses():
+    embedder = MagicMock()
+    embedder.encode = MagicMock(side_effect=lambda texts, **kwargs: np.ones((len(texts), 8)))
+    cache = EmbeddingCache(max_entries=10)
+    await cache.encode_many(embedder, "m", ["a"])
+
+    vectors = await cache.encode_many(embedder, "m", ["a", "b", "c"])
+
+    assert len(vectors) == 3
+    assert embedder.encode.call_count == 2
+    assert embedder.encode.call_args.args[0] == ["b", "c"]
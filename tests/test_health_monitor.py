@@ -0,0 +1,114 @@
+"""
+Test Suite: Shared health sampler
+Validates merge-patch deltas, one probe per interval regardless of subscriber
+count, snapshot-on-connect, slow-client resync and cached /health/detailed reads.
+"""
+import asyncio
+import pytest
+from app.health_monitor import HealthBroadcaster, merge_patch
+
+
+def make_sampler(states):
+    """Sampler returning the given snapshots in order (last one repeats)."""
+    calls = {"n": 0}
+
+    async def sample():
+        index = min(calls["n"], len(states) - 1)
+        calls["n"] += 1
+        await asyncio.sleep(0)
+        return states[index]
+
+    return sample, calls
+
+
+def test_merge_patch_only_carries_changes():
+    old = {"api": "online", "gpu": {"used": 10, "total": 24}, "reranker": {"calls": 1}}
+    new = {"api": "online", "gpu": {"used": 12, "total": 24}, "qdrant": "online"}
+
+    assert merge_patch(old, new) == {"gpu": {"used": 12}, "qdrant": "online", "reranker": None}
+    assert merge_patch(new, dict(new)) == {}
+
+
+@pytest.mark.asyncio
+async def test_many_subscribers_share_one_probe():
+    sample, calls = make_sampler([{"health": {"gpu": 1}}])
+    monitor = HealthBroadcaster(sample, interval=0.05)
+
+    subscribers = [monitor.subscribe() for _ in range(20)]
+    await asyncio.sleep(0.12)
+    await monitor.stop()
+
+    assert 2 <= calls["n"] <= 4  # Per interval, not per subscriber
+    for subscriber in subscribers:
+        kind, version, payload = subscriber.queue.get_nowait()
+        assert (kind, payload) == ("snapshot", {"health": {"gpu": 1}})
+
+
+@pytest.mark.asyncio
+async def test_deltas_only_when_something_changes():
+    sample, _ = make_sampler([
+        {"health": {"gpu": 1, "qdrant": "offline"}},
+        {"health": {"gpu": 1, "qdrant": "offline"}},
+        {"health": {"gpu": 1, "qdrant": "online"}},
+    ])
+    monitor = HealthBroadcaster(sample, interval=60)
+    subscriber = monitor.subscribe()
+    await monitor.stop()  # Drive samples by hand below
+
+    monitor.subscribers.append(subscriber)
+    for _ in range(3):
+        await monitor.refresh()
+
+    messages = []
+    while not subscriber.queue.empty():
+        messages.append(subscriber.queue.get_nowait())
+    assert [(kind, payload) for kind, _, payload in messages] == [
+        ("snapshot", {"health": {"gpu": 1, "qdrant": "offline"}}),
+        ("delta", {"health": {"qdrant": "online"}}),
+    ]
+    assert messages[1][1] == messages[0][1] + 1
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_starts_from_cached_snapshot():
+    sample, calls = make_sampler([{"health": {"gpu": 1}}])
+    monitor = HealthBroadcaster(sample, interval=60)
+    await monitor.refresh()
+
+    subscriber = monitor.subscribe()
+    await monitor.stop()
+
+    assert subscriber.queue.get_nowait()[0] == "snapshot"
+    assert subscriber.synced
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_resynced():
+    states = [{"n": i} for i in range(10)]
+    sample, _ = make_sampler(states)
+    monitor = HealthBroadcaster(sample, interval=60, queue_size=2)
+    await monitor.refresh()
+    subscriber = monitor.subscribe()
+    await monitor.stop()
+    monitor.subscribers.append(subscriber)
+
+    for _ in range(5):
+        await monitor.refresh()
+
+    kind, _, payload = subscriber.queue.get_nowait()
+    assert (kind, payload) == ("snapshot", {"n": 4})
+    assert subscriber.queue.qsize() <= 1
+
+
+@pytest.mark.asyncio
+async def test_get_serves_cache_and_coalesces_probes():
+    sample, calls = make_sampler([{"ok": True}])
+    monitor = HealthBroadcaster(sample, interval=60)
+
+    results = await asyncio.gather(*(monitor.get() for _ in range(10)))
+    await monitor.get()
+
+    assert calls["n"] == 1
+    assert all(r == {"ok": True} for r in results)
+    await monitor.get(max_age=0)
+    assert calls["n"] == 2
@@ -0,0 +1,111 @@
+"""
+Test Suite: Shared HTTP client pools
+Validates one pooled client per upstream with configured limits, rebuilding
+on a new event loop and after shutdown, and that drivers and clients reuse
+the pool (with their own per-call timeouts) instead of dialing per request.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.config import config
+from app.services.http_clients import HttpClientRegistry
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(HttpClientRegistry, "_clients", {})
+    monkeypatch.setattr(HttpClientRegistry, "_loop", None)
+
+
+def response(status_code, payload=None):
+    reply = MagicMock(status_code=status_code, text="")
+    reply.json.return_value = payload or {}
+    return reply
+
+
+@pytest.mark.asyncio
+async def test_one_pooled_client_per_upstream():
+    with patch("app.services.http_clients.config.HTTP_POOL_LIMITS", {"ollama": 3}), \
+         patch("app.services.http_clients.httpx.AsyncClient", side_effect=lambda **kw: MagicMock(is_closed=False, kw=kw)):
+        ollama = HttpClientRegistry.get("ollama")
+        assert HttpClientRegistry.get("ollama") is ollama
+        deepinfra = HttpClientRegistry.get("deepinfra")
+
+    assert deepinfra is not ollama
+    assert ollama.kw["limits"].max_connections == 3
+    assert ollama.kw["limits"].max_keepalive_connections == 3  # Never more idle than total
+    assert deepinfra.kw["limits"].max_connections == config.HTTP_POOL_MAX_CONNECTIONS  # No override configured
+
+
+def test_new_event_loop_gets_new_clients():
+    async def get():
+        return HttpClientRegistry.get("gatekeeper")
+
+    first = asyncio.run(get())
+    second = asyncio.run(get())
+
+    assert first is not second  # The first loop's connections died with it
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_and_get_rebuilds():
+    client = HttpClientRegistry.get("ollama")
+    await HttpClientRegistry.aclose()
+
+    assert client.is_closed
+    assert HttpClientRegistry.get("ollama") is not client
+
+
+@pytest.mark.asyncio
+async def test_deepinfra_retries_reuse_one_connection_pool():
+    from app.L2_network import DeepInfraDriver
+
+    client = MagicMock()
+    client.post = AsyncMock(side_effect=[
+        response(502),
+        response(200, {"choices": [{"message": {"content": "ok"}}], "usage": {}}),
+    ])
+    driver = DeepInfraDriver(api_key="key", base_url="https://api.deepinfra.com/v1/openai/chat/completions", model="m")
+
+    with patch("app.L2_network.HttpClientRegistry.get", return_value=client) as get, \
+         patch("asyncio.sleep", AsyncMock()), \
+         patch("app.database.db.log_usage", AsyncMock()):
+        assert await driver.generate("hi") == "ok"
+
+    get.assert_called_once_with("deepinfra")
+    assert client.post.await_count == 2
+    assert client.post.await_args.kwargs["timeout"] == 30.0
+
+
+@pytest.mark.asyncio
+async def test_gatekeeper_keeps_its_strict_timeout():
+    from app.services.supervisor.gatekeeper_client import GatekeeperClient
+
+    client = MagicMock()
+    client.post = AsyncMock(return_value=response(200, {"allowed": True, "ghost_id": "Tester"}))
+
+    with patch("app.services.supervisor.gatekeeper_client.HttpClientRegistry.get", return_value=client):
+        result = await GatekeeperClient().validate_request("token", "execute", "gemma2:27b")
+
+    assert result["allowed"]
+    assert client.post.await_args.kwargs["timeout"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_l1_health_and_model_checks_share_the_ollama_pool():
+    from app.L1_local import LocalLlamaDriver
+
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=[
+        response(200),
+        response(200, {"models": [{"name": "gemma2:27b"}]}),
+    ])
+    driver = LocalLlamaDriver(MagicMock(L1_URL="http://ollama:11434", L1_MODEL="gemma2:27b"))
+
+    with patch("app.L1_local.HttpClientRegistry.get", return_value=client) as get:
+        assert await driver.check_health()
+        assert await driver.ensure_model()
+
+    assert {call.args for call in get.call_args_list} == {("ollama",)}
+    assert [call.kwargs["timeout"] for call in client.get.await_args_list] == [2.0, 10.0]
@@ -5,6 +5,13 @@ import tempfile
 from unittest.mock import AsyncMock, MagicMock
 from app.ingestor import DocumentIngestor
 
+
+def make_storage():
+    storage = MagicMock()
+    storage.upload = AsyncMock(return_value=True)
+    return storage
+
+
 @pytest.mark.asyncio
 async def test_ingest_all_workflow():
     """
@@ -12,7 +19,7 @@ async def test_ingest_all_workflow():
     1. Scan directory
     2. Filter extensions (.md, .txt, .py)
     3. Chunk content
-    4. Call vector_store.ingest
+    4. Upload blobs and call vector_store.index_many
     """
     # 1. Setup temporary directory
     temp_dir = tempfile.mkdtemp()
@@ -31,8 +38,10 @@ async def test_ingest_all_workflow():
 
         # 2. Mock dependencies
         mock_vector_store = MagicMock()
-        mock_vector_store.ingest = AsyncMock(return_value=True)
-        mock_storage = MagicMock()
+        mock_vector_store.index_many = AsyncMock(
+            side_effect=lambda docs, **kwargs: {"chunks_ingested": len(docs), "chunks_failed": 0}
+        )
+        mock_storage = make_storage()
 
         # 3. Initialize Ingestor
         ingestor = DocumentIngestor(vector_store=mock_vector_store, storage=mock_storage)
@@ -42,13 +51,15 @@ async def test_ingest_all_workflow():
         await ingestor.ingest_all()
 
         # 5. Assertions
-        # Should have called ingest for .md, .py, .txt
+        # Should have batched chunks for .md, .py, .txt into one index_many call
+        # after uploading each chunk's blob
         # Total files: 3 (doc1.md, code.py, notes.txt)
-        assert mock_vector_store.ingest.call_count == 3
+        assert mock_vector_store.index_many.call_count == 1
+        documents = mock_vector_store.index_many.call_args.args[0]
+        assert len(documents) == 3
         
         # Verify metadata
-        calls = mock_vector_store.ingest.call_args_list
-        sources = [c.args[1]["source"] for c in calls]
+        sources = [metadata["source"] for _, metadata in documents]
         
         assert "doc1.md" in sources
         assert "code.py" in sources
@@ -61,7 +72,7 @@ async def test_ingest_all_workflow():
 @pytest.mark.asyncio
 async def test_chunking_logic():
     """
-    Verifies that files larger than 1000 characters are chunked correctly.
+    Verifies that text with no structure to split on is hard-cut at CHUNK_MAX_TOKENS.
     """
     temp_dir = tempfile.mkdtemp()
     try:
@@ -72,21 +83,325 @@ async def test_chunking_logic():
             f.write(large_content)
 
         mock_vector_store = MagicMock()
-        mock_vector_store.ingest = AsyncMock(return_value=True)
-        mock_storage = MagicMock()
+        mock_vector_store.index_many = AsyncMock(
+            side_effect=lambda docs, **kwargs: {"chunks_ingested": len(docs), "chunks_failed": 0}
+        )
+        mock_storage = make_storage()
 
         ingestor = DocumentIngestor(vector_store=mock_vector_store, storage=mock_storage)
         ingestor.docs_path = temp_dir
 
-        await ingestor.ingest_all()
+        summary = await ingestor.ingest_all()
 
-        # 2500 chars / 1000 per chunk = 3 chunks
-        assert mock_vector_store.ingest.call_count == 3
+        # 2500 chars / ~1024 per chunk (256 tokens at 4 chars/token) = 3 chunks
+        assert summary["chunks_ingested"] == 3
         
         # Verify chunk indices in metadata
-        calls = mock_vector_store.ingest.call_args_list
-        indices = [c.args[1]["chunk_index"] for c in calls]
+        documents = mock_vector_store.index_many.call_args.args[0]
+        indices = [metadata["chunk_index"] for _, metadata in documents]
         assert indices == [0, 1, 2]
 
     finally:
         shutil.rmtree(temp_dir)
+
+@pytest.mark.asyncio
+async def test_ingest_all_flushes_in_batches():
+    """
+    Verifies that chunks are flushed through index_many in batch_size groups
+    and that throughput is reported in the summary.
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for n in range(5):
+            with open(os.path.join(temp_dir, f"doc{n}.md"), "w") as f:
+                f.write("B" * 1500)  # 2 chunks each -> 10 chunks total
+
+        mock_vector_store = MagicMock()
+        mock_vector_store.index_many = AsyncMock(
+            side_effect=lambda docs, **kwargs: {"chunks_ingested": len(docs), "chunks_failed": 0}
+        )
+
+        ingestor = DocumentIngestor(vector_store=mock_vector_store, storage=make_storage())
+        ingestor.docs_path = temp_dir
+        ingestor.batch_size = 4
+
+        summary = await ingestor.ingest_all()
+
+        assert summary["chunks_ingested"] == 10
+        assert summary["files_processed"] == 5
+        assert "chunks_per_sec" in summary
+        assert mock_vector_store.index_many.call_count >= 3
+        for call in mock_vector_store.index_many.call_args_list:
+            assert call.kwargs["batch_size"] == 4
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+@pytest.mark.asyncio
+async def test_vector_store_ingest_many_batches_encode_and_upsert():
+    """
+    Verifies QdrantVectorStore.ingest_many encodes each batch in one call
+    and upserts one request per batch.
+    """
+    import numpy as np
+    from app.memory import QdrantVectorStore
+    from app.sparse import BM25SparseEncoder
+
+    store = QdrantVectorStore.__new__(QdrantVectorStore)
+    store.collection_name = "test_collection"
+    store.storage = MagicMock()
+    store.storage.upload = AsyncMock(return_value=True)
+    store._collection_ready = True
+    store.client = MagicMock()
+    store.client.upsert = AsyncMock()
+    store.embedder = MagicMock()
+    store.embedder.encode = MagicMock(side_effect=lambda texts, **kwargs: np.zeros((len(texts), 384)))
+    store.sparse_encoder = BM25SparseEncoder()
+    store.sparse_vector_name = "sparse"
+    store.hybrid_enabled = True
+
+    documents = [(f"chunk {i}", {"source": "doc.md", "chunk_index": i}) for i in range(5)]
+    summary = await store.ingest_many(documents, batch_size=2)
+
+    assert summary["chunks_ingested"] == 5
+    assert summary["chunks_failed"] == 0
+    assert summary["chunks_per_sec"] >= 0
+    assert store.embedder.encode.call_count == 3
+    assert store.client.upsert.call_count == 3
+    assert store.storage.upload.call_count == 5
+
+    # Payload carries the blob key, never the raw text
+    points = store.client.upsert.call_args_list[0].kwargs["points"]
+    assert all("blob_key" in p.payload for p in points)
+    # Each point carries both the dense embedding and BM25 sparse weights
+    assert set(points[0].vector) == {"", "sparse"}
+    assert points[0].vector["sparse"].indices
+
+@pytest.mark.asyncio
+async def test_incremental_ingest_skips_unchanged_and_cleans_stale():
+    """
+    Verifies manifest-driven re-ingestion:
+    1. Second run over an unchanged tree ingests nothing.
+    2. A changed file has its old points deleted and new ones ingested.
+    3. A removed file has its points deleted.
+    4. Point IDs are deterministic for identical content.
+    """
+    from app.manifest import IngestManifest
+
+    temp_dir = tempfile.mkdtemp()
+    manifest_dir = tempfile.mkdtemp()
+    try:
+        for name in ("keep.md", "change.md", "remove.md"):
+            with open(os.path.join(temp_dir, name), "w") as f:
+                f.write(f"original content of {name}")
+
+        mock_vector_store = MagicMock()
+        mock_vector_store.index_many = AsyncMock(
+            side_effect=lambda docs, **kwargs: {"chunks_ingested": len(docs), "chunks_failed": 0}
+        )
+        mock_vector_store.delete = AsyncMock(return_value=True)
+
+        manifest = IngestManifest(os.path.join(manifest_dir, "manifest.db"))
+        ingestor = DocumentIngestor(vector_store=mock_vector_store, storage=make_storage(), manifest=manifest)
+        ingestor.docs_path = temp_dir
+
+        # 1. Initial run indexes everything
+        first = await ingestor.ingest_all()
+        assert first["files_processed"] == 3
+        first_ids = dict(zip(
+            [m["source"] for _, m in mock_vector_store.index_many.call_args.args[0]],
+            mock_vector_store.index_many.call_args.kwargs["ids"]
+        ))
+
+        # 2. Unchanged tree: nothing re-embedded
+        mock_vector_store.index_many.reset_mock()
+        second = await ingestor.ingest_all()
+        assert second["files_processed"] == 0
+        assert second["files_skipped"] == 3
+        mock_vector_store.index_many.assert_not_called()
+        mock_vector_store.delete.assert_not_called()
+
+        # 3. Change one file, remove another
+        with open(os.path.join(temp_dir, "change.md"), "w") as f:
+            f.write("new content")
+        os.remove(os.path.join(temp_dir, "remove.md"))
+
+        third = await ingestor.ingest_all()
+        assert third["files_processed"] == 1
+        assert third["files_removed"] == 1
+        deleted = [c.args[0] for c in mock_vector_store.delete.call_args_list]
+        assert [first_ids["change.md"]] in deleted
+        assert [first_ids["remove.md"]] in deleted
+
+        new_ids = mock_vector_store.index_many.call_args.kwargs["ids"]
+        assert new_ids != [first_ids["change.md"]]
+        assert set(manifest.load(DocumentIngestor.MANIFEST_NAMESPACE)) == {
+            f"{os.path.basename(temp_dir)}/keep.md",
+            f"{os.path.basename(temp_dir)}/change.md"
+        }
+
+    finally:
+        shutil.rmtree(temp_dir)
+        shutil.rmtree(manifest_dir)
+
+def test_point_ids_are_deterministic():
+    from app.manifest import make_point_id, make_blob_key
+
+    a = make_point_id("docs/readme.md", 0, "abc")
+    assert a == make_point_id("docs/readme.md", 0, "abc")
+    assert a != make_point_id("docs/readme.md", 1, "abc")
+    assert a != make_point_id("docs/readme.md", 0, "abd")
+    assert a != make_point_id("docs/readme.md", 0, "abc", kind="librarian_ai_summary")
+    assert make_blob_key(a) == make_blob_key(a)
+
+@pytest.mark.asyncio
+async def test_ingest_text_replaces_previous_version():
+    """
+    Verifies DocumentIngestor.ingest_text (MCP learn tool):
+    1. Identical content is not re-embedded.
+    2. New content replaces the previously learned chunks.
+    """
+    from app.manifest import IngestManifest
+
+    manifest_dir = tempfile.mkdtemp()
+    try:
+        mock_vector_store = MagicMock()
+        mock_vector_store.ingest_many = AsyncMock(
+            side_effect=lambda docs, **kwargs: {"chunks_ingested": len(docs), "chunks_failed": 0}
+        )
+        mock_vector_store.delete = AsyncMock(return_value=True)
+        manifest = IngestManifest(os.path.join(manifest_dir, "manifest.db"))
+        ingestor = DocumentIngestor(vector_store=mock_vector_store, storage=MagicMock(), manifest=manifest)
+
+        meta = {"source": "app/main.py", "type": "code_repository"}
+        first = await ingestor.ingest_text("def main(): pass", meta)
+        assert first["status"] == "success"
+        docs = mock_vector_store.ingest_many.call_args.args[0]
+        assert docs[0][0] == "def main(): pass"
+        assert docs[0][1]["chunk_index"] == 0
+        assert docs[0][1]["section"] == "main"
+        first_ids = mock_vector_store.ingest_many.call_args.kwargs["ids"]
+
+        again = await ingestor.ingest_text("def main(): pass", meta)
+        assert again["status"] == "unchanged"
+        assert mock_vector_store.ingest_many.call_count == 1
+
+        await ingestor.ingest_text("def main(): return 1", meta)
+        mock_vector_store.delete.assert_awaited_once_with(first_ids)
+    finally:
+        shutil.rmtree(manifest_dir)
+
+@pytest.mark.asyncio
+async def test_staged_pipeline_applies_back_pressure_and_parallelism():
+    """
+    Verifies StagedPipeline:
+    1. A slow stage with N workers processes N items at once.
+    2. Bounded queues cap how far upstream stages run ahead.
+    3. on_close runs after the last item.
+    """
+    import asyncio
+    import time
+    from app.pipeline import Stage, StagedPipeline
+
+    in_flight = 0
+    peak = 0
+    produced = []
+    closed = []
+
+    async def slow(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return item
+
+    collected = []
+
+    async def sink(item):
+        collected.append(item)
+
+    async def close():
+        closed.append(len(collected))
+
+    def source():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    pipeline = StagedPipeline("test", [
+        Stage("slow", slow, workers=4, queue_size=2),
+        Stage("sink", sink, workers=1, queue_size=2, on_close=close),
+    ])
+    start = time.perf_counter()
+    stats = await pipeline.run(source())
+
+    assert sorted(collected) == list(range(20))
+    assert peak == 4
+    assert time.perf_counter() - start < 0.6  # Serial would be 1.0s
+    assert stats["slow"]["processed"] == 20
+    assert stats["slow"]["max_queue_depth"] <= 2
+    assert closed == [20]
+
+
+@pytest.mark.asyncio
+async def test_ingest_all_upload_failure_skips_indexing():
+    """
+    Verifies that a file whose blobs fail to upload is neither indexed nor recorded
+    in the manifest, so the next run retries it.
+    """
+    from app.manifest import IngestManifest
+
+    temp_dir = tempfile.mkdtemp()
+    manifest_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(temp_dir, "doc.md"), "w") as f:
+            f.write("content")
+
+        mock_vector_store = MagicMock()
+        mock_vector_store.index_many = AsyncMock(return_value={"chunks_ingested": 0, "chunks_failed": 0})
+        storage = make_storage()
+        storage.upload = AsyncMock(return_value=False)
+        manifest = IngestManifest(os.path.join(manifest_dir, "manifest.db"))
+
+        ingestor = DocumentIngestor(vector_store=mock_vector_store, storage=storage, manifest=manifest)
+        ingestor.docs_path = temp_dir
+        summary = await ingestor.ingest_all()
+
+        assert summary["chunks_failed"] == 1
+        assert summary["errors"]
+        mock_vector_store.index_many.assert_not_called()
+        assert manifest.load(DocumentIngestor.MANIFEST_NAMESPACE) == {}
+        assert summary["stages"]["upload"]["dropped"] == 1
+    finally:
+        shutil.rmtree(temp_dir)
+        shutil.rmtree(manifest_dir)
+
+
+@pytest.mark.asyncio
+async def test_vector_store_index_many_embeds_without_uploading():
+    import numpy as np
+    from app.memory import QdrantVectorStore
+    from app.sparse import BM25SparseEncoder
+
+    store = QdrantVectorStore.__new__(QdrantVectorStore)
+    store.collection_name = "test_collection"
+    store.storage = MagicMock()
+    store.storage.upload = AsyncMock(return_value=True)
+    store._collection_ready = True
+    store.client = MagicMock()
+    store.client.upsert = AsyncMock()
+    store.embedder = MagicMock()
+    store.embedder.encode = MagicMock(side_effect=lambda texts, **kwargs: np.zeros((len(texts), 384)))
+    store.sparse_encoder = BM25SparseEncoder()
+    store.sparse_vector_name = "sparse"
+    store.hybrid_enabled = True
+
+    documents = [(f"chunk {i}", {"chunk_index": i}) for i in range(3)]
+    summary = await store.index_many(documents, ids=["a", "b", "c"], blob_keys=["ka", "kb", "kc"], batch_size=2)
+
+    assert summary["chunks_ingested"] == 3
+    store.storage.upload.assert_not_called()
+    assert store.client.upsert.call_count == 2
+    points = store.client.upsert.call_args_list[0].kwargs["points"]
+    assert [p.payload["blob_key"] for p in points] == ["ka", "kb"]
@@ -84,3 +84,37 @@ async def test_librarian_empty_inbox(mock_container):
     # Assert
     assert result["files_processed"] == 0
     assert result["status"] == "success"
+
+@pytest.mark.asyncio
+async def test_librarian_process_docs_pipeline(mock_container, tmp_path):
+    from app.manifest import IngestManifest
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(3):
+        (docs / f"doc{i}.md").write_text(f"Document number {i}.")
+    (docs / "empty.md").write_text("   ")
+
+    mock_container.manifest = IngestManifest(str(tmp_path / "manifest.db"))
+    mock_container.memory.embed_many = AsyncMock(side_effect=lambda texts: [[0.1] * 384 for _ in texts])
+    mock_container.memory.build_vector = AsyncMock(side_effect=lambda vector, text: vector)
+    mock_container.memory.upsert_points = AsyncMock()
+    mock_container.memory.delete = AsyncMock(return_value=True)
+
+    agent = LibrarianAgent(container=mock_container)
+    agent.scan_dirs = str(docs)
+    result = await agent.process_docs()
+
+    assert result["files_processed"] == 3
+    assert result["chunks_ingested"] == 3
+    assert mock_container.storage.upload.call_count == 3
+    assert mock_container.l1_driver.generate.call_count == 3
+    # Summaries from all files are embedded and upserted as one batch
+    mock_container.memory.embed_many.assert_awaited_once()
+    mock_container.memory.upsert_points.assert_awaited_once()
+    assert result["stages"]["read"]["dropped"] == 1
+
+    # Unchanged tree: nothing re-summarized
+    again = await agent.process_docs()
+    assert again["files_skipped"] == 3  # Empty files never enter the manifest
+    assert mock_container.l1_driver.generate.call_count == 3
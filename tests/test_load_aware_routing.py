@@ -0,0 +1,154 @@
+"""
+Test Suite: Load-aware routing
+Validates the cached load signals (queue depth, in-flight counts, hot model, VRAM),
+the L1 wait estimate, deadline spill to L2 in the supervisor and dispatcher, and
+the ShadowAuditLoop record of each decision.
+"""
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.audit.shadow_audit import RoutingDecision, ShadowAuditLoop, TelemetrySnapshot
+from app.services.dispatcher.router import DispatcherRouter, TargetModel, TelemetryState, UserQuery
+from app.services.registry.shell_registry import LiveStats, ShellRegistry
+from app.services.scheduler.load import LoadMonitor, LoadSnapshot
+from app.services.scheduler.lock import ModelLock
+from app.services.scheduler.queue import RequestQueue
+
+
+@pytest.fixture(autouse=True)
+def live_stats(monkeypatch):
+    """p95 latencies: gemma 2 s, llama3:70b 8 s, the L2 DeepInfra shell 3 s."""
+    now = time.time()
+    monkeypatch.setattr(ShellRegistry, "_measured", {})
+    monkeypatch.setattr(ShellRegistry, "_live", {
+        name: LiveStats(model=name, source="telemetry", latency_ms=p95 / 2, latency_p95_ms=p95, updated_at=now)
+        for name, p95 in {
+            "gemma2:27b": 2000.0, "llama3:70b": 8000.0, "meta-llama/Meta-Llama-3-70B-Instruct": 3000.0
+        }.items()
+    })
+
+
+def monitor():
+    return LoadMonitor(RequestQueue(), ModelLock(), ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reads_live_counters_and_caches_gpu_probe():
+    load = monitor()
+    await load.model_lock.set_model("gemma2:27b")
+    await load.queue.enqueue({"model": "gemma2:27b"})
+
+    with patch("app.services.scheduler.load.subprocess.check_output", return_value="8192, 24576\n") as smi:
+        with load.track("L1"):
+            first = await load.snapshot()
+        second = await load.snapshot()
+
+    assert smi.call_count == 1
+    assert (first.queue_depth, first.in_flight, first.hot_model) == (1, {"L1": 1}, "gemma2:27b")
+    assert first.l1_backlog == 2 and second.l1_backlog == 1
+    assert first.vram_free_gb == 16.0
+    assert first.vram_usage_percent == 33.3
+
+
+@pytest.mark.asyncio
+async def test_missing_gpu_means_no_vram_signal():
+    load = monitor()
+    with patch("app.services.scheduler.load.subprocess.check_output", side_effect=FileNotFoundError("nvidia-smi")):
+        snapshot = await load.snapshot()
+
+    assert snapshot.vram_free_gb is None
+    assert load.needs_load("llama3:70b", snapshot) is False
+
+
+def test_l1_wait_estimate():
+    load = monitor()
+    idle = LoadSnapshot()
+    busy = LoadSnapshot(queue_depth=2, in_flight={"L1": 1}, hot_model="gemma2:27b")
+    full_gpu = LoadSnapshot(vram_used_mb=20 * 1024, vram_total_mb=24 * 1024)
+
+    with patch("app.services.scheduler.load.config.MODEL_LOAD_ESTIMATE_MS", 10000.0):
+        assert load.estimate_l1_wait_ms("gemma2:27b", idle) == 2000.0
+        assert load.estimate_l1_wait_ms("gemma2:27b", busy) == 3 * 2000.0 + 2000.0
+        # Backlog runs on the hot model, then a swap, then our own request
+        assert load.estimate_l1_wait_ms("llama3:70b", busy) == 3 * 2000.0 + 10000.0 + 8000.0
+        # Nothing hot, but 4 GB free is not enough for a 16 GB model
+        assert load.estimate_l1_wait_ms("gemma2:27b", full_gpu) == 10000.0 + 2000.0
+
+
+def test_dispatcher_spills_when_wait_exceeds_deadline():
+    router = DispatcherRouter()
+    busy = TelemetryState(vram_usage_percent=80, system_load_percent=20, avg_latency=2.0,
+                          queue_depth=4, estimated_wait_ms=10000.0)
+
+    assert router.route(UserQuery(text="hi", deadline_ms=5000), busy) == TargetModel.L2
+    assert router.route(UserQuery(text="hi", deadline_ms=20000), busy) == TargetModel.L1
+    assert router.route(UserQuery(text="hi"), busy) == TargetModel.L1
+
+
+@pytest.mark.asyncio
+async def test_audit_records_load_and_stays_bounded():
+    audit = ShadowAuditLoop(max_entries=2)
+    ids = []
+    for backlog in range(3):
+        ids.append(await audit.log_routing_decision(
+            complexity=3,
+            telemetry=TelemetrySnapshot(vram_usage_percent=50.0, system_load_percent=10.0, avg_latency_ms=3000.0,
+                                        queue_depth=backlog, hot_model="gemma2:27b", deadline_ms=5000.0),
+            routing=RoutingDecision(tier="L2", model="meta-llama/Meta-Llama-3-70B-Instruct",
+                                    reasoning="L1 wait > deadline", complexity_estimated=3)
+        ))
+
+    assert await audit.get_entry(ids[0]) is None
+    entry = (await audit.get_entry(ids[2])).to_dict()
+    assert entry["telemetry_snapshot"]["queue_depth"] == 2
+    assert entry["telemetry_snapshot"]["deadline_ms"] == 5000.0
+
+
+class TestSupervisorRouting:
+    @pytest.fixture
+    def engine(self):
+        pytest.importorskip("google.generativeai")  # Supervisor router imports every wrapper
+        from app.services.supervisor.router import SupervisorEngine
+        return SupervisorEngine()
+
+    @staticmethod
+    def request(**kwargs):
+        from app.services.supervisor.router import ChatCompletionRequest
+        return ChatCompletionRequest(model="gemma2:27b", messages=[{"role": "user", "content": "hi"}], **kwargs)
+
+    def test_stays_local_without_deadline_pressure(self, engine):
+        plan = engine.plan_routing(self.request(deadline_ms=10000), "gemma2:27b", LoadSnapshot(queue_depth=1))
+
+        assert (plan.tier.value, plan.shell, plan.expected_latency_ms) == ("L1", "gemma2:27b", 4000.0)
+
+    def test_spills_to_fastest_l2_past_deadline(self, engine):
+        load = LoadSnapshot(queue_depth=3, in_flight={"L1": 1}, hot_model="gemma2:27b")
+
+        plan = engine.plan_routing(self.request(deadline_ms=5000), "gemma2:27b", load)
+
+        assert (plan.tier.value, plan.shell) == ("L2", "meta-llama/Meta-Llama-3-70B-Instruct")
+        assert plan.spilled_from == "gemma2:27b"
+        assert "deadline" in plan.reasoning
+
+    def test_static_rules_still_win(self, engine):
+        load = LoadSnapshot(queue_depth=50)
+
+        assert engine.determine_routing(self.request(complexity=9), load=load).value == "L3"
+        assert engine.determine_routing(self.request(force_tier="L1", deadline_ms=1), load=load).value == "L1"
+        assert engine.determine_routing(self.request(deadline_ms=1)).value == "L1"  # No load snapshot
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kwargs", [{"complexity": 9}, {"force_tier": "L3"}, {"force_tier": "L2"}])
+    async def test_ollama_shell_never_leaves_the_l1_lane(self, engine, kwargs):
+        engine.load.snapshot = AsyncMock(return_value=LoadSnapshot())
+        engine.get_wrapper = MagicMock()
+        engine.pool.submit = AsyncMock(return_value={"output": "ok"})
+
+        with patch("app.services.supervisor.router.gatekeeper_client.validate_request",
+                   AsyncMock(return_value={"allowed": True, "ghost_id": "Tester"})):
+            await engine.process_chat(self.request(**kwargs), "Bearer token")
+
+        tier = engine.get_wrapper.call_args.args[2]
+        assert tier.value != "L1"  # Routed to a remote tier...
+        assert engine.pool.submit.call_args.args[0] == "L1"  # ...but gemma2:27b still runs in the serialized lane
@@ -0,0 +1,95 @@
+"""
+Test Suite: Shared /metrics instrumentation
+Validates Prometheus text exposition, per-route request metrics, queue and
+DB pool gauges and per-tier LLM latency.
+"""
+from unittest.mock import MagicMock
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.services import metrics
+from app.services.metrics import MetricsRegistry, instrument_app, observe_llm
+
+
+def sample(text: str, prefix: str) -> float:
+    """Value of the first exposition line starting with prefix."""
+    line = next(line for line in text.splitlines() if line.startswith(prefix))
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", ("tier",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, tier="L1")
+
+    text = registry.render()
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{tier="L1",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{tier="L1",le="1.0"} 3' in text
+    assert 'demo_seconds_bucket{tier="L1",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{tier="L1"} 4' in text
+    assert sample(text, 'demo_seconds_sum{tier="L1"}') == 3.65
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("demo_total", "Demo.", ("path",)).inc(path='a"b\\c')
+
+    assert 'demo_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_requests_are_counted_by_route_template():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    queue = MagicMock()
+    queue.qsize.return_value = 7
+    pool = MagicMock()
+    pool.get_size.return_value = 4
+    pool.get_idle_size.return_value = 1
+    pool.get_max_size.return_value = 10
+    instrument_app(app, "demo", queues={"work": queue.qsize}, pool=lambda: pool)
+    client = TestClient(app)
+
+    for item_id in (1, 2, 0):
+        client.get(f"/items/{item_id}")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    ok = 'gravitas_http_requests_total{service="demo",method="GET",route="/items/{item_id}",status="200"}'
+    missing = 'gravitas_http_requests_total{service="demo",method="GET",route="/items/{item_id}",status="404"}'
+    assert sample(text, ok) == 2
+    assert sample(text, missing) == 1
+    assert sample(text, 'gravitas_http_request_duration_seconds_count{service="demo",method="GET",route="/items/{item_id}"}') == 3
+    assert sample(text, 'gravitas_queue_depth{service="demo",queue="work"}') == 7
+    assert sample(text, 'gravitas_db_pool_connections{service="demo",state="in_use"}') == 3
+    assert sample(text, 'gravitas_db_pool_connections{service="demo",state="max"}') == 10
+    # Scrapes themselves are not counted
+    assert 'route="/metrics"' not in text
+
+
+def test_disconnected_pool_is_omitted():
+    app = FastAPI()
+    instrument_app(app, "nopool", pool=lambda: None)
+
+    text = TestClient(app).get("/metrics").text
+
+    assert 'service="nopool",state=' not in text
+
+
+def test_llm_latency_by_tier():
+    observe_llm("L2", "llama3:70b", 1.7)
+    observe_llm("L2", "llama3:70b", 0.3, outcome="error")
+
+    text = metrics.REGISTRY.render()
+
+    assert 'gravitas_llm_request_duration_seconds_bucket{tier="L2",model="llama3:70b",outcome="ok",le="2.5"} ' in text
+    assert sample(text, 'gravitas_llm_request_duration_seconds_count{tier="L2",model="llama3:70b",outcome="error"}') >= 1
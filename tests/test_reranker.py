@@ -0,0 +1,92 @@
+"""
+Test Suite: Cross-encoder re-rank stage
+Uses a stub model so it runs without downloading the cross-encoder.
+"""
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.interfaces import SearchResult
+from app.chunker import estimate_tokens
+from app.reranker import CrossEncoderReranker
+from app.agents.scout import ScoutAgent
+
+
+def make_reranker(scores, delay=0.0, budget=1.0):
+    reranker = CrossEncoderReranker.__new__(CrossEncoderReranker)
+    reranker.model_name = "stub"
+    reranker.batch_size = 16
+    reranker.budget_seconds = budget
+    reranker.calls = 0
+    reranker.fallbacks = 0
+    reranker.total_seconds = 0.0
+
+    def predict(pairs, **kwargs):
+        time.sleep(delay)
+        return scores[:len(pairs)]
+
+    reranker.model = MagicMock()
+    reranker.model.predict = MagicMock(side_effect=predict)
+    return reranker
+
+
+def hits(n):
+    return [SearchResult(content=f"chunk {i} " + "x" * 40, score=1.0 - i / 100, payload={"i": i}) for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_rerank_orders_by_cross_encoder_score():
+    reranker = make_reranker([0.1, 0.9, 0.5, 0.7])
+
+    kept = await reranker.rerank("query", hits(4), top_k=2)
+
+    assert [r.payload["i"] for r in kept] == [1, 3]
+    assert kept[0].score == 0.9
+    assert kept[0].payload["dense_score"] == 0.99
+    _, kwargs = reranker.model.predict.call_args
+    assert kwargs["batch_size"] == 16
+
+
+@pytest.mark.asyncio
+async def test_rerank_falls_back_to_dense_order_when_over_budget():
+    reranker = make_reranker([0.1, 0.9, 0.5], delay=0.5, budget=0.05)
+
+    start = time.perf_counter()
+    kept = await reranker.rerank("query", hits(3), top_k=2)
+
+    assert time.perf_counter() - start < 0.4
+    assert [r.payload["i"] for r in kept] == [0, 1]
+    assert reranker.stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scout_overfetches_and_sends_only_top_k():
+    memory = MagicMock()
+    memory.search_with_scores = AsyncMock(return_value=hits(30))
+    reranker = make_reranker([i / 100 for i in range(30)])
+    l3 = MagicMock()
+    l3.generate = AsyncMock(return_value="report")
+
+    scout = ScoutAgent(l3_driver=l3, memory=memory, reranker=reranker)
+    await scout.research("query")
+
+    memory.search_with_scores.assert_awaited_once_with("query", top_k=30)
+    prompt = l3.generate.call_args.args[0]
+    assert "chunk 29 " in prompt
+    assert "chunk 0 " not in prompt
+    assert prompt.count("--- SOURCE") == ScoutAgent.TOP_K
+
+
+@pytest.mark.asyncio
+async def test_scout_without_reranker_uses_plain_search():
+    memory = MagicMock()
+    memory.search = AsyncMock(return_value=["a", "b"])
+    l3 = MagicMock()
+    l3.generate = AsyncMock(return_value="report")
+
+    await ScoutAgent(l3_driver=l3, memory=memory).research("query")
+
+    memory.search.assert_awaited_once_with("query", top_k=10)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("x" * 400) == 100
@@ -0,0 +1,93 @@
+"""
+Test Suite: Live-calibrated ShellRegistry
+Validates the telemetry pull (EWMA of window means plus tail percentiles), the
+fallback chain telemetry -> local measurements -> models.yaml, and latency estimates.
+"""
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.registry.shell_registry import LiveStats, ShellRegistry
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(monkeypatch):
+    monkeypatch.setattr(ShellRegistry, "_live", {})
+    monkeypatch.setattr(ShellRegistry, "_measured", {})
+
+
+def percentiles(means, tail=None, count=10):
+    """Fake telemetry responses: {event_type: mean} for component gemma2:27b."""
+    async def get_percentiles(event_type, hours=1.0, quantiles="0.5,0.95"):
+        if event_type not in means:
+            return {"components": []}
+        label = "p5" if event_type == "LLM_DECODE_TPS" else "p95"
+        return {"components": [{
+            "component": "gemma2:27b", "event_type": event_type, "count": count,
+            "mean": means[event_type], "percentiles": {label: (tail or {}).get(event_type)}
+        }]}
+    return get_percentiles
+
+
+@pytest.mark.asyncio
+async def test_refresh_folds_windows_into_ewma():
+    with patch("app.services.registry.shell_registry.telemetry") as telemetry, \
+         patch("app.services.registry.shell_registry.settings.SHELL_STATS_EWMA_ALPHA", 0.5):
+        telemetry.get_percentiles = AsyncMock(side_effect=percentiles(
+            {"LLM_LATENCY": 2000.0, "LLM_TTFT": 200.0, "LLM_DECODE_TPS": 40.0},
+            tail={"LLM_LATENCY": 3500.0, "LLM_TTFT": 450.0, "LLM_DECODE_TPS": 25.0}
+        ))
+        assert await ShellRegistry.refresh_live_stats() == 1
+
+        telemetry.get_percentiles = AsyncMock(side_effect=percentiles({"LLM_LATENCY": 1000.0, "LLM_TTFT": 100.0}))
+        await ShellRegistry.refresh_live_stats()
+
+    stats = ShellRegistry.get_live_stats("gemma2:27b")
+    assert stats.source == "telemetry"
+    assert stats.latency_ms == 1500.0
+    assert stats.ttft_ms == 150.0
+    assert stats.tokens_per_second == 40.0  # Not in the second window: kept
+    assert stats.tokens_per_second_p5 == 25.0
+    assert stats.samples == 10
+
+
+@pytest.mark.asyncio
+async def test_unreachable_telemetry_changes_nothing():
+    with patch("app.services.registry.shell_registry.telemetry") as telemetry:
+        telemetry.get_percentiles = AsyncMock(return_value={})
+        assert await ShellRegistry.refresh_live_stats() == 0
+
+    assert ShellRegistry.get_live_stats("gemma2:27b").source == "yaml"
+
+
+def test_fallback_chain():
+    spec = ShellRegistry.get_model("gemma2:27b")
+    yaml_stats = ShellRegistry.get_live_stats("gemma2:27b")
+    assert (yaml_stats.source, yaml_stats.latency_ms) == ("yaml", float(spec.avg_latency_ms))
+    assert ShellRegistry.get_live_stats("no-such-shell") is None
+
+    ShellRegistry.record_generation("gemma2:27b", {"total_ms": 900.0, "ttft_ms": 120.0, "tokens_per_second": 35.0})
+    local = ShellRegistry.get_live_stats("gemma2:27b")
+    assert (local.source, local.latency_ms, local.ttft_ms) == ("local", 900.0, 120.0)
+
+
+def test_stale_telemetry_falls_back():
+    ShellRegistry._live["gemma2:27b"] = LiveStats(
+        model="gemma2:27b", source="telemetry", latency_ms=5000.0, updated_at=time.time() - 10_000
+    )
+
+    assert ShellRegistry.get_live_stats("gemma2:27b").source == "yaml"
+
+
+def test_estimate_latency():
+    ShellRegistry._live["gemma2:27b"] = LiveStats(
+        model="gemma2:27b", source="telemetry", latency_ms=2000.0, latency_p95_ms=4000.0,
+        ttft_ms=200.0, ttft_p95_ms=500.0, tokens_per_second=50.0, tokens_per_second_p5=20.0,
+        updated_at=time.time()
+    )
+
+    assert ShellRegistry.estimate_latency_ms("gemma2:27b") == 2000.0
+    assert ShellRegistry.estimate_latency_ms("gemma2:27b", tail=True) == 4000.0
+    assert ShellRegistry.estimate_latency_ms("gemma2:27b", output_tokens=100) == 2200.0
+    assert ShellRegistry.estimate_latency_ms("gemma2:27b", output_tokens=100, tail=True) == 5500.0
+    assert ShellRegistry.estimate_latency_ms("no-such-shell") is None
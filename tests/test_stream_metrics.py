@@ -0,0 +1,128 @@
+"""
+Test Suite: Streaming generation metrics
+Validates queue wait / connect / TTFT / inter-token / tokens-per-second capture in
+the wrappers, the LLM_* telemetry events and the per-shell rolling stats.
+"""
+import pytest
+from pathlib import Path
+from typing import Dict, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.lib.stream_metrics import StreamMetrics
+from app.services.registry.shell_registry import ShellRegistry, ShellStats
+from app.telemetry import TelemetryLogger
+
+
+def test_phase_timings():
+    stream = StreamMetrics(
+        queued_at=10.0, started_at=10.5, connected_at=10.7,
+        first_token_at=11.0, last_token_at=13.0, finished_at=13.1,
+        tokens=101, chunks=101, max_gap_s=0.25
+    )
+
+    figures = stream.to_dict()
+
+    assert figures["queue_wait_ms"] == 500.0
+    assert figures["connect_ms"] == pytest.approx(200.0)
+    assert figures["ttft_ms"] == 500.0
+    assert figures["inter_token_ms"] == 20.0  # 2 s over the 100 tokens after the first
+    assert figures["tokens_per_second"] == 50.0
+    assert figures["max_gap_ms"] == 250.0
+    assert figures["total_ms"] == pytest.approx(2600.0)
+
+
+def test_provider_decode_time_wins():
+    stream = StreamMetrics(started_at=0.0, first_token_at=1.0, last_token_at=9.0, tokens=200, provider_decode_s=4.0)
+
+    assert stream.tokens_per_second == 50.0
+    assert stream.inter_token_ms == 20.0
+
+
+def test_unfinished_stream_reports_none():
+    stream = StreamMetrics()
+    stream.start()
+    stream.finish()
+
+    figures = stream.to_dict()
+
+    assert figures["ttft_ms"] is None
+    assert figures["tokens_per_second"] is None
+    assert figures["queue_wait_ms"] is None
+    assert figures["total_ms"] is not None
+
+
+def test_mark_token_tracks_first_and_gaps():
+    stream = StreamMetrics()
+    stream.start()
+
+    assert stream.mark_token() is True
+    assert stream.mark_token() is False
+    assert stream.chunks == 2
+    assert stream.connected_at == stream.first_token_at  # No explicit connect mark
+
+
+def test_shell_stats_ewma():
+    stats = ShellStats()
+    stats.observe({"ttft_ms": 100.0, "tokens_per_second": None, "total_ms": 1000.0}, alpha=0.5)
+    stats.observe({"ttft_ms": 300.0, "tokens_per_second": 40.0, "total_ms": 2000.0}, alpha=0.5)
+
+    assert stats.samples == 2
+    assert stats.ttft_ms == 200.0
+    assert stats.tokens_per_second == 40.0
+    assert stats.latency_ms == 1500.0
+
+
+@pytest.mark.asyncio
+async def test_log_stream_metrics_emits_one_event_per_figure():
+    logger = TelemetryLogger()
+    logger.enabled = True
+    logger.log = AsyncMock(return_value=True)
+
+    await logger.log_stream_metrics(
+        "gemma2:27b", "L1",
+        {"ttft_ms": 180.0, "tokens_per_second": 42.0, "connect_ms": None, "total_ms": 2000.0, "tokens": 80},
+        session_id="s1"
+    )
+
+    events = {(call.args[0] if call.args else call.kwargs["event_type"]): call.kwargs for call in logger.log.call_args_list}
+    assert set(events) == {"THOUGHT_LATENCY", "LLM_TTFT", "LLM_DECODE_TPS", "LLM_LATENCY"}
+    assert events["LLM_TTFT"]["value"] == 180.0
+    assert events["LLM_TTFT"]["component"] == "gemma2:27b"
+    assert events["LLM_DECODE_TPS"]["metadata"] == {"tier": "L1", "session_id": "s1"}
+    assert events["THOUGHT_LATENCY"]["value"] == 25.0  # 2000 ms / 80 tokens
+
+
+@pytest.mark.asyncio
+async def test_wrapper_reports_generation():
+    from app.wrappers.base_wrapper import GravitasAgentWrapper
+
+    class FakeStreamingWrapper(GravitasAgentWrapper):
+        async def _execute_internal(self, task: Dict) -> Dict:
+            self.mark_connected()
+            for _ in range(5):
+                self.mark_token()
+            self.set_token_counts(5, prompt=12)
+            return {"output": "hello"}
+
+        def _parse_thought(self, chunk: Dict) -> Optional[str]:
+            return None
+
+        def _parse_action(self, chunk: Dict) -> Optional[str]:
+            return None
+
+    with patch("app.wrappers.base_wrapper.ReasoningPipe"), patch("app.wrappers.base_wrapper.SupervisorGuardian"):
+        wrapper = FakeStreamingWrapper(ghost_name="Meter", session_id="s2", model="test-shell:7b", tier="L1")
+    wrapper.supervisor = MagicMock()
+    wrapper.supervisor.notify_session_start = AsyncMock(return_value=MagicMock(allowed=True))
+    wrapper.supervisor.notify_session_end = AsyncMock()
+    wrapper.pipe.finalize.return_value = Path("journal.md")
+
+    with patch("app.wrappers.base_wrapper.telemetry") as telemetry:
+        telemetry.log_stream_metrics = AsyncMock(return_value=True)
+        await wrapper.execute_task({"prompt": "hi", "queued_at": 0.0})
+
+    model, tier, figures = telemetry.log_stream_metrics.call_args.args
+    assert (model, tier) == ("test-shell:7b", "L1")
+    assert figures["tokens"] == 5 and figures["prompt_tokens"] == 12 and figures["chunks"] == 5
+    assert figures["ttft_ms"] is not None and figures["queue_wait_ms"] > 0
+    assert ShellRegistry.get_measured_stats("test-shell:7b").samples >= 1
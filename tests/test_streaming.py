@@ -0,0 +1,153 @@
+"""
+Test Suite: Token streaming
+Validates that wrappers yield output deltas as they are generated while the
+ReasoningPipe still records the full transcript, that the worker pool can hand
+back a queued job for streaming, and the supervisor's SSE chunk format.
+"""
+import json
+import asyncio
+import pytest
+from pathlib import Path
+from typing import Dict, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.scheduler.pool import QueueFullError, WorkerPool
+
+
+def make_wrapper(tokens, fail_after: Optional[int] = None, gate: Optional[asyncio.Event] = None):
+    from app.wrappers.base_wrapper import GravitasAgentWrapper
+
+    class TokenWrapper(GravitasAgentWrapper):
+        async def _execute_internal(self, task: Dict) -> Dict:
+            output = []
+            for n, token in enumerate(tokens):
+                if fail_after is not None and n == fail_after:
+                    raise RuntimeError("upstream dropped")
+                if gate is not None:
+                    await gate.wait()
+                output.append(token)
+                self.pipe.buffer.append(token)
+                self.emit(token)
+                await asyncio.sleep(0)
+            return {"output": "".join(output)}
+
+        def _parse_thought(self, chunk: Dict) -> Optional[str]:
+            return None
+
+        def _parse_action(self, chunk: Dict) -> Optional[str]:
+            return None
+
+    with patch("app.wrappers.base_wrapper.ReasoningPipe"), patch("app.wrappers.base_wrapper.SupervisorGuardian"):
+        wrapper = TokenWrapper(ghost_name="Streamer", session_id="s1", model="gemma2:27b", tier="L1")
+    wrapper.pipe.buffer = []
+    wrapper.pipe.finalize.return_value = Path("journal.md")
+    wrapper.supervisor = MagicMock()
+    wrapper.supervisor.notify_session_start = AsyncMock(return_value=MagicMock(allowed=True))
+    wrapper.supervisor.notify_session_end = AsyncMock()
+    return wrapper
+
+
+@pytest.mark.asyncio
+async def test_stream_task_yields_deltas_and_keeps_the_transcript():
+    wrapper = make_wrapper(["Hel", "lo", " world"])
+
+    deltas = [delta async for delta in wrapper.stream_task({"prompt": "hi"})]
+
+    assert deltas == ["Hel", "lo", " world"]
+    assert wrapper.result["output"] == "Hello world"
+    assert wrapper.pipe.buffer == ["Hel", "lo", " world"]
+    wrapper.supervisor.notify_session_end.assert_awaited_once_with(session_id="s1", output_file=Path("journal.md"))
+
+
+@pytest.mark.asyncio
+async def test_deltas_arrive_before_generation_finishes():
+    gate = asyncio.Event()
+    wrapper = make_wrapper(["first", "second"], gate=gate)
+    gate.set()
+    stream = wrapper.stream_task({"prompt": "hi"})
+
+    assert await stream.__anext__() == "first"
+    assert wrapper.result is None  # Still generating
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_errors_propagate_after_partial_output():
+    wrapper = make_wrapper(["a", "b", "c"], fail_after=2)
+    received = []
+
+    with pytest.raises(RuntimeError, match="upstream dropped"):
+        async for delta in wrapper.stream_task({"prompt": "hi"}):
+            received.append(delta)
+
+    assert received == ["a", "b"]
+    wrapper.supervisor.notify_session_end.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_cancels_generation():
+    gate = asyncio.Event()
+    wrapper = make_wrapper(["a", "b"], gate=gate)
+    wrapper.pipe.buffer = ["partial thought"]
+    stream = wrapper.stream_task({"prompt": "hi"})
+    pending = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0.01)
+
+    pending.cancel()
+    await asyncio.gather(pending, return_exceptions=True)
+    await stream.aclose()
+
+    wrapper.supervisor.notify_session_end.assert_awaited_once()  # Session closed despite the abort
+    assert wrapper._deltas is None
+
+
+@pytest.mark.asyncio
+async def test_pool_enqueue_then_wait():
+    pool = WorkerPool({"L1": 1}, max_depth=1)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "done"
+
+    running = await pool.enqueue("L1", slow)
+    await asyncio.sleep(0)
+    queued = await pool.enqueue("L1", slow)
+    with pytest.raises(QueueFullError):
+        await pool.enqueue("L1", slow)  # Refused before any response is started
+
+    release.set()
+    assert await pool.wait(running) == "done"
+    assert await pool.wait(queued) == "done"
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_supervisor_streams_openai_chunks(monkeypatch):
+    pytest.importorskip("google.generativeai")  # Supervisor router imports every wrapper
+    from fastapi.responses import StreamingResponse
+    from app.services.scheduler.load import LoadSnapshot
+    from app.services.supervisor.router import ChatCompletionRequest, SupervisorEngine
+
+    engine = SupervisorEngine()
+    engine.load.snapshot = AsyncMock(return_value=LoadSnapshot())
+    wrapper = make_wrapper(["Hi", " there"])
+    engine.get_wrapper = MagicMock(return_value=wrapper)
+    request = ChatCompletionRequest(model="gemma2:27b", messages=[{"role": "user", "content": "hi"}], stream=True)
+
+    with patch("app.services.supervisor.router.gatekeeper_client.validate_request",
+               AsyncMock(return_value={"allowed": True, "ghost_id": "Tester"})):
+        response = await engine.process_chat(request, "Bearer token")
+
+    assert isinstance(response, StreamingResponse)
+    events = [event async for event in response.body_iterator]
+    await engine.pool.stop()
+
+    assert events[-1] == "data: [DONE]\n\n"
+    chunks = [json.loads(event[len("data: "):]) for event in events[:-1]]
+    assert all(c["object"] == "chat.completion.chunk" for c in chunks)
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant"}
+    assert [c["choices"][0]["delta"].get("content") for c in chunks[1:-1]] == ["Hi", " there"]
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+    entry = (await engine.audit.get_recent_entries(1))[0]
+    assert entry.actual_performance.success
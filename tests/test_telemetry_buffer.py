@@ -0,0 +1,128 @@
+"""
+Test Suite: Buffered TelemetryLogger
+Validates non-blocking log(), size/interval flushes to /v1/telemetry/log_batch,
+drop-oldest overflow and flush-on-shutdown.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.telemetry import TelemetryLogger
+
+
+def make_logger(monkeypatch, status_code=200, **env):
+    for key, value in {"TELEMETRY_ENABLED": "true", **env}.items():
+        monkeypatch.setenv(key, value)
+    telemetry = TelemetryLogger()
+    client = MagicMock()
+    client.post = AsyncMock(return_value=MagicMock(status_code=status_code))
+    client.aclose = AsyncMock()
+    telemetry._get_client = lambda: client
+    return telemetry, client
+
+
+def sent_events(client):
+    return [e for call in client.post.call_args_list for e in call.kwargs["json"]["events"]]
+
+
+@pytest.mark.asyncio
+async def test_log_enqueues_without_network(monkeypatch):
+    telemetry, client = make_logger(monkeypatch, TELEMETRY_FLUSH_INTERVAL="60")
+
+    assert await telemetry.log("VRAM_CHECK", component="L1", value=3.5) is True
+
+    client.post.assert_not_called()
+    assert telemetry.stats()["buffered"] == 1
+    await telemetry.close()
+
+
+@pytest.mark.asyncio
+async def test_full_batch_triggers_flush(monkeypatch):
+    telemetry, client = make_logger(monkeypatch, TELEMETRY_BATCH_SIZE="3", TELEMETRY_FLUSH_INTERVAL="60")
+
+    for i in range(3):
+        await telemetry.log("EVENT", value=i)
+    await asyncio.sleep(0.05)
+
+    assert client.post.call_count == 1
+    url = client.post.call_args.args[0]
+    assert url.endswith("/v1/telemetry/log_batch")
+    assert [e["value"] for e in sent_events(client)] == [0, 1, 2]
+    assert telemetry.stats()["sent"] == 3
+    await telemetry.close()
+
+
+@pytest.mark.asyncio
+async def test_interval_flushes_partial_batch(monkeypatch):
+    telemetry, client = make_logger(monkeypatch, TELEMETRY_BATCH_SIZE="100", TELEMETRY_FLUSH_INTERVAL="0.05")
+
+    await telemetry.log("EVENT")
+    await asyncio.sleep(0.2)
+
+    assert len(sent_events(client)) == 1
+    await telemetry.close()
+
+
+@pytest.mark.asyncio
+async def test_overflow_drops_oldest(monkeypatch):
+    telemetry, client = make_logger(
+        monkeypatch, TELEMETRY_BUFFER_SIZE="3", TELEMETRY_BATCH_SIZE="100", TELEMETRY_FLUSH_INTERVAL="60"
+    )
+
+    for i in range(5):
+        await telemetry.log("EVENT", value=i)
+    await telemetry.close()
+
+    assert [e["value"] for e in sent_events(client)] == [2, 3, 4]
+    assert telemetry.stats()["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_everything(monkeypatch):
+    telemetry, client = make_logger(monkeypatch, TELEMETRY_BATCH_SIZE="2", TELEMETRY_FLUSH_INTERVAL="60")
+    telemetry.batch_size = 1000  # No size-triggered flush before close
+    for i in range(5):
+        await telemetry.log("EVENT", value=i)
+    telemetry.batch_size = 2
+
+    await telemetry.close()
+
+    assert client.post.call_count == 3
+    assert telemetry.stats() == {
+        "buffered": 0, "buffer_size": 5000, "sent": 5, "dropped": 0, "failed": 0, "batches": 3
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_counted_and_stops_flush(monkeypatch):
+    telemetry, client = make_logger(monkeypatch, status_code=500, TELEMETRY_BATCH_SIZE="2", TELEMETRY_FLUSH_INTERVAL="60")
+    telemetry.batch_size = 1000
+    for i in range(4):
+        await telemetry.log("EVENT", value=i)
+    telemetry.batch_size = 2
+
+    delivered = await telemetry.flush()
+
+    assert delivered == 0
+    assert client.post.call_count == 1
+    assert telemetry.stats()["failed"] == 2
+    assert telemetry.stats()["buffered"] == 2
+    await telemetry.close()
+
+
+def test_log_batch_endpoint_queues_events():
+    from fastapi.testclient import TestClient
+    from app.services.telemetry import main as service
+
+    while not service.event_queue.empty():
+        service.event_queue.get_nowait()
+
+    client = TestClient(service.app)  # No context manager: skips DB lifespan
+    response = client.post("/v1/telemetry/log_batch", json={
+        "events": [{"event_type": "A", "value": 1.0}, {"event_type": "B", "component": "L1"}]
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"success": True, "accepted": 2, "dropped": 0}
+    assert service.event_queue.qsize() == 2
+    while not service.event_queue.empty():
+        service.event_queue.get_nowait()
@@ -0,0 +1,192 @@
+"""
+Test Suite: Telemetry latency histograms
+Validates quantile accuracy, exact merges, persistence round-trips, the
+in-memory minute store and the percentiles/stats endpoints.
+"""
+import json
+import random
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from app.services.telemetry.histogram import HistogramStore, LogHistogram, merge_series, quantile_label
+from app.services.telemetry.database import TelemetryDatabase
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+    histogram = LogHistogram(0.01)
+    for value in values:
+        histogram.add(value)
+
+    for q in (0.5, 0.9, 0.99):
+        exact = exact_quantile(values, q)
+        assert abs(histogram.quantile(q) - exact) <= 0.011 * exact
+    assert histogram.quantile(0.0) == min(values)
+    assert histogram.quantile(1.0) == max(values)
+
+
+def test_merge_matches_single_histogram():
+    values = [0.0, -2.5, 0.3, 1.0, 7.5, 120.0, 3.3, 3.3]
+    whole, left, right = LogHistogram(), LogHistogram(), LogHistogram()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+
+    merged = left.merge(right)
+
+    assert merged.to_dict() == whole.to_dict()
+    assert merged.quantile(0.5) == whole.quantile(0.5)
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        LogHistogram(0.01).merge(LogHistogram(0.02))
+
+
+def test_round_trip_through_json():
+    histogram = LogHistogram()
+    for value in (0.2, 0.4, 9.0, -1.0):
+        histogram.add(value)
+
+    restored = LogHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.quantile(0.9) == histogram.quantile(0.9)
+
+
+def test_quantile_labels():
+    assert [quantile_label(q) for q in (0.5, 0.99, 0.999)] == ["p50", "p99", "p99.9"]
+
+
+def test_store_drains_completed_minutes_and_restores():
+    store = HistogramStore()
+    t0 = datetime(2026, 5, 1, 10, 0, 30)
+    store.record("THOUGHT_LATENCY", "L1", 1.0, at=t0)
+    store.record("THOUGHT_LATENCY", None, 2.0, at=t0)
+    store.record("THOUGHT_LATENCY", "L1", 3.0, at=t0 + timedelta(minutes=1))
+
+    drained = store.drain(before=datetime(2026, 5, 1, 10, 1))
+
+    assert [(bucket.minute, key) for bucket, key, _ in drained] == [
+        (0, ("L1", "THOUGHT_LATENCY")), (0, ("", "THOUGHT_LATENCY"))
+    ]
+    assert list(store.pending) == [datetime(2026, 5, 1, 10, 1)]
+    store.restore(drained)
+    assert len(store.window(datetime(2026, 5, 1, 10, 0, 45), datetime(2026, 5, 1, 11))) == 3
+
+
+@pytest.mark.asyncio
+async def test_load_histograms_merges_hour_and_minute_rows():
+    sketch = LogHistogram()
+    sketch.add(2.0)
+    row = {"component": "L1", "event_type": "THOUGHT_LATENCY", "sketch": json.dumps(sketch.to_dict())}
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(return_value=datetime(2026, 5, 1, 9, 0))
+    conn.fetch = AsyncMock(return_value=[row, row])
+
+    merged = await TelemetryDatabase().load_histograms(
+        conn, datetime(2026, 5, 1, 6, 30), datetime(2026, 5, 1, 11, 15), "THOUGHT_LATENCY"
+    )
+
+    assert merged[("L1", "THOUGHT_LATENCY")].count == 2
+    sql, since, until, first_hour, head, event_type = conn.fetch.call_args.args
+    assert (first_hour, head) == (datetime(2026, 5, 1, 7), datetime(2026, 5, 1, 10))
+    assert event_type == "THOUGHT_LATENCY"
+
+
+@pytest.mark.asyncio
+async def test_compact_histograms_writes_completed_hours():
+    sketch = LogHistogram()
+    sketch.add(1.0)
+    row = {"component": "", "event_type": "E", "sketch": json.dumps(sketch.to_dict())}
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(return_value=datetime(2026, 5, 1, 8, 0))  # Latest hour bucket
+    conn.fetch = AsyncMock(return_value=[row, row])
+    conn.executemany = AsyncMock()
+
+    compacted = await TelemetryDatabase().compact_histograms(conn, now=datetime(2026, 5, 1, 10, 20))
+
+    assert compacted == 1  # One series for the one complete hour
+    hours = [call.args[1][0][0] for call in conn.executemany.call_args_list]
+    assert hours == [datetime(2026, 5, 1, 9, 0)]
+    assert conn.executemany.call_args.args[1][0][3] == 2
+
+
+def make_service(monkeypatch, merged):
+    from app.services.telemetry import main as service
+
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(return_value={
+        "measurement_count": 4, "avg_efficiency_score": 2.0, "best_efficiency": 1.0,
+        "worst_efficiency": 3.0, "total_tokens": 0
+    })
+    acquire = MagicMock()
+    acquire.__aenter__ = AsyncMock(return_value=conn)
+    acquire.__aexit__ = AsyncMock(return_value=False)
+    pool = MagicMock()
+    pool.acquire = MagicMock(return_value=acquire)
+    monkeypatch.setattr(service.db, "pool", pool)
+    monkeypatch.setattr(service.db, "load_histograms", AsyncMock(return_value=merged))
+    monkeypatch.setattr(service, "histograms", HistogramStore())
+    return service, conn
+
+
+def series(*values):
+    histogram = LogHistogram()
+    for value in values:
+        histogram.add(value)
+    return histogram
+
+
+def test_percentiles_endpoint_reports_every_component(monkeypatch):
+    from fastapi.testclient import TestClient
+    service, _ = make_service(monkeypatch, merge_series([
+        (("L1", "THOUGHT_LATENCY"), series(*range(1, 101))),
+        (("L2", "THOUGHT_LATENCY"), series(10.0, 20.0)),
+    ]))
+    service.histograms.record("THOUGHT_LATENCY", "L2", 30.0)  # Not yet persisted
+
+    response = TestClient(service.app).get("/v1/telemetry/percentiles", params={"hours": 6})
+
+    assert response.status_code == 200
+    body = response.json()
+    by_component = {s["component"]: s for s in body["components"]}
+    assert set(by_component) == {"L1", "L2"}
+    assert by_component["L2"]["count"] == 3
+    assert by_component["L2"]["max"] == 30.0
+    assert abs(by_component["L1"]["percentiles"]["p90"] - 90) <= 1
+    assert set(body["overall"]["percentiles"]) == {"p50", "p90", "p99"}
+    assert body["overall"]["count"] == 103
+
+
+def test_percentiles_endpoint_rejects_bad_quantiles(monkeypatch):
+    from fastapi.testclient import TestClient
+    service, _ = make_service(monkeypatch, {})
+
+    response = TestClient(service.app).get("/v1/telemetry/percentiles", params={"quantiles": "0.5,1.5"})
+
+    assert response.status_code == 422
+
+
+def test_stats_without_component_covers_all_components(monkeypatch):
+    from fastapi.testclient import TestClient
+    service, conn = make_service(monkeypatch, merge_series([
+        (("L1", "THOUGHT_LATENCY"), series(1.0, 2.0)),
+        (("L2", "THOUGHT_LATENCY"), series(3.0, 4.0)),
+    ]))
+
+    response = TestClient(service.app).get("/v1/telemetry/stats")
+
+    body = response.json()
+    assert body["component"] is None
+    assert body["measurement_count"] == 4
+    assert abs(body["p50"] - 2.0) <= 0.02
+    assert abs(body["p99"] - 3.0) <= 0.03
+    sql = conn.fetchrow.call_args.args[0]
+    assert "LIMIT" not in sql and "GROUP BY" not in sql
@@ -0,0 +1,167 @@
+"""
+Test Suite: Telemetry partitions, rollups and retention
+Validates daily partition naming, rollup windows, retention drops and that
+/v1/telemetry/stats reads rollups instead of raw rows.
+"""
+import pytest
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock
+from app.services.telemetry import database
+from app.services.telemetry.database import TelemetryDatabase, partition_name, partition_day
+
+
+def make_conn(fetchval=None, fetch=None):
+    conn = MagicMock()
+    conn.execute = AsyncMock(return_value="INSERT 0 3")
+    conn.fetchval = AsyncMock(side_effect=fetchval)
+    conn.fetch = AsyncMock(return_value=fetch or [])
+    return conn
+
+
+def executed(conn):
+    return [call.args[0] for call in conn.execute.call_args_list]
+
+
+def test_partition_names_round_trip():
+    assert partition_name(date(2026, 3, 9)) == "system_telemetry_p20260309"
+    assert partition_day("system_telemetry_p20260309") == date(2026, 3, 9)
+    assert partition_day("system_telemetry_legacy") is None
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_creates_days_ahead(monkeypatch):
+    monkeypatch.setattr(database.config, "TELEMETRY_PARTITION_DAYS_AHEAD", 2)
+    conn = make_conn(fetchval=[date(2026, 12, 31), None])  # CURRENT_DATE, nothing parked in the default
+
+    created = await TelemetryDatabase().ensure_partitions(conn)
+
+    assert created == ["system_telemetry_p20261231", "system_telemetry_p20270101", "system_telemetry_p20270102"]
+    assert any("FOR VALUES FROM ('2026-12-31') TO ('2027-01-01')" in sql for sql in executed(conn))
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_sweeps_rows_parked_in_the_default(monkeypatch):
+    monkeypatch.setattr(database.config, "TELEMETRY_PARTITION_DAYS_AHEAD", 1)
+    # Maintenance stalled: rows from two days ago landed in the default partition
+    conn = make_conn(fetchval=[date(2026, 5, 10), date(2026, 5, 8)], fetch=[{"day": date(2026, 5, 8)}])
+
+    created = await TelemetryDatabase().ensure_partitions(conn)
+
+    assert created == [partition_name(date(2026, 5, day)) for day in (8, 9, 10, 11)]
+    statements = executed(conn)
+    assert statements[0] == "LOCK TABLE system_telemetry_default IN EXCLUSIVE MODE"
+    create, move, attach = statements[1:4]
+    assert create == "CREATE TABLE system_telemetry_p20260508 (LIKE system_telemetry INCLUDING DEFAULTS)"
+    assert "DELETE FROM system_telemetry_default" in move and "INSERT INTO system_telemetry_p20260508" in move
+    assert attach.startswith("ALTER TABLE system_telemetry ATTACH PARTITION system_telemetry_p20260508")
+    assert "CREATE TABLE IF NOT EXISTS system_telemetry_p20260509 PARTITION OF system_telemetry" in statements[4]
+
+
+@pytest.mark.asyncio
+async def test_refresh_rollups_recomputes_last_minute_and_complete_hours():
+    now = datetime(2026, 5, 1, 10, 42, 30)
+    last_minute = datetime(2026, 5, 1, 10, 41)
+    last_hour = datetime(2026, 5, 1, 8, 0)
+    # LOCALTIMESTAMP, MIN(timestamp), then MAX(bucket) per rollup table
+    conn = make_conn(fetchval=[now, datetime(2026, 4, 30), last_minute, last_hour])
+
+    rows = await TelemetryDatabase().refresh_rollups(conn)
+
+    minute_call, hour_call = conn.execute.call_args_list
+    assert "telemetry_rollup_minute" in minute_call.args[0] and "date_trunc('minute'" in minute_call.args[0]
+    assert minute_call.args[1:] == (last_minute, now)
+    assert "telemetry_rollup_hour" in hour_call.args[0]
+    assert hour_call.args[1:] == (datetime(2026, 5, 1, 9, 0), datetime(2026, 5, 1, 10, 0))
+    assert rows == {"minute": 3, "hour": 3}
+
+
+@pytest.mark.asyncio
+async def test_refresh_rollups_skips_incomplete_hour():
+    now = datetime(2026, 5, 1, 10, 5)
+    conn = make_conn(fetchval=[now, datetime(2026, 5, 1, 10, 1), None, datetime(2026, 5, 1, 9, 0)])
+
+    rows = await TelemetryDatabase().refresh_rollups(conn)
+
+    assert conn.execute.call_count == 1
+    assert conn.execute.call_args.args[1] == datetime(2026, 5, 1, 10, 1)
+    assert rows["hour"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retention_drops_only_expired_partitions(monkeypatch):
+    monkeypatch.setattr(database.config, "TELEMETRY_RAW_RETENTION_DAYS", 7)
+    conn = make_conn(
+        fetchval=[date(2026, 5, 10)],
+        fetch=[{"relname": "system_telemetry_p20260502"}, {"relname": "system_telemetry_p20260503"},
+               {"relname": "system_telemetry_p20260510"}, {"relname": "system_telemetry_other"}]
+    )
+
+    dropped = await TelemetryDatabase().apply_retention(conn)
+
+    assert dropped == ["system_telemetry_p20260502"]
+    statements = executed(conn)
+    assert "DROP TABLE IF EXISTS system_telemetry_p20260502" in statements
+    assert "DELETE FROM system_telemetry_default WHERE timestamp < $1::date" in statements
+    assert any("DELETE FROM telemetry_rollup_minute" in sql for sql in statements)
+    assert any("DELETE FROM telemetry_rollup_hour" in sql for sql in statements)
+
+
+def test_stats_reads_rollups(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.services.telemetry import main as service
+
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(return_value={
+        "measurement_count": 12, "avg_efficiency_score": 1.5,
+        "best_efficiency": 0.5, "worst_efficiency": 4.0, "total_tokens": 900
+    })
+    monkeypatch.setattr(service.db, "load_histograms", AsyncMock(return_value={}))
+    acquire = MagicMock()
+    acquire.__aenter__ = AsyncMock(return_value=conn)
+    acquire.__aexit__ = AsyncMock(return_value=False)
+    pool = MagicMock()
+    pool.acquire = MagicMock(return_value=acquire)
+    monkeypatch.setattr(service.db, "pool", pool)
+
+    response = TestClient(service.app).get("/v1/telemetry/stats", params={"component": "L1", "hours": 6})
+
+    assert response.status_code == 200
+    assert response.json()["measurement_count"] == 12
+    assert response.json()["component"] == "L1"
+    sql, hours, component = conn.fetchrow.call_args.args
+    assert "telemetry_rollup_hour" in sql and "telemetry_rollup_minute" in sql
+    assert "FROM system_telemetry" not in sql
+    assert (hours, component) == (6, "L1")
+
+
+@pytest.mark.asyncio
+async def test_legacy_migration_keeps_old_history_as_hour_rollups(monkeypatch):
+    monkeypatch.setattr(database.config, "TELEMETRY_RAW_RETENTION_DAYS", 14)
+    monkeypatch.setattr(database.config, "TELEMETRY_HOUR_ROLLUP_RETENTION_DAYS", 400)
+    monkeypatch.setattr(database.config, "TELEMETRY_PARTITION_DAYS_AHEAD", 1)
+    now = datetime(2026, 5, 10, 12, 30)
+    old_hour = datetime(2026, 3, 1, 9, 0)  # 70 days back: past raw retention, inside hour retention
+
+    async def legacy_values(*args):
+        for value in (120.0, 180.0):
+            yield {"bucket": old_hour, "component": "L1", "event_type": "LATENCY", "value": value}
+
+    # LOCALTIMESTAMP, CURRENT_DATE, first day inside raw retention
+    conn = make_conn(fetchval=[now, date(2026, 5, 10), date(2026, 4, 28)])
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    conn.cursor = MagicMock(side_effect=legacy_values)
+    conn.executemany = AsyncMock()
+
+    await TelemetryDatabase()._migrate_legacy(conn)
+
+    statements = executed(conn)
+    hour_rollup = next(call for call in conn.execute.call_args_list
+                       if "telemetry_rollup_hour" in call.args[0] and "FROM system_telemetry_legacy" in call.args[0])
+    assert hour_rollup.args[1:] == (datetime(2025, 4, 5), datetime(2026, 5, 10, 12, 0))  # 400 days, complete hours
+    assert statements.index(hour_rollup.args[0]) < statements.index("DROP TABLE system_telemetry_legacy")
+
+    sql, sketches = conn.executemany.call_args.args
+    assert "telemetry_histogram_hour" in sql
+    (bucket, component, event_type, count, sketch), = sketches
+    assert (bucket, component, event_type, count) == (old_hour, "L1", "LATENCY", 2)
+    assert "system_telemetry_p20260511" in " ".join(statements)  # Rows dated tomorrow still get a partition
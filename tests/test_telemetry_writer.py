@@ -0,0 +1,123 @@
+"""
+Test Suite: Telemetry service COPY writers
+Validates binary COPY writes, adaptive batch sizing from queue depth,
+multi-writer shutdown and writer metrics on /health.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.services.telemetry import main as service
+from app.services.telemetry.models import TelemetryEvent
+
+
+def drain():
+    while not service.event_queue.empty():
+        service.event_queue.get_nowait()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    conn = MagicMock()
+    conn.copy_records_to_table = AsyncMock()
+    acquire = MagicMock()
+    acquire.__aenter__ = AsyncMock(return_value=conn)
+    acquire.__aexit__ = AsyncMock(return_value=False)
+    fake_pool = MagicMock()
+    fake_pool.acquire = MagicMock(return_value=acquire)
+    monkeypatch.setattr(service.db, "pool", fake_pool)
+    monkeypatch.setattr(service, "metrics", service.WriterMetrics())
+    monkeypatch.setattr(service, "histograms", service.HistogramStore())
+    drain()
+    yield conn
+    drain()
+
+
+@pytest.mark.asyncio
+async def test_write_batch_uses_copy(pool):
+    events = [
+        TelemetryEvent(event_type="THOUGHT_LATENCY", component="L1", value=1.5, metadata={"tokens_generated": 10}),
+        TelemetryEvent(event_type="VRAM_CHECK", status="OK"),
+    ]
+
+    await service._write_batch(events)
+
+    pool.copy_records_to_table.assert_awaited_once()
+    args, kwargs = pool.copy_records_to_table.call_args
+    assert args == ("system_telemetry",)
+    assert kwargs["columns"] == service.COPY_COLUMNS
+    assert kwargs["records"] == [
+        ("THOUGHT_LATENCY", "L1", 1.5, '{"tokens_generated":10}', None),
+        ("VRAM_CHECK", None, None, None, "OK"),
+    ]
+    assert service.metrics.events_written == 2
+    assert service.metrics.last_batch_size == 2
+    # Only events with a value feed the latency histograms
+    recorded = [key for _, key, _ in service.histograms.drain()]
+    assert recorded == [("L1", "THOUGHT_LATENCY")]
+
+
+@pytest.mark.asyncio
+async def test_failed_copy_is_counted(pool):
+    pool.copy_records_to_table.side_effect = RuntimeError("connection lost")
+
+    await service._write_batch([TelemetryEvent(event_type="A")])
+
+    assert service.metrics.events_failed == 1
+    assert service.metrics.events_written == 0
+
+
+def test_batch_size_grows_with_queue_depth(pool, monkeypatch):
+    monkeypatch.setattr(service.config, "TELEMETRY_WRITERS", 2)
+    monkeypatch.setattr(service.config, "TELEMETRY_WRITE_BATCH_MIN", 10)
+    monkeypatch.setattr(service.config, "TELEMETRY_WRITE_BATCH_MAX", 300)
+
+    assert service._target_batch_size() == 10
+    for i in range(400):
+        service.event_queue.put_nowait(TelemetryEvent(event_type="E", value=i))
+    assert service._target_batch_size() == 200
+    for i in range(400):
+        service.event_queue.put_nowait(TelemetryEvent(event_type="E", value=i))
+    assert service._target_batch_size() == 300
+
+
+@pytest.mark.asyncio
+async def test_collect_takes_queued_events_without_waiting(pool, monkeypatch):
+    monkeypatch.setattr(service.config, "TELEMETRY_WRITE_BATCH_MIN", 5)
+    monkeypatch.setattr(service.config, "TELEMETRY_WRITE_TIMEOUT", 60.0)
+    for i in range(7):
+        service.event_queue.put_nowait(TelemetryEvent(event_type="E", value=i))
+
+    batch, shutdown = await asyncio.wait_for(service._collect_batch(), timeout=1)
+
+    assert [e.value for e in batch] == [0, 1, 2, 3, 4]
+    assert shutdown is False
+
+
+@pytest.mark.asyncio
+async def test_writers_drain_queue_then_stop(pool, monkeypatch):
+    monkeypatch.setattr(service.config, "TELEMETRY_WRITE_BATCH_MIN", 3)
+    monkeypatch.setattr(service.config, "TELEMETRY_WRITE_TIMEOUT", 0.05)
+    for i in range(10):
+        service.event_queue.put_nowait(TelemetryEvent(event_type="E", value=i))
+    writers = [asyncio.create_task(service.telemetry_worker(i)) for i in range(3)]
+    for _ in writers:
+        service.event_queue.put_nowait(None)
+
+    await asyncio.wait_for(asyncio.gather(*writers), timeout=5)
+
+    written = [r[2] for call in pool.copy_records_to_table.call_args_list for r in call.kwargs["records"]]
+    assert sorted(written) == list(range(10))
+    assert service.metrics.events_written == 10
+
+
+def test_health_reports_writer_metrics(pool):
+    from fastapi.testclient import TestClient
+
+    service.metrics.record(40, 0.012)
+    response = TestClient(service.app).get("/health")  # No context manager: skips DB lifespan
+
+    body = response.json()
+    assert body["queue_capacity"] == service.event_queue.maxsize
+    assert body["writers"]["last_batch_size"] == 40
+    assert body["writers"]["last_write_ms"] == 12.0
+    assert body["writers"]["events_written"] == 40
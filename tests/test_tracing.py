@@ -0,0 +1,180 @@
+"""
+Test Suite: Distributed request tracing
+Validates W3C traceparent parsing and propagation, server/child spans, the
+wrapper stage spans (certification, first token, generation, pipe finalize),
+file/OTLP export and the /traces waterfall viewer.
+"""
+import json
+import httpx
+import pytest
+from pathlib import Path
+from typing import Dict, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.tracing import (
+    TRACE_HOOKS, Tracer, instrument_tracing, inject, parse_traceparent, span, to_otlp, tracer, waterfall
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def spans_of(trace_id):
+    return [s for s in tracer.spans if s.trace_id == trace_id]
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID)
+    assert parse_traceparent(f"00-{TRACE_ID.upper()}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID)
+    for invalid in (None, "", "garbage", f"ff-{TRACE_ID}-{PARENT_ID}-01", f"00-{'0' * 32}-{PARENT_ID}-01"):
+        assert parse_traceparent(invalid) is None
+
+
+def test_server_span_continues_incoming_trace():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        with span("policy", resource="gemma2:27b"):
+            pass
+        return {"id": item_id}
+
+    instrument_tracing(app, "demo")
+    client = TestClient(app)
+
+    response = client.get("/items/7", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+    assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+    server = next(s for s in spans_of(TRACE_ID) if s.kind == "server")
+    child = next(s for s in spans_of(TRACE_ID) if s.name == "policy")
+    assert server.name == "GET /items/{item_id}"
+    assert server.parent_id == PARENT_ID
+    assert server.attributes["http.status_code"] == 200
+    assert child.parent_id == server.span_id
+    assert child.attributes == {"resource": "gemma2:27b"}
+
+    view = client.get(f"/traces/{TRACE_ID}").json()
+    assert [(row["name"], row["depth"]) for row in view["spans"]][:2] == [("GET /items/{item_id}", 0), ("policy", 1)]
+    assert TRACE_ID in [t["trace_id"] for t in client.get("/traces").json()["traces"]]
+    assert "demo:policy" in client.get(f"/traces/{TRACE_ID}?format=text").text
+    assert client.get(f"/traces/{'a' * 32}").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_outgoing_calls_carry_traceparent():
+    seen = []
+    transport = httpx.MockTransport(lambda request: seen.append(request.headers.get("traceparent")) or httpx.Response(200))
+
+    async with httpx.AsyncClient(transport=transport, event_hooks=TRACE_HOOKS) as client:
+        await client.get("http://guardian/untraced")
+        with span("guardian.session_start", kind="client") as call:
+            await client.get("http://guardian/session/start")
+            assert inject({"Authorization": "Bearer x"}) == {"Authorization": "Bearer x", "traceparent": call.traceparent}
+
+    assert seen == [None, call.traceparent]
+
+
+@pytest.mark.asyncio
+async def test_exceptions_mark_span_failed():
+    with pytest.raises(ValueError):
+        with span("audit.enqueue") as failing:
+            raise ValueError("queue full")
+
+    assert failing.status == "error"
+    assert failing.error == "ValueError: queue full"
+    assert failing.end_ns is not None
+
+
+@pytest.mark.asyncio
+async def test_wrapper_records_stage_spans():
+    from app.wrappers.base_wrapper import GravitasAgentWrapper
+
+    class StreamingWrapper(GravitasAgentWrapper):
+        async def _execute_internal(self, task: Dict) -> Dict:
+            for _ in range(3):
+                self.mark_token()
+            return {"output": "done"}
+
+        def _parse_thought(self, chunk: Dict) -> Optional[str]:
+            return None
+
+        def _parse_action(self, chunk: Dict) -> Optional[str]:
+            return None
+
+    with patch("app.wrappers.base_wrapper.ReasoningPipe"), patch("app.wrappers.base_wrapper.SupervisorGuardian"):
+        wrapper = StreamingWrapper(ghost_name="Tracer", session_id="s1", model="gemma2:27b", tier="L1")
+    wrapper.supervisor = MagicMock()
+    wrapper.supervisor.notify_session_start = AsyncMock(return_value=MagicMock(allowed=True))
+    wrapper.supervisor.notify_session_end = AsyncMock()
+    wrapper.pipe.finalize.return_value = Path("journal.md")
+
+    with span("POST /v1/chat/completions", kind="server") as root:
+        await wrapper.execute_task({"prompt": "hi"})
+
+    spans = {s.name: s for s in spans_of(root.trace_id)}
+    assert {"certification", "llm.generate", "llm.first_token", "pipe.finalize"} <= set(spans)
+    assert spans["certification"].parent_id == root.span_id
+    assert spans["llm.first_token"].parent_id == spans["llm.generate"].span_id
+    assert spans["llm.first_token"].start_ns == spans["llm.generate"].start_ns
+    assert spans["llm.first_token"].end_ns <= spans["llm.generate"].end_ns
+    assert len([s for s in spans_of(root.trace_id) if s.name == "llm.first_token"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_file_export_feeds_cross_service_viewer(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    gatekeeper = Tracer(service="gatekeeper", export_path=str(path), export_interval=60)
+    supervisor = Tracer(service="supervisor", export_path=str(path), export_interval=60)
+
+    root = supervisor.start_span("POST /v1/chat/completions", kind="server")
+    remote = gatekeeper.start_span("POST /validate", kind="server", remote=(root.trace_id, root.span_id))
+    gatekeeper.finish(remote)
+    supervisor.finish(root)
+    await gatekeeper.shutdown()
+    await supervisor.shutdown()
+
+    assert len(path.read_text().splitlines()) == 2
+    view = waterfall(await supervisor.trace(root.trace_id))
+    assert view["services"] == ["gatekeeper", "supervisor"]
+    assert [(row["service"], row["depth"]) for row in view["spans"]] == [("supervisor", 0), ("gatekeeper", 1)]
+
+
+def test_otlp_payload():
+    local = Tracer(service="guardian", enabled=True)
+    s = local.start_span("certification", agent="Librarian")
+    s.set_error(RuntimeError("expired"))
+    local.finish(s)
+
+    body = to_otlp([s])
+    resource = body["resourceSpans"][0]
+    otlp = resource["scopeSpans"][0]["spans"][0]
+    assert resource["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "guardian"}}
+    assert otlp["traceId"] == s.trace_id and otlp["spanId"] == s.span_id
+    assert "parentSpanId" not in otlp
+    assert otlp["status"] == {"code": 2, "message": "RuntimeError: expired"}
+    assert otlp["attributes"] == [{"key": "agent", "value": {"stringValue": "Librarian"}}]
+    json.dumps(body)
+
+
+@pytest.mark.asyncio
+async def test_failed_exports_count_as_dropped(tmp_path):
+    blocked = tmp_path / "not-a-dir"
+    blocked.write_text("")
+    local = Tracer(service="router", export_path=str(blocked / "spans.jsonl"),
+                   otlp_endpoint="http://collector:4318", export_interval=60)
+    client = MagicMock()
+    client.post = AsyncMock(side_effect=httpx.ConnectError("refused"))
+
+    with patch("app.services.tracing.HttpClientRegistry.get", return_value=client) as get:
+        local.finish(local.start_span("a"))
+        await local.flush()
+        get.assert_called_with("otlp")
+
+        client.post = AsyncMock(return_value=MagicMock(raise_for_status=MagicMock()))
+        local.finish(local.start_span("b"))
+        await local.shutdown()
+
+    stats = local.stats()
+    assert (stats["exported"], stats["dropped"], stats["export_errors"]) == (1, 1, 3)  # Second batch reached OTLP
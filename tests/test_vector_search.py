@@ -0,0 +1,177 @@
+"""
+Test Suite: QdrantVectorStore retrieval path
+Uses mocked Qdrant/embedder/storage so it runs without the Docker stack.
+"""
+import asyncio
+import time
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app.memory import QdrantVectorStore
+from app.embedding_cache import EmbeddingCache
+from app.sparse import BM25SparseEncoder, term_index, tokenize
+
+
+def make_store(points, blobs, get=None):
+    store = QdrantVectorStore.__new__(QdrantVectorStore)
+    store.collection_name = "test_collection"
+    store.blob_concurrency = 4
+    store.blob_deadline = 1.0
+    store.embedder = MagicMock()
+    store.embedder.encode = MagicMock(return_value=np.zeros(384))
+    store.embedding_model_name = "all-MiniLM-L6-v2"
+    store.embedding_cache = EmbeddingCache(max_entries=100)
+    store.sparse_encoder = BM25SparseEncoder()
+    store.sparse_vector_name = "sparse"
+    store.hybrid_enabled = True
+    store._collection_ready = True
+    store.client = MagicMock()
+    store.client.query_points = AsyncMock(return_value=SimpleNamespace(points=points))
+    store.storage = MagicMock()
+    store.storage.get = get or AsyncMock(side_effect=lambda key: blobs.get(key))
+    return store
+
+
+def point(pid, score, blob_key, **payload):
+    return SimpleNamespace(id=pid, score=score, payload={"blob_key": blob_key, **payload})
+
+
+@pytest.mark.asyncio
+async def test_search_with_scores_returns_scores_and_payloads():
+    store = make_store(
+        [point("p1", 0.9, "b1", source="a.md"), point("p2", 0.7, "b2", source="b.md")],
+        {"b1": "first", "b2": "second"}
+    )
+
+    results = await store.search_with_scores("query", top_k=2)
+
+    assert [r.content for r in results] == ["first", "second"]
+    assert [r.score for r in results] == [0.9, 0.7]
+    assert results[0].payload["source"] == "a.md"
+    assert results[0].point_id == "p1"
+    assert await store.search("query", top_k=2) == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_blob_fetches_run_concurrently():
+    async def slow_get(key):
+        await asyncio.sleep(0.1)
+        return f"content {key}"
+
+    points = [point(f"p{i}", 1.0 - i / 10, f"b{i}") for i in range(4)]
+    store = make_store(points, {}, get=AsyncMock(side_effect=slow_get))
+
+    start = time.perf_counter()
+    results = await store.search("query", top_k=4)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 4
+    assert elapsed < 0.3  # Serial would be ~0.4s
+
+
+@pytest.mark.asyncio
+async def test_slow_and_missing_blobs_yield_partial_results():
+    async def get(key):
+        if key == "slow":
+            await asyncio.sleep(5)
+        return {"fast": "fast content", "slow": "slow content"}.get(key)
+
+    store = make_store(
+        [point("p1", 0.9, "slow"), point("p2", 0.8, "fast"), point("p3", 0.7, "gone")],
+        {},
+        get=AsyncMock(side_effect=get)
+    )
+
+    start = time.perf_counter()
+    results = await store.search_with_scores("query", top_k=3, deadline=0.2)
+
+    assert time.perf_counter() - start < 1.0
+    assert [r.content for r in results] == ["fast content"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_do_not_serialize_on_qdrant():
+    async def slow_query(**kwargs):
+        await asyncio.sleep(0.1)
+        return SimpleNamespace(points=[point("p1", 0.9, "b1")])
+
+    store = make_store([], {"b1": "content"})
+    store.client.query_points = AsyncMock(side_effect=slow_query)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(store.search("query") for _ in range(5)))
+    elapsed = time.perf_counter() - start
+
+    assert results == [["content"]] * 5
+    assert elapsed < 0.3  # Blocking client would take ~0.5s
+
+
+@pytest.mark.asyncio
+async def test_collection_is_created_lazily_once():
+    store = make_store([], {})
+    store._collection_ready = False
+    store._collection_lock = asyncio.Lock()
+    store.vector_size = 384
+    store.client.collection_exists = AsyncMock(return_value=False)
+    store.client.create_collection = AsyncMock()
+
+    await asyncio.gather(*(store.search("query") for _ in range(3)))
+
+    store.client.create_collection.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_embedded_once():
+    store = make_store([point("p1", 0.9, "b1")], {"b1": "content"})
+
+    await store.search("What is Gravitas?")
+    await store.search("  what is   GRAVITAS? ")
+
+    assert store.embedder.encode.call_count == 1
+    assert store.embedding_cache.stats()["hits"] == 1
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    terms = tokenize("Call DocumentIngestor.ingest_all on the tree")
+
+    assert "documentingestor" in terms
+    assert {"document", "ingestor"} <= set(terms)
+    assert {"ingest_all", "ingest", "all"} <= set(terms)
+    assert "the" not in terms
+
+
+def test_bm25_document_weights_saturate():
+    encoder = BM25SparseEncoder()
+    indices, values = encoder.encode_document("qdrant qdrant qdrant minio")
+    weights = dict(zip(indices, values))
+
+    assert indices == sorted(indices)
+    assert weights[term_index("minio")] < weights[term_index("qdrant")] < 3 * weights[term_index("minio")]
+
+
+@pytest.mark.asyncio
+async def test_search_hybrid_fuses_dense_and_sparse_with_rrf():
+    store = make_store([point("p1", 0.5, "b1")], {"b1": "def ingest_many(): ..."})
+
+    results = await store.search_hybrid("ingest_many", top_k=3)
+
+    assert [r.content for r in results] == ["def ingest_many(): ..."]
+    kwargs = store.client.query_points.call_args.kwargs
+    assert kwargs["limit"] == 3
+    assert kwargs["query"].fusion == "rrf"
+    dense, sparse = kwargs["prefetch"]
+    assert dense.using is None
+    assert sparse.using == "sparse"
+    assert term_index("ingest_many") in sparse.query.indices
+
+
+@pytest.mark.asyncio
+async def test_search_hybrid_falls_back_to_dense_without_sparse_index():
+    store = make_store([point("p1", 0.9, "b1")], {"b1": "content"})
+    store.hybrid_enabled = False
+
+    results = await store.search_hybrid("ingest_many")
+
+    assert [r.content for r in results] == ["content"]
+    assert "prefetch" not in store.client.query_points.call_args.kwargs
@@ -0,0 +1,164 @@
+"""
+Test Suite: Supervisor worker pool
+Validates per-tier concurrency limits, priority ordering and push_to_front,
+bounded queues, cancellation of abandoned jobs, queue-wait metrics and trace
+context propagation into the workers.
+"""
+import asyncio
+import pytest
+
+from app.services.metrics import QUEUE_WAIT
+from app.services.scheduler.pool import QueueFullError, WorkerPool
+from app.services.tracing import current_span, span
+
+
+class Recorder:
+    """Jobs that log start/end and block until released."""
+
+    def __init__(self):
+        self.events = []
+        self.running = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    def job(self, name):
+        async def run():
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.events.append(name)
+            await self.release.wait()
+            self.running -= 1
+            return name
+        return run
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_tier_limits_bound_concurrency():
+    pool = WorkerPool({"L1": 1, "L2": 3})
+    rec = Recorder()
+
+    l1 = [asyncio.create_task(pool.submit("L1", rec.job(f"l1-{i}"))) for i in range(3)]
+    l2 = [asyncio.create_task(pool.submit("L2", rec.job(f"l2-{i}"))) for i in range(5)]
+    await settle()
+
+    assert pool.busy == {"L1": 1, "L2": 3}
+    assert (pool.qsize("L1"), pool.qsize("L2")) == (2, 2)
+    rec.release.set()
+    assert await asyncio.gather(*l1) == ["l1-0", "l1-1", "l1-2"]
+    await asyncio.gather(*l2)
+    assert pool.active == 0
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_priority_and_push_to_front():
+    pool = WorkerPool({"L1": 1})
+    rec = Recorder()
+
+    first = asyncio.create_task(pool.submit("L1", rec.job("running")))
+    await settle()
+    waiting = [
+        asyncio.create_task(pool.submit("L1", rec.job(name), priority=priority))
+        for name, priority in [("default", 10), ("high", 0), ("big-guy", -1), ("default-2", 10)]
+    ]
+    await settle()
+    rec.release.set()
+    await asyncio.gather(first, *waiting)
+
+    assert rec.events == ["running", "big-guy", "high", "default", "default-2"]
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_and_errors_propagate():
+    pool = WorkerPool({"L1": 1}, max_depth=1)
+    rec = Recorder()
+
+    running = asyncio.create_task(pool.submit("L1", rec.job("a")))
+    await settle()
+    queued = asyncio.create_task(pool.submit("L1", rec.job("b")))
+    await settle()
+
+    with pytest.raises(QueueFullError) as shed:
+        await pool.submit("L1", rec.job("c"))
+    assert shed.value.tier == "L1"
+    assert pool.drain_estimate_s("L1", per_request_ms=2000) == 4.0
+
+    rec.release.set()
+    await asyncio.gather(running, queued)
+
+    async def boom():
+        raise ValueError("upstream 500")
+
+    with pytest.raises(ValueError, match="upstream 500"):
+        await pool.submit("L1", boom)
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_drops_queued_and_running_jobs():
+    pool = WorkerPool({"L1": 1})
+    rec = Recorder()
+
+    running = asyncio.create_task(pool.submit("L1", rec.job("running")))
+    queued = asyncio.create_task(pool.submit("L1", rec.job("abandoned")))
+    await settle()
+
+    queued.cancel()
+    running.cancel()
+    await settle()
+
+    assert rec.events == ["running"]
+    assert pool.active == 0
+    assert await pool.submit("L1", lambda: asyncio.sleep(0, result="next")) == "next"
+    await pool.stop()
+
+
+@pytest.mark.parametrize("affinity", [False, True])
+@pytest.mark.asyncio
+async def test_cancelled_queued_callers_free_their_queue_slots(affinity):
+    from app.services.scheduler.affinity import AffinityQueue
+    from app.services.scheduler.lock import ModelLock
+
+    queues = {"L1": AffinityQueue(ModelLock())} if affinity else None
+    pool = WorkerPool({"L1": 1}, max_depth=3, queues=queues)
+    rec = Recorder()
+
+    busy = asyncio.create_task(pool.submit("L1", rec.job("long generation"), model="gemma2:27b"))
+    await settle()
+    callers = [asyncio.create_task(pool.submit("L1", rec.job(f"gone {n}"), model="gemma2:27b")) for n in range(3)]
+    await settle()
+    assert pool.qsize("L1") == 3
+
+    for caller in callers:
+        caller.cancel()
+    await settle()
+
+    assert pool.qsize("L1") == 0  # Nothing really waits, so nothing counts toward depth or backlog
+    assert pool.drain_estimate_s("L1", per_request_ms=1000) == 1.0  # Only the running job
+    late = asyncio.create_task(pool.submit("L1", rec.job("late"), model="gemma2:27b"))  # Not a 503
+    rec.release.set()
+    assert await busy == "long generation"
+    assert await late == "late"
+    assert rec.events == ["long generation", "late"]
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_recorded_and_trace_context_follows_the_job():
+    pool = WorkerPool({"L3": 1})
+    before = sum(QUEUE_WAIT.series.get(("L3",), [[0]])[0])
+
+    async def parent_of_job():
+        return current_span()
+
+    with span("POST /v1/chat/completions", kind="server") as root:
+        assert await pool.submit("L3", parent_of_job) is root
+
+    assert sum(QUEUE_WAIT.series[("L3",)][0]) == before + 1
+    await pool.stop()